@@ -17,4 +17,13 @@ export const apiRequest = async (path, options = {}) => {
   return response.json();
 };
 
+export const subscribeOrderEvents = (path, { onReady, onOrder }) => {
+  const source = new EventSource(`${API_BASE}${path}`);
+  const handleOrder = (event) => onOrder(JSON.parse(event.data));
+  source.addEventListener("ready", onReady);
+  source.addEventListener("order.created", handleOrder);
+  source.addEventListener("order.updated", handleOrder);
+  return () => source.close();
+};
+
 export default API_BASE;
@@ -1,5 +1,5 @@
 import { Fragment, useEffect, useMemo, useState } from "react";
-import { apiRequest } from "../api";
+import { apiRequest, subscribeOrderEvents } from "../api";
 import DistributorNav from "../components/DistributorNav";
 
 const DistributorOrders = () => {
@@ -21,6 +21,7 @@ const DistributorOrders = () => {
       return;
     }
     let mounted = true;
+    let knownUserIds = new Set();
     const loadOrders = async () => {
       try {
         const [orderList, userList] = await Promise.all([
@@ -30,6 +31,7 @@ const DistributorOrders = () => {
         if (mounted) {
           setOrders(orderList);
           setUsers(userList);
+          knownUserIds = new Set(userList.map((user) => user.id));
         }
       } catch (error) {
         if (mounted) {
@@ -38,9 +40,39 @@ const DistributorOrders = () => {
         }
       }
     };
+    const mergeOrder = (order) => {
+      if (!mounted) {
+        return;
+      }
+      setOrders((prev) =>
+        prev.some((item) => item.id === order.id)
+          ? prev.map((item) => (item.id === order.id ? order : item))
+          : [...prev, order]
+      );
+      if (!knownUserIds.has(order.user_id)) {
+        knownUserIds.add(order.user_id);
+        apiRequest("/users")
+          .then((userList) => mounted && setUsers(userList))
+          .catch(() => {});
+      }
+    };
+    // The first "ready" only confirms the stream is open; later ones follow a
+    // reconnect, when events may have been missed and the list needs a resync.
+    let connected = false;
+    const resyncOrders = () => {
+      if (connected) {
+        loadOrders();
+      }
+      connected = true;
+    };
     loadOrders();
+    const unsubscribe = subscribeOrderEvents(
+      `/distributor/${auth.user_id}/orders/events`,
+      { onReady: resyncOrders, onOrder: mergeOrder }
+    );
     return () => {
       mounted = false;
+      unsubscribe();
     };
   }, []);
 
@@ -0,0 +1,82 @@
+import secrets
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.cache import auth_account_cache, user_id_by_phone_cache
+from app.distributors import distributor_directory
+from app.models import AuthAccount, User
+
+
+@dataclass(frozen=True)
+class CachedAccount:
+    id: int
+    username: str
+    password: str
+    role: str
+    user_id: Optional[int]
+
+
+def user_id_for_phone(session: Session, phone: str) -> Optional[int]:
+    user_id = user_id_by_phone_cache.get(phone)
+    if user_id is None:
+        user_id = session.exec(select(User.id).where(User.phone == phone)).first()
+        if user_id is not None:
+            user_id_by_phone_cache.put(phone, user_id)
+    return user_id
+
+
+def get_or_create_phone_user(session: Session, phone: str) -> User:
+    user_id = user_id_for_phone(session, phone)
+    user = session.get(User, user_id) if user_id is not None else None
+    if user is not None:
+        return user
+    user = User(name="手机用户", phone=phone, role="customer")
+    session.add(user)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        user = session.exec(select(User).where(User.phone == phone)).one()
+    else:
+        session.refresh(user)
+    user_id_by_phone_cache.put(phone, user.id)
+    return user
+
+
+def get_auth_account(session: Session, username: str) -> Optional[CachedAccount]:
+    account = auth_account_cache.get(username)
+    if account is None:
+        row = session.exec(
+            select(AuthAccount).where(AuthAccount.username == username)
+        ).first()
+        if row is None:
+            return None
+        account = CachedAccount(
+            id=row.id,
+            username=row.username,
+            password=row.password,
+            role=row.role,
+            user_id=row.user_id,
+        )
+        auth_account_cache.put(username, account)
+    return account
+
+
+def authenticate(
+    session: Session, username: str, password: str
+) -> Optional[CachedAccount]:
+    account = get_auth_account(session, username)
+    if account is None or not secrets.compare_digest(
+        account.password.encode(), password.encode()
+    ):
+        return None
+    return account
+
+
+def invalidate_account_caches() -> None:
+    user_id_by_phone_cache.invalidate()
+    auth_account_cache.invalidate()
+    distributor_directory.invalidate()
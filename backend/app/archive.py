@@ -0,0 +1,126 @@
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.config import ARCHIVE_CONFIG
+from app.db import upsert
+from app.models import Order, OrderArchive, OrderLine, OrderSalesArchive
+from app.order_queries import (
+    ORDER_ITEMS_CHUNK,
+    load_order_item_dicts,
+    pack_order_items,
+)
+from app.serialization import rows_as_dicts
+
+logger = logging.getLogger("uvicorn.error")
+
+ARCHIVED_STATUS = "已完成"
+ARCHIVE_COLUMNS = tuple(
+    column.name for column in OrderArchive.__table__.columns if column.name != "items"
+)
+
+
+def archive_cutoff(months: int, now: Optional[datetime] = None) -> datetime:
+    # Cut on a month boundary so a month's completion bucket is never split
+    # between hot and archived orders.
+    now = now or datetime.utcnow()
+    month_index = now.year * 12 + now.month - 1 - months
+    return datetime(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _record_archived_sales(
+    session: Session, sales: dict[tuple[str, str, int], list]
+) -> None:
+    table = OrderSalesArchive.__table__
+    for (distributor_code, status, product_id), (name, units, revenue) in sales.items():
+        statement = upsert(session, table).values(
+            distributor_code=distributor_code,
+            status=status,
+            product_id=product_id,
+            name=name,
+            units=units,
+            revenue=revenue,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["distributor_code", "status", "product_id"],
+            set_={
+                "name": name,
+                "units": table.c.units + units,
+                "revenue": table.c.revenue + revenue,
+            },
+        )
+        session.exec(statement)
+
+
+def archive_order_batch(session: Session, cutoff: datetime, batch_size: int) -> int:
+    rows = rows_as_dicts(
+        session.exec(
+            select(*(getattr(Order, name) for name in ARCHIVE_COLUMNS))
+            .where(
+                Order.status == ARCHIVED_STATUS,
+                Order.created_at < cutoff,
+                func.coalesce(Order.completed_at, Order.created_at) < cutoff,
+            )
+            .order_by(Order.created_at, Order.id)
+            .limit(batch_size)
+            .with_for_update()
+        ).all()
+    )
+    if not rows:
+        return 0
+    order_ids = [row["id"] for row in rows]
+    items = load_order_item_dicts(session, order_ids)
+
+    # Order lines only survive as compressed JSON, so their product sales are
+    # folded into order_sales_archive for the admin reports.
+    sales: dict[tuple[str, str, int], list] = {}
+    for row in rows:
+        for item in items.get(row["id"], []):
+            key = (row["distributor_code"] or "", row["status"], item["id"])
+            entry = sales.setdefault(key, [item["name"], 0, 0.0])
+            entry[1] += item["quantity"]
+            entry[2] += item["price"] * item["quantity"]
+    session.exec(
+        insert(OrderArchive.__table__),
+        params=[
+            {**row, "items": pack_order_items(items.get(row["id"], []))}
+            for row in rows
+        ],
+    )
+    _record_archived_sales(session, sales)
+    for start in range(0, len(order_ids), ORDER_ITEMS_CHUNK):
+        chunk = order_ids[start : start + ORDER_ITEMS_CHUNK]
+        session.exec(delete(OrderLine).where(OrderLine.order_id.in_(chunk)))
+        session.exec(delete(Order).where(Order.id.in_(chunk)))
+    return len(rows)
+
+
+def archive_orders(
+    db_engine: Engine,
+    months: int = ARCHIVE_CONFIG["after_months"],
+    batch_size: int = ARCHIVE_CONFIG["batch_size"],
+    pause_ms: int = ARCHIVE_CONFIG["pause_ms"],
+) -> int:
+    cutoff = archive_cutoff(months)
+    archived = 0
+    while True:
+        # One short write transaction per batch, with a pause in between, so
+        # checkout and status updates are never queued behind the whole run.
+        with db_engine.connect() as connection:
+            if connection.dialect.name == "sqlite":
+                connection.exec_driver_sql("BEGIN IMMEDIATE")
+            with Session(bind=connection) as session:
+                count = archive_order_batch(session, cutoff, batch_size)
+                session.flush()
+            connection.commit()
+        archived += count
+        if count < batch_size:
+            break
+        logger.info("Archived %s orders completed before %s", archived, cutoff.date())
+        time.sleep(pause_ms / 1000)
+    return archived
@@ -0,0 +1,162 @@
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from sqlalchemy import insert, text, update
+from sqlmodel import Session, SQLModel, select
+
+from app.accounts import invalidate_account_caches
+from app.config import AUTH_CONFIG, DATABASE_CONFIG
+from app.db import engine
+from app.importer import import_products, iter_product_rows
+from app.migrations import apply_migrations
+from app.models import AuthAccount, Product, User
+from app.shards import shard_router
+
+logger = logging.getLogger("uvicorn.error")
+
+XLSX_PATH = Path(__file__).resolve().parent / "商品.xlsx"
+BOOTSTRAP_LOCK_TIMEOUT_MS = 300_000
+BOOTSTRAP_LOCK_KEY = 0x5307_9A11
+
+
+@contextmanager
+def bootstrap_session() -> Iterator[Session]:
+    with engine.connect() as connection:
+        dialect = connection.dialect.name
+        if dialect == "sqlite":
+            connection.exec_driver_sql(
+                f"PRAGMA busy_timeout = {BOOTSTRAP_LOCK_TIMEOUT_MS}"
+            )
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+        elif dialect == "postgresql":
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"), {"key": BOOTSTRAP_LOCK_KEY}
+            )
+        try:
+            with Session(bind=connection) as session:
+                yield session
+                session.flush()
+            connection.commit()
+        finally:
+            if dialect == "sqlite":
+                busy_timeout = DATABASE_CONFIG["sqlite_pragmas"]["busy_timeout"]
+                connection.exec_driver_sql(f"PRAGMA busy_timeout = {busy_timeout}")
+
+
+@contextmanager
+def _phase(name: str, timings: dict[str, float]) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = (time.perf_counter() - started) * 1000
+        logger.info("bootstrap phase %s took %.1f ms", name, timings[name])
+
+
+def ensure_indexes(session: Session) -> None:
+    connection = session.connection()
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def seed_accounts(session: Session) -> None:
+    users_by_phone = {}
+    for account in AUTH_CONFIG:
+        user_payload = account["user"]
+        users_by_phone[user_payload["phone"]] = {
+            "name": user_payload["name"],
+            "phone": user_payload["phone"],
+            "role": account["role"],
+            "pickup_address": user_payload.get("pickup_address"),
+        }
+    existing = {
+        user.phone: user
+        for user in session.exec(
+            select(User).where(User.phone.in_(list(users_by_phone)))
+        ).all()
+    }
+    inserts = []
+    updates = []
+    for phone, payload in users_by_phone.items():
+        user = existing.get(phone)
+        if user is None:
+            inserts.append(payload)
+        elif any(getattr(user, key) != value for key, value in payload.items()):
+            updates.append({"id": user.id, **payload})
+    if inserts:
+        session.exec(insert(User), params=inserts)
+    if updates:
+        session.exec(update(User), params=updates)
+
+    user_ids = dict(
+        session.exec(
+            select(User.phone, User.id).where(User.phone.in_(list(users_by_phone)))
+        ).all()
+    )
+    existing_usernames = set(
+        session.exec(
+            select(AuthAccount.username).where(
+                AuthAccount.username.in_([account["username"] for account in AUTH_CONFIG])
+            )
+        ).all()
+    )
+    accounts = [
+        {
+            "username": account["username"],
+            "password": account["password"],
+            "role": account["role"],
+            "user_id": user_ids[account["user"]["phone"]],
+        }
+        for account in AUTH_CONFIG
+        if account["username"] not in existing_usernames
+    ]
+    if accounts:
+        session.exec(insert(AuthAccount), params=accounts)
+    if updates or accounts:
+        invalidate_account_caches()
+
+
+def seed_products(session: Session) -> None:
+    has_products = session.exec(select(Product.id).limit(1)).first() is not None
+    if not has_products and XLSX_PATH.exists():
+        import_products(session, iter_product_rows(XLSX_PATH))
+
+
+def _prepare_schema(session: Session, timings: dict[str, float]) -> list[str]:
+    with _phase("schema", timings):
+        SQLModel.metadata.create_all(session.connection())
+    with _phase("migrations", timings):
+        applied = apply_migrations(session)
+    with _phase("indexes", timings):
+        ensure_indexes(session)
+    if shard_router.enabled:
+        with _phase("shards", timings):
+            shard_router.prepare()
+    if applied:
+        logger.info("applied migrations: %s", ", ".join(applied))
+    return applied
+
+
+def init_db() -> dict[str, float]:
+    timings: dict[str, float] = {}
+    with bootstrap_session() as session:
+        _prepare_schema(session, timings)
+    return timings
+
+
+def run_bootstrap() -> dict[str, float]:
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    with bootstrap_session() as session:
+        _prepare_schema(session, timings)
+        with _phase("accounts", timings):
+            seed_accounts(session)
+        with _phase("products", timings):
+            seed_products(session)
+    timings["total"] = (time.perf_counter() - started) * 1000
+    logger.info("bootstrap finished in %.1f ms", timings["total"])
+    return timings
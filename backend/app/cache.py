@@ -0,0 +1,166 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+
+@dataclass(frozen=True)
+class CachedPayload:
+    body: bytes
+    etag: str
+    version: int
+    expires_at: float
+
+
+class ResponseCache:
+    def __init__(self, name: str, ttl: Optional[float] = None) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._version = 0
+        self._entries: dict[str, CachedPayload] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str = "") -> Optional[CachedPayload]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != self._version:
+                return None
+            if entry.expires_at < time.monotonic():
+                return None
+            return entry
+
+    def put(
+        self, body: bytes, key: str = "", version: Optional[int] = None
+    ) -> CachedPayload:
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        expires_at = time.monotonic() + self.ttl if self.ttl else float("inf")
+        with self._lock:
+            entry = CachedPayload(
+                body=body,
+                etag=etag,
+                version=self._version if version is None else version,
+                expires_at=expires_at,
+            )
+            if entry.version == self._version:
+                self._entries[key] = entry
+        return entry
+
+    async def get_or_build(
+        self, builder: Callable[[], Awaitable[bytes]], key: str = ""
+    ) -> CachedPayload:
+        entry = self.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        version = self._version
+        return self.put(await builder(), key, version)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        with self._lock:
+            self.invalidations += 1
+            if key is None:
+                self._version += 1
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = len(self._entries)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "entries": entries,
+            "version": self._version,
+        }
+
+
+class LRUCache:
+    def __init__(self, name: str, maxsize: int = 1024) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._version = 0
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            self.invalidations += 1
+            if key is None:
+                self._version += 1
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "version": self._version,
+            }
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def cached_json_response(request: Request, entry: CachedPayload) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+product_cache = ResponseCache("products", ttl=60)
+supplier_cache = ResponseCache("suppliers")
+storefront_cache = ResponseCache("storefront", ttl=10)
+user_id_by_phone_cache = LRUCache("user_id_by_phone", maxsize=10_000)
+auth_account_cache = LRUCache("auth_accounts", maxsize=256)
+
+CACHES = {
+    cache.name: cache
+    for cache in (
+        product_cache,
+        supplier_cache,
+        storefront_cache,
+        user_id_by_phone_cache,
+        auth_account_cache,
+    )
+}
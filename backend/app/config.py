@@ -1,3 +1,5 @@
+import os
+
 CONFIG = {
     "admin": {
         "username": "jason",
@@ -77,3 +79,55 @@ DISTRIBUTOR_CODE_BY_USERNAME = {
     supplier["distributor"]["username"]: supplier["distributor"]["code"]
     for supplier in CONFIG["suppliers"]
 }
+
+DATABASE_CONFIG = {
+    "url": os.getenv("SHOPMALL_DATABASE_URL", "sqlite:///./shopmall.db"),
+    "async_url": os.getenv("SHOPMALL_ASYNC_DATABASE_URL"),
+    "pool_size": int(os.getenv("SHOPMALL_DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("SHOPMALL_DB_MAX_OVERFLOW", "20")),
+    "pool_timeout": int(os.getenv("SHOPMALL_DB_POOL_TIMEOUT", "30")),
+    "sqlite_pragmas": {
+        "journal_mode": os.getenv("SHOPMALL_SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SHOPMALL_SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": int(os.getenv("SHOPMALL_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "cache_size": int(os.getenv("SHOPMALL_SQLITE_CACHE_SIZE", "-65536")),
+        "mmap_size": int(os.getenv("SHOPMALL_SQLITE_MMAP_SIZE", "268435456")),
+        "temp_store": os.getenv("SHOPMALL_SQLITE_TEMP_STORE", "MEMORY"),
+    },
+}
+
+EVENT_CONFIG = {
+    "backend": os.getenv("SHOPMALL_EVENT_BACKEND", "memory"),
+    "queue_size": int(os.getenv("SHOPMALL_EVENT_QUEUE_SIZE", "256")),
+    "heartbeat_seconds": float(os.getenv("SHOPMALL_EVENT_HEARTBEAT_SECONDS", "15")),
+    "poll_interval": float(os.getenv("SHOPMALL_EVENT_POLL_INTERVAL", "0.5")),
+    "retention_seconds": int(os.getenv("SHOPMALL_EVENT_RETENTION_SECONDS", "600")),
+}
+
+SERIALIZATION_CONFIG = {
+    "fast_path": os.getenv("SHOPMALL_FAST_SERIALIZATION", "1") != "0",
+}
+
+METRICS_CONFIG = {
+    "enabled": os.getenv("SHOPMALL_METRICS", "1") != "0",
+    "slow_query_ms": float(os.getenv("SHOPMALL_SLOW_QUERY_MS", "100")),
+    "n_plus_one_threshold": int(os.getenv("SHOPMALL_N_PLUS_ONE_THRESHOLD", "10")),
+}
+
+IMAGE_CONFIG = {
+    "variant_dir": os.getenv("SHOPMALL_IMAGE_VARIANT_DIR"),
+    "workers": int(os.getenv("SHOPMALL_IMAGE_WORKERS", "2")),
+}
+
+SHARD_CONFIG = {
+    "enabled": os.getenv("SHOPMALL_SHARDING", "0") == "1",
+    "url_template": os.getenv(
+        "SHOPMALL_SHARD_URL_TEMPLATE", "sqlite:///./shopmall-{code}.db"
+    ),
+}
+
+ARCHIVE_CONFIG = {
+    "after_months": int(os.getenv("SHOPMALL_ARCHIVE_AFTER_MONTHS", "12")),
+    "batch_size": int(os.getenv("SHOPMALL_ARCHIVE_BATCH_SIZE", "500")),
+    "pause_ms": int(os.getenv("SHOPMALL_ARCHIVE_PAUSE_MS", "50")),
+}
@@ -1,39 +1,166 @@
-from collections.abc import Generator
-
-from sqlalchemy import text
-from sqlmodel import Session, SQLModel, create_engine
-
-DATABASE_URL = "sqlite:///./shopmall.db"
-engine = create_engine(DATABASE_URL, echo=False)
-
-
-def init_db() -> None:
-    SQLModel.metadata.create_all(engine)
-    with engine.begin() as connection:
-        result = connection.execute(text("PRAGMA table_info(user)"))
-        columns = {row._mapping["name"] for row in result}
-        if "pickup_address" not in columns:
-            connection.execute(
-                text("ALTER TABLE user ADD COLUMN pickup_address VARCHAR")
-            )
-
-        order_result = connection.execute(text('PRAGMA table_info("order")'))
-        order_columns = {row._mapping["name"] for row in order_result}
-        if "order_number" not in order_columns:
-            connection.execute(text('ALTER TABLE "order" ADD COLUMN order_number VARCHAR'))
-        if "items" not in order_columns:
-            connection.execute(text('ALTER TABLE "order" ADD COLUMN items TEXT'))
-        if "completed_at" not in order_columns:
-            connection.execute(
-                text('ALTER TABLE "order" ADD COLUMN completed_at TIMESTAMP')
-            )
-            connection.execute(
-                text(
-                    'UPDATE "order" SET completed_at = created_at WHERE status = "已完成"'
-                )
-            )
+from collections.abc import AsyncGenerator, Generator
 
+from sqlalchemy import Table, event, text
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import DATABASE_CONFIG
+
+SQLITE_PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "busy_timeout",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, pragmas: dict) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name in SQLITE_PRAGMAS:
+            value = pragmas.get(name)
+            if value is None:
+                continue
+            if isinstance(value, str) and not value.isalnum():
+                raise ValueError(f"Invalid value for PRAGMA {name}: {value!r}")
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def _attach_databases(dbapi_connection, attachments: dict[str, str]) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for alias, path in attachments.items():
+            if not alias.isidentifier():
+                raise ValueError(f"Invalid database alias: {alias!r}")
+            cursor.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
+    finally:
+        cursor.close()
+
+
+def create_db_engine(settings: dict = DATABASE_CONFIG) -> Engine:
+    url = make_url(settings["url"])
+    if url.get_backend_name() != "sqlite":
+        return create_engine(
+            url,
+            echo=False,
+            pool_size=settings["pool_size"],
+            max_overflow=settings["max_overflow"],
+            pool_timeout=settings["pool_timeout"],
+            pool_pre_ping=True,
+        )
+
+    pragmas = settings["sqlite_pragmas"]
+    sqlite_engine = create_engine(
+        url,
+        echo=False,
+        poolclass=QueuePool,
+        pool_size=settings["pool_size"],
+        max_overflow=settings["max_overflow"],
+        pool_timeout=settings["pool_timeout"],
+        connect_args={
+            "check_same_thread": False,
+            "timeout": pragmas["busy_timeout"] / 1000,
+        },
+    )
+
+    @event.listens_for(sqlite_engine, "connect")
+    def on_connect(dbapi_connection, connection_record) -> None:
+        _apply_sqlite_pragmas(dbapi_connection, pragmas)
+        _attach_databases(dbapi_connection, settings.get("attach", {}))
+
+    return sqlite_engine
+
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(settings: dict = DATABASE_CONFIG) -> URL:
+    if settings.get("async_url"):
+        return make_url(settings["async_url"])
+    url = make_url(settings["url"])
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def create_async_db_engine(settings: dict = DATABASE_CONFIG) -> AsyncEngine:
+    url = async_database_url(settings)
+    if url.get_backend_name() != "sqlite":
+        return create_async_engine(
+            url,
+            echo=False,
+            pool_size=settings["pool_size"],
+            max_overflow=settings["max_overflow"],
+            pool_timeout=settings["pool_timeout"],
+            pool_pre_ping=True,
+        )
+
+    pragmas = settings["sqlite_pragmas"]
+    sqlite_engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings["pool_size"],
+        max_overflow=settings["max_overflow"],
+        pool_timeout=settings["pool_timeout"],
+        connect_args={"timeout": pragmas["busy_timeout"] / 1000},
+    )
+
+    @event.listens_for(sqlite_engine.sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record) -> None:
+        _apply_sqlite_pragmas(dbapi_connection, pragmas)
+        _attach_databases(dbapi_connection, settings.get("attach", {}))
+
+    return sqlite_engine
+
+
+DATABASE_URL = DATABASE_CONFIG["url"]
+engine = create_db_engine()
+async_engine = create_async_db_engine()
 
 def get_session() -> Generator[Session, None, None]:
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSession(async_engine) as session:
+        yield session
+
+
+def upsert(session: Session, table: Table):
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def database_diagnostics(db_engine: Engine = engine) -> dict:
+    diagnostics = {
+        "url": db_engine.url.render_as_string(hide_password=True),
+        "dialect": db_engine.dialect.name,
+        "pool_class": type(db_engine.pool).__name__,
+        "pool_size": DATABASE_CONFIG["pool_size"],
+        "max_overflow": DATABASE_CONFIG["max_overflow"],
+        "pool_timeout": DATABASE_CONFIG["pool_timeout"],
+        "pool_status": db_engine.pool.status(),
+        "pragmas": {},
+    }
+    if db_engine.dialect.name == "sqlite":
+        with db_engine.connect() as connection:
+            for name in SQLITE_PRAGMAS:
+                diagnostics["pragmas"][name] = connection.execute(
+                    text(f"PRAGMA {name}")
+                ).scalar()
+    return diagnostics
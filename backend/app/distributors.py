@@ -0,0 +1,76 @@
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import DISTRIBUTOR_CODE_BY_USERNAME
+from app.db import engine
+from app.models import AuthAccount, User
+
+
+@dataclass(frozen=True)
+class DistributorEntry:
+    user_id: int
+    code: Optional[str]
+    name: str
+    pickup_address: Optional[str]
+
+
+class DistributorDirectory:
+    def __init__(self) -> None:
+        self.loads = 0
+        self._entries: dict[int, DistributorEntry] = {}
+        self._stale = True
+        self._lock = threading.Lock()
+
+    @property
+    def stale(self) -> bool:
+        return self._stale
+
+    def load(self, session: Session) -> None:
+        rows = session.exec(
+            select(User, AuthAccount.username)
+            .join(AuthAccount, AuthAccount.user_id == User.id, isouter=True)
+            .where(User.role == "distributor")
+        ).all()
+        entries = {}
+        for user, username in rows:
+            if user.id in entries and entries[user.id].code is not None:
+                continue
+            entries[user.id] = DistributorEntry(
+                user_id=user.id,
+                code=(
+                    DISTRIBUTOR_CODE_BY_USERNAME.get(username, username)
+                    if username
+                    else None
+                ),
+                name=user.name,
+                pickup_address=user.pickup_address,
+            )
+        with self._lock:
+            self._entries = entries
+            self._stale = False
+            self.loads += 1
+
+    def refresh(self) -> None:
+        with Session(engine) as session:
+            self.load(session)
+
+    def invalidate(self) -> None:
+        self._stale = True
+
+    def get(self, user_id: int) -> Optional[DistributorEntry]:
+        return self._entries.get(user_id)
+
+
+distributor_directory = DistributorDirectory()
+
+
+async def resolve_distributor(
+    session: AsyncSession, user_id: int
+) -> Optional[DistributorEntry]:
+    if distributor_directory.stale:
+        await session.run_sync(distributor_directory.load)
+    return distributor_directory.get(user_id)
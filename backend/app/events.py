@@ -0,0 +1,315 @@
+import asyncio
+import itertools
+import logging
+import threading
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Protocol
+
+from sqlalchemy import delete, event, func
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import EVENT_CONFIG
+from app.models import OrderEventLog
+from app.schemas import OrderRead
+from app.shards import shard_router
+
+logger = logging.getLogger("uvicorn.error")
+
+ORDER_CREATED = "order.created"
+ORDER_UPDATED = "order.updated"
+PENDING_EVENTS_KEY = "pending_order_events"
+SSE_RETRY_MS = 3000
+
+
+@dataclass(frozen=True)
+class OrderEvent:
+    type: str
+    distributor_code: Optional[str]
+    data: str
+    id: int = 0
+
+    def encode(self) -> bytes:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {self.data}\n\n".encode()
+
+
+READY = f"retry: {SSE_RETRY_MS}\nevent: ready\ndata: {{}}\n\n".encode()
+RESYNC = b"event: resync\ndata: {}\n\n"
+HEARTBEAT = b": keepalive\n\n"
+
+Dispatch = Callable[[OrderEvent], None]
+
+
+class EventBackend(Protocol):
+    name: str
+
+    def record(self, session: Session, order_event: OrderEvent) -> None: ...
+
+    async def start(self, dispatch: Dispatch) -> None: ...
+
+    async def stop(self) -> None: ...
+
+
+class MemoryEventBackend:
+    name = "memory"
+
+    def __init__(self) -> None:
+        self._dispatch: Optional[Dispatch] = None
+        self._ids = itertools.count(1)
+
+    def record(self, session: Session, order_event: OrderEvent) -> None:
+        pending = session.info.get(PENDING_EVENTS_KEY)
+        if pending is None:
+            pending = session.info[PENDING_EVENTS_KEY] = []
+            event.listen(session, "after_commit", self._flush)
+            event.listen(session, "after_rollback", self._discard)
+        pending.append(order_event)
+
+    def _flush(self, session: Session) -> None:
+        pending = session.info.get(PENDING_EVENTS_KEY) or []
+        session.info[PENDING_EVENTS_KEY] = []
+        if self._dispatch is None:
+            return
+        for order_event in pending:
+            self._dispatch(
+                OrderEvent(
+                    type=order_event.type,
+                    distributor_code=order_event.distributor_code,
+                    data=order_event.data,
+                    id=next(self._ids),
+                )
+            )
+
+    def _discard(self, session: Session) -> None:
+        session.info[PENDING_EVENTS_KEY] = []
+
+    async def start(self, dispatch: Dispatch) -> None:
+        self._dispatch = dispatch
+
+    async def stop(self) -> None:
+        self._dispatch = None
+
+
+class DatabaseEventBackend:
+    name = "database"
+
+    def __init__(
+        self,
+        db_engines: Optional[list[AsyncEngine]] = None,
+        poll_interval: float = EVENT_CONFIG["poll_interval"],
+        retention: timedelta = timedelta(seconds=EVENT_CONFIG["retention_seconds"]),
+    ) -> None:
+        # Events are written in the same transaction as the order, so with
+        # sharding enabled every shard keeps its own log and is polled here.
+        self.db_engines = db_engines or [
+            shard.async_engine for shard in shard_router.shards
+        ]
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._last_ids = [0] * len(self.db_engines)
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, session: Session, order_event: OrderEvent) -> None:
+        session.add(
+            OrderEventLog(
+                type=order_event.type,
+                distributor_code=order_event.distributor_code,
+                data=order_event.data,
+                created_at=datetime.utcnow(),
+            )
+        )
+
+    async def start(self, dispatch: Dispatch) -> None:
+        for position, db_engine in enumerate(self.db_engines):
+            async with AsyncSession(db_engine) as session:
+                latest = (await session.exec(select(func.max(OrderEventLog.id)))).one()
+            self._last_ids[position] = latest or 0
+        self._task = asyncio.create_task(self._poll(dispatch))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _poll(self, dispatch: Dispatch) -> None:
+        polls = 0
+        while True:
+            polls += 1
+            for position, db_engine in enumerate(self.db_engines):
+                try:
+                    await self._poll_engine(db_engine, position, dispatch, polls % 120 == 0)
+                except Exception:
+                    logger.exception("order event poll failed")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _poll_engine(
+        self, db_engine: AsyncEngine, position: int, dispatch: Dispatch, prune: bool
+    ) -> None:
+        async with AsyncSession(db_engine) as session:
+            rows = (
+                await session.exec(
+                    select(OrderEventLog)
+                    .where(OrderEventLog.id > self._last_ids[position])
+                    .order_by(OrderEventLog.id)
+                )
+            ).all()
+            for row in rows:
+                dispatch(
+                    OrderEvent(
+                        type=row.type,
+                        distributor_code=row.distributor_code,
+                        data=row.data,
+                        id=row.id,
+                    )
+                )
+                self._last_ids[position] = row.id
+            if prune:
+                await session.exec(
+                    delete(OrderEventLog).where(
+                        OrderEventLog.created_at < datetime.utcnow() - self.retention
+                    )
+                )
+                await session.commit()
+
+
+EVENT_BACKENDS: dict[str, Callable[[], EventBackend]] = {
+    MemoryEventBackend.name: MemoryEventBackend,
+    DatabaseEventBackend.name: DatabaseEventBackend,
+}
+
+
+class Subscription:
+    def __init__(self, distributor_code: Optional[str], maxsize: int) -> None:
+        self.distributor_code = distributor_code
+        self.maxsize = maxsize
+        self.queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+
+    def wants(self, order_event: OrderEvent) -> bool:
+        return (
+            self.distributor_code is None
+            or order_event.distributor_code == self.distributor_code
+        )
+
+    def offer(self, message: Optional[bytes]) -> bool:
+        if message is not None and self.queue.qsize() >= self.maxsize:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            return False
+        self.queue.put_nowait(message)
+        return True
+
+
+class OrderEventHub:
+    def __init__(
+        self,
+        backend: EventBackend,
+        queue_size: int = EVENT_CONFIG["queue_size"],
+        heartbeat: float = EVENT_CONFIG["heartbeat_seconds"],
+    ) -> None:
+        self.backend = backend
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.published = 0
+        self.delivered = 0
+        self.resyncs = 0
+        self._subscribers: set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def record(self, session: Session, order_event: OrderEvent) -> None:
+        self.backend.record(session, order_event)
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        await self.backend.start(self.dispatch)
+
+    async def stop(self) -> None:
+        await self.backend.stop()
+        self._loop = None
+        for subscription in list(self._subscribers):
+            subscription.offer(None)
+
+    def dispatch(self, order_event: OrderEvent) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        with self._lock:
+            self.published += 1
+        loop.call_soon_threadsafe(self._fanout, order_event)
+
+    def _fanout(self, order_event: OrderEvent) -> None:
+        message = order_event.encode()
+        for subscription in list(self._subscribers):
+            if not subscription.wants(order_event):
+                continue
+            if subscription.offer(message):
+                self.delivered += 1
+            else:
+                self.resyncs += 1
+                self._subscribers.discard(subscription)
+
+    async def stream(self, distributor_code: Optional[str] = None) -> AsyncIterator[bytes]:
+        subscription = Subscription(distributor_code, self.queue_size)
+        self._subscribers.add(subscription)
+        try:
+            yield READY
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.queue.get(), self.heartbeat
+                    )
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                if message is None:
+                    return
+                yield message
+                if message is RESYNC:
+                    return
+        finally:
+            self._subscribers.discard(subscription)
+
+    def stats(self) -> dict:
+        with self._lock:
+            published = self.published
+        return {
+            "backend": self.backend.name,
+            "subscribers": len(self._subscribers),
+            "published": published,
+            "delivered": self.delivered,
+            "resyncs": self.resyncs,
+        }
+
+
+def create_event_hub(settings: dict = EVENT_CONFIG) -> OrderEventHub:
+    backend_name = settings["backend"]
+    if backend_name not in EVENT_BACKENDS:
+        raise ValueError(f"Unknown order event backend {backend_name!r}")
+    return OrderEventHub(
+        EVENT_BACKENDS[backend_name](),
+        queue_size=settings["queue_size"],
+        heartbeat=settings["heartbeat_seconds"],
+    )
+
+
+order_events = create_event_hub()
+
+
+def record_order_event(session: Session, event_type: str, order: OrderRead) -> None:
+    order_events.record(
+        session,
+        OrderEvent(
+            type=event_type,
+            distributor_code=order.distributor_code,
+            data=order.model_dump_json(),
+        ),
+    )
@@ -0,0 +1,205 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from fastapi.staticfiles import StaticFiles
+from sqlmodel import Session, select
+
+from app.cache import product_cache, storefront_cache
+from app.config import IMAGE_CONFIG
+from app.db import engine
+from app.models import Product
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger("uvicorn.error")
+
+IMAGE_DIR = Path(__file__).resolve().parent / "images"
+VARIANT_DIR = Path(IMAGE_CONFIG["variant_dir"] or IMAGE_DIR.parent / "image_variants")
+IMAGE_URL_PREFIX = "/images/"
+VARIANT_URL_PREFIX = "/images/v/"
+IMAGE_VARIANTS = {"thumb": 200, "medium": 600}
+PIPELINE_VERSION = b"1"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ImmutableStaticFiles(StaticFiles):
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+def _encode(image, format: str, **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, **options)
+    return buffer.getvalue()
+
+
+class ImageDerivatives:
+    def __init__(
+        self,
+        source_dir: Path = IMAGE_DIR,
+        variant_dir: Path = VARIANT_DIR,
+        variants: dict[str, int] = IMAGE_VARIANTS,
+        max_workers: int = IMAGE_CONFIG["workers"],
+    ) -> None:
+        self.source_dir = source_dir
+        self.variant_dir = variant_dir
+        self.variants = variants
+        self.max_workers = max_workers
+        self.generated = 0
+        self.failures = 0
+        self._ready: dict[str, tuple[tuple[int, int], dict[str, dict]]] = {}
+        self._pending: set[str] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return Image is not None
+
+    def _source_name(self, image_url: Optional[str]) -> Optional[str]:
+        if not image_url or not image_url.startswith(IMAGE_URL_PREFIX):
+            return None
+        name = image_url[len(IMAGE_URL_PREFIX) :]
+        if not name or "/" in name or name.startswith("."):
+            return None
+        return name
+
+    def _stat_key(self, name: str) -> Optional[tuple[int, int]]:
+        try:
+            stat = (self.source_dir / name).stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def variants_for(self, image_url: Optional[str]) -> dict[str, dict]:
+        name = self._source_name(image_url)
+        if name is None or not self.enabled:
+            return {}
+        stat_key = self._stat_key(name)
+        if stat_key is None:
+            return {}
+        with self._lock:
+            ready = self._ready.get(name)
+        if ready is not None and ready[0] == stat_key:
+            return ready[1]
+        self.schedule(image_url)
+        return {}
+
+    def schedule(self, image_url: Optional[str]) -> None:
+        name = self._source_name(image_url)
+        if name is None or not self.enabled:
+            return
+        with self._lock:
+            if name in self._pending:
+                return
+            self._pending.add(name)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="image-variants"
+                )
+            self._executor.submit(self._generate, name)
+
+    def _generate(self, name: str) -> None:
+        try:
+            stat_key = self._stat_key(name)
+            if stat_key is None:
+                return
+            variants = self._render(name)
+            with self._lock:
+                self._ready[name] = (stat_key, variants)
+            product_cache.invalidate()
+            storefront_cache.invalidate()
+        except Exception:
+            self.failures += 1
+            logger.exception("failed to build image variants for %s", name)
+        finally:
+            with self._lock:
+                self._pending.discard(name)
+
+    def _render(self, name: str) -> dict[str, dict]:
+        source = self.source_dir / name
+        data = source.read_bytes()
+        digest = hashlib.sha256(PIPELINE_VERSION + data).hexdigest()[:16]
+        stem = source.stem
+        self.variant_dir.mkdir(parents=True, exist_ok=True)
+        variants = {}
+        with Image.open(io.BytesIO(data)) as opened:
+            has_alpha = opened.mode in ("RGBA", "LA") or (
+                opened.mode == "P" and "transparency" in opened.info
+            )
+            original = opened.convert("RGBA" if has_alpha else "RGB")
+            fallback_format, fallback_ext = ("PNG", "png") if has_alpha else ("JPEG", "jpg")
+            for label, width in self.variants.items():
+                if original.width > width:
+                    height = max(round(original.height * width / original.width), 1)
+                    image = original.resize((width, height), Image.LANCZOS)
+                else:
+                    image = original
+                webp_name = f"{stem}-{label}-{digest}.webp"
+                fallback_name = f"{stem}-{label}-{digest}.{fallback_ext}"
+                webp_path = self.variant_dir / webp_name
+                fallback_path = self.variant_dir / fallback_name
+                if not webp_path.exists():
+                    _write_atomic(webp_path, _encode(image, "WEBP", quality=80, method=4))
+                    self.generated += 1
+                if not fallback_path.exists():
+                    options = {"optimize": True}
+                    if fallback_format == "JPEG":
+                        options["quality"] = 82
+                    _write_atomic(fallback_path, _encode(image, fallback_format, **options))
+                    self.generated += 1
+                variants[label] = {
+                    "width": image.width,
+                    "url": VARIANT_URL_PREFIX + fallback_name,
+                    "webp_url": VARIANT_URL_PREFIX + webp_name,
+                }
+        return variants
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "ready": len(self._ready),
+                "pending": len(self._pending),
+                "generated": self.generated,
+                "failures": self.failures,
+            }
+
+
+image_derivatives = ImageDerivatives()
+
+
+def attach_image_variants(products: list[dict]) -> list[dict]:
+    for product in products:
+        product["image_variants"] = image_derivatives.variants_for(product["image_url"])
+    return products
+
+
+def warm_image_variants() -> None:
+    with Session(engine) as session:
+        image_urls = session.exec(select(Product.image_url).distinct()).all()
+    for image_url in image_urls:
+        image_derivatives.schedule(image_url)
@@ -0,0 +1,207 @@
+import logging
+import threading
+import time
+import uuid
+import zipfile
+import xml.etree.ElementTree as ET
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import IO, Optional, Union
+
+from sqlalchemy import insert, update
+from sqlmodel import Session, select
+
+from app.cache import product_cache, storefront_cache
+from app.db import engine
+from app.images import image_derivatives
+from app.models import Product
+
+logger = logging.getLogger("uvicorn.error")
+
+XLSX_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+IMPORT_BATCH_SIZE = 500
+PRODUCT_IMPORT_FIELDS = ("category", "price", "image_url", "tags")
+
+
+def _column_to_index(reference: str) -> int:
+    index = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        index = index * 26 + (ord(char.upper()) - ord("A") + 1)
+    return index - 1
+
+
+def _element_text(element: ET.Element) -> str:
+    return "".join(node.text or "" for node in element.iter(f"{XLSX_MAIN_NS}t"))
+
+
+def _iter_shared_strings(workbook: zipfile.ZipFile) -> Iterator[str]:
+    if "xl/sharedStrings.xml" not in workbook.namelist():
+        return
+    with workbook.open("xl/sharedStrings.xml") as stream:
+        for _, element in ET.iterparse(stream, events=("end",)):
+            if element.tag == f"{XLSX_MAIN_NS}si":
+                yield _element_text(element)
+                element.clear()
+
+
+def iter_xlsx_rows(
+    source: Union[str, Path, IO[bytes]], sheet: str = "xl/worksheets/sheet1.xml"
+) -> Iterator[list[Optional[str]]]:
+    with zipfile.ZipFile(source) as workbook:
+        shared_strings = list(_iter_shared_strings(workbook))
+        with workbook.open(sheet) as stream:
+            parser = ET.iterparse(stream, events=("start", "end"))
+            _, root = next(parser)
+            for event, element in parser:
+                if event != "end" or element.tag != f"{XLSX_MAIN_NS}row":
+                    continue
+                values: list[Optional[str]] = []
+                for cell in element.iter(f"{XLSX_MAIN_NS}c"):
+                    index = _column_to_index(cell.get("r") or "")
+                    if index < 0:
+                        continue
+                    while len(values) <= index:
+                        values.append(None)
+                    cell_type = cell.get("t")
+                    if cell_type == "inlineStr":
+                        values[index] = _element_text(cell)
+                        continue
+                    value_node = cell.find(f"{XLSX_MAIN_NS}v")
+                    if value_node is None:
+                        continue
+                    if cell_type == "s":
+                        values[index] = shared_strings[int(value_node.text)]
+                    else:
+                        values[index] = value_node.text
+                root.clear()
+                if values:
+                    yield values
+
+
+def iter_product_rows(source: Union[str, Path, IO[bytes]]) -> Iterator[dict]:
+    rows = iter_xlsx_rows(source)
+    next(rows, None)
+    for row in rows:
+        if not row or not row[0]:
+            continue
+        category = row[1] if len(row) > 1 and row[1] else ""
+        image_name = row[3] if len(row) > 3 else ""
+        yield {
+            "name": row[0],
+            "category": category,
+            "price": float(row[2]) if len(row) > 2 and row[2] else 0.0,
+            "image_url": f"/images/{image_name}" if image_name else "",
+            "tags": category,
+        }
+
+
+@dataclass
+class ImportJob:
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "pending"
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    batches: int = 0
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "elapsed": round(self.elapsed, 3)}
+
+
+def _import_batch(session: Session, batch: dict[str, dict], job: ImportJob) -> None:
+    existing = {
+        product.name: product
+        for product in session.exec(
+            select(Product).where(Product.name.in_(list(batch)))
+        ).all()
+    }
+    inserts = []
+    updates = []
+    for name, payload in batch.items():
+        product = existing.get(name)
+        if product is None:
+            inserts.append(payload)
+        elif any(getattr(product, key) != payload[key] for key in PRODUCT_IMPORT_FIELDS):
+            updates.append({"id": product.id, **payload})
+        else:
+            job.skipped += 1
+    if inserts:
+        session.exec(insert(Product), params=inserts)
+    if updates:
+        session.exec(update(Product), params=updates)
+    session.commit()
+    for payload in inserts + updates:
+        image_derivatives.schedule(payload["image_url"])
+    job.inserted += len(inserts)
+    job.updated += len(updates)
+    job.batches += 1
+
+
+def import_products(
+    session: Session,
+    rows: Iterable[dict],
+    job: Optional[ImportJob] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> ImportJob:
+    job = job or ImportJob()
+    job.status = "running"
+    job.started_at = time.perf_counter()
+    try:
+        batch: dict[str, dict] = {}
+        for row in rows:
+            job.rows += 1
+            if row["name"] in batch:
+                job.skipped += 1
+            batch[row["name"]] = row
+            if len(batch) >= batch_size:
+                _import_batch(session, batch, job)
+                batch = {}
+        if batch:
+            _import_batch(session, batch, job)
+        job.status = "completed"
+    except Exception as error:
+        session.rollback()
+        job.status = "failed"
+        job.error = str(error)
+        raise
+    finally:
+        job.finished_at = time.perf_counter()
+        if job.inserted or job.updated:
+            product_cache.invalidate()
+            storefront_cache.invalidate()
+    return job
+
+
+IMPORT_JOBS: dict[str, ImportJob] = {}
+_IMPORT_JOBS_LOCK = threading.Lock()
+MAX_IMPORT_JOBS = 20
+
+
+def register_import_job() -> ImportJob:
+    job = ImportJob()
+    with _IMPORT_JOBS_LOCK:
+        IMPORT_JOBS[job.id] = job
+        while len(IMPORT_JOBS) > MAX_IMPORT_JOBS:
+            IMPORT_JOBS.pop(next(iter(IMPORT_JOBS)))
+    return job
+
+
+def run_import_job(job: ImportJob, workbook: IO[bytes]) -> None:
+    with workbook, Session(engine) as session:
+        try:
+            import_products(session, iter_product_rows(workbook), job)
+        except Exception:
+            logger.exception("Product import %s failed", job.id)
@@ -0,0 +1,165 @@
+from collections import Counter
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, update
+from sqlmodel import Session, select
+
+from app.db import upsert
+from app.models import DistributorInventory, OrderLine
+from app.schemas import InventoryAdjustment, InventoryItem, OrderItem
+
+INVENTORY_BATCH_SIZE = 1000
+
+
+def _chunks(rows: list[dict], size: int = INVENTORY_BATCH_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def replace_inventory(
+    session: Session, distributor_code: str, items: list[InventoryItem]
+) -> None:
+    table = DistributorInventory.__table__
+    stock_by_product = {item.product_id: item.stock for item in items}
+    rows = [
+        {"distributor_code": distributor_code, "product_id": product_id, "stock": stock}
+        for product_id, stock in stock_by_product.items()
+    ]
+    for batch in _chunks(rows):
+        statement = upsert(session, table).values(batch)
+        session.exec(
+            statement.on_conflict_do_update(
+                index_elements=["distributor_code", "product_id"],
+                set_={"stock": statement.excluded.stock},
+            )
+        )
+    session.exec(
+        delete(DistributorInventory).where(
+            DistributorInventory.distributor_code == distributor_code,
+            DistributorInventory.product_id.not_in(list(stock_by_product)),
+        )
+    )
+
+
+def adjust_inventory(
+    session: Session, distributor_code: str, adjustments: list[InventoryAdjustment]
+) -> list[InventoryItem]:
+    table = DistributorInventory.__table__
+    absolute = {item.product_id: item.stock for item in adjustments if item.delta is None}
+    deltas: dict[int, int] = {}
+    for item in adjustments:
+        if item.delta is not None:
+            deltas[item.product_id] = deltas.get(item.product_id, 0) + item.delta
+
+    results: dict[int, int] = {}
+    absolute_rows = [
+        {"distributor_code": distributor_code, "product_id": product_id, "stock": stock}
+        for product_id, stock in absolute.items()
+    ]
+    for batch in _chunks(absolute_rows):
+        statement = upsert(session, table).values(batch)
+        statement = statement.on_conflict_do_update(
+            index_elements=["distributor_code", "product_id"],
+            set_={"stock": statement.excluded.stock},
+        ).returning(table.c.product_id, table.c.stock)
+        results.update(session.exec(statement).all())
+
+    delta_rows = [
+        {"distributor_code": distributor_code, "product_id": product_id, "stock": delta}
+        for product_id, delta in deltas.items()
+    ]
+    applied: dict[int, int] = {}
+    for batch in _chunks(delta_rows):
+        statement = upsert(session, table).values(batch)
+        statement = statement.on_conflict_do_update(
+            index_elements=["distributor_code", "product_id"],
+            set_={"stock": table.c.stock + statement.excluded.stock},
+            where=table.c.stock + statement.excluded.stock >= 0,
+        ).returning(table.c.product_id, table.c.stock)
+        applied.update(session.exec(statement).all())
+    insufficient = sorted(
+        product_id
+        for product_id in deltas
+        if product_id not in applied or applied[product_id] < 0
+    )
+    if insufficient:
+        session.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Insufficient stock", "product_ids": insufficient},
+        )
+    results.update(applied)
+    return [
+        InventoryItem(product_id=product_id, stock=stock)
+        for product_id, stock in results.items()
+    ]
+
+
+def order_item_quantities(items: list[OrderItem]) -> dict[int, int]:
+    quantities: Counter = Counter()
+    for item in items:
+        quantities[item.id] += item.quantity
+    return dict(quantities)
+
+
+def order_line_quantities(session: Session, order_id: int) -> dict[int, int]:
+    rows = session.exec(
+        select(OrderLine.product_id, func.sum(OrderLine.quantity))
+        .where(OrderLine.order_id == order_id)
+        .group_by(OrderLine.product_id)
+    ).all()
+    return dict(rows)
+
+
+def try_reserve_stock(
+    session: Session, distributor_code: str, quantities: dict[int, int]
+) -> list[int]:
+    insufficient = []
+    reserved = {}
+    for product_id, quantity in sorted(quantities.items()):
+        result = session.exec(
+            update(DistributorInventory)
+            .where(
+                DistributorInventory.distributor_code == distributor_code,
+                DistributorInventory.product_id == product_id,
+                DistributorInventory.stock >= quantity,
+            )
+            .values(stock=DistributorInventory.stock - quantity)
+        )
+        if result.rowcount == 0:
+            insufficient.append(product_id)
+        else:
+            reserved[product_id] = quantity
+    if insufficient and reserved:
+        release_stock(session, distributor_code, reserved)
+    return insufficient
+
+
+def reserve_stock(
+    session: Session, distributor_code: str, quantities: dict[int, int]
+) -> None:
+    insufficient = try_reserve_stock(session, distributor_code, quantities)
+    if insufficient:
+        session.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Insufficient stock", "product_ids": insufficient},
+        )
+
+
+def release_stock(
+    session: Session, distributor_code: str, quantities: dict[int, int]
+) -> None:
+    rows = [
+        {"distributor_code": distributor_code, "product_id": product_id, "stock": quantity}
+        for product_id, quantity in sorted(quantities.items())
+    ]
+    table = DistributorInventory.__table__
+    for batch in _chunks(rows):
+        statement = upsert(session, table).values(batch)
+        session.exec(
+            statement.on_conflict_do_update(
+                index_elements=["distributor_code", "product_id"],
+                set_={"stock": table.c.stock + statement.excluded.stock},
+            )
+        )
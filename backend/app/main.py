@@ -1,40 +1,160 @@
-from datetime import datetime, timedelta
-from pathlib import Path
-import random
-import re
-import zipfile
-import xml.etree.ElementTree as ET
-
-from fastapi import Depends, FastAPI, HTTPException
+import time
+from tempfile import SpooledTemporaryFile
+from typing import Annotated, Literal, Optional
+
+from fastapi import (
+    BackgroundTasks,
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from sqlmodel import Session, select
-from sqlalchemy import delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.bootstrap import run_bootstrap
+from app.accounts import authenticate, get_or_create_phone_user, user_id_for_phone
+from app.cache import (
+    CACHES,
+    cached_json_response,
+    product_cache,
+    storefront_cache,
+    supplier_cache,
+)
+from app.config import METRICS_CONFIG, SUPPLIER_CONFIG
+from app.db import (
+    async_engine,
+    database_diagnostics,
+    engine,
+    get_async_session,
+    get_session,
+)
 
-from app.config import AUTH_CONFIG, DISTRIBUTOR_CODE_BY_USERNAME, SUPPLIER_CONFIG
-from app.db import engine, get_session, init_db
-from app.models import AuthAccount, DistributorInventory, Order, Product, User
+from app.distributors import distributor_directory, resolve_distributor
+from app.events import ORDER_CREATED, order_events, record_order_event
+from app.images import (
+    IMAGE_DIR,
+    VARIANT_DIR,
+    ImmutableStaticFiles,
+    attach_image_variants,
+    image_derivatives,
+    warm_image_variants,
+)
+from app.importer import IMPORT_JOBS, register_import_job, run_import_job
+from app.inventory import (
+    adjust_inventory,
+    order_item_quantities,
+    replace_inventory,
+    reserve_stock,
+)
+from app.metrics import (
+    instrument_engine,
+    metrics,
+    route_template,
+    server_timing,
+    track_request,
+)
+from app.models import (
+    DistributorInventory,
+    Order,
+    OrderArchive,
+    OrderLine,
+    Product,
+    User,
+)
+from app.order_batch import (
+    ORDER_BATCH_ATTEMPTS,
+    create_order_batch,
+    create_sharded_order_batch,
+    existing_orders_by_key,
+)
+from app.order_numbers import (
+    configure_order_numbers,
+    generate_order_number,
+    shutdown_order_numbers,
+)
+from app.order_queries import (
+    NEXT_CURSOR_HEADER,
+    list_orders_across_shards,
+    list_orders_page,
+)
+from app.order_status import (
+    apply_order_status,
+    bulk_update_order_status,
+    merge_bulk_status_results,
+)
+from app.product_search import search_products
 from app.schemas import (
     AuthLoginRequest,
     AuthLoginResponse,
+    CacheStats,
+    CategorySales,
     DashboardSummary,
+    DatabaseDiagnostics,
     DistributorSummary,
+    EventHubStats,
+    ImageDerivativeStats,
     InventoryItem,
+    InventoryPatch,
     InventoryUpdate,
+    OrderBatchCreate,
+    OrderBatchResponse,
+    OrderBulkStatusResult,
+    OrderBulkStatusUpdate,
     OrderCreate,
+    OrderListQuery,
     OrderRead,
     OrderStatusUpdate,
     PhoneLoginRequest,
     ProductCreate,
+    ProductImportStatus,
     ProductRead,
+    ProductSearchPage,
+    ProductSearchQuery,
+    ProductSales,
+    StorefrontPage,
+    StorefrontQuery,
     SupplierRead,
+    UserOrderListQuery,
     UserRead,
 )
+from app.serialization import (
+    FAST_SERIALIZATION,
+    json_response,
+    rows_as_dicts,
+    select_schema,
+)
+from app.shards import shard_router
+from app.storefront import load_storefront, resolve_supplier, storefront_cache_key
+from app.summary import (
+    build_admin_summary,
+    build_distributor_summary,
+    merge_admin_summaries,
+    merge_category_sales,
+    merge_product_sales,
+    record_order_created,
+    sales_by_category,
+    top_products,
+)
 
 app = FastAPI(title="Fireworks Mall API")
 
-IMAGE_DIR = Path(__file__).resolve().parent / "images"
 IMAGE_DIR.mkdir(exist_ok=True)
+VARIANT_DIR.mkdir(parents=True, exist_ok=True)
+app.mount(
+    "/images/v",
+    ImmutableStaticFiles(directory=str(VARIANT_DIR)),
+    name="image_variants",
+)
 app.mount("/images", StaticFiles(directory=str(IMAGE_DIR)), name="images")
 
 @app.middleware("http")
@@ -43,154 +163,62 @@ async def strip_api_prefix(request, call_next):
         request.scope["path"] = request.scope["path"][4:]
     return await call_next(request)
 
+
+if METRICS_CONFIG["enabled"]:
+    for shard in shard_router.shards:
+        instrument_engine(shard.engine)
+        instrument_engine(shard.async_engine.sync_engine)
+
+    @app.middleware("http")
+    async def record_request_metrics(request, call_next):
+        started = time.perf_counter()
+        status = 500
+        with track_request() as stats:
+            try:
+                response = await call_next(request)
+                status = response.status_code
+            finally:
+                elapsed = time.perf_counter() - started
+                metrics.record_request(
+                    request.method, route_template(request.scope), status, elapsed, stats
+                )
+        response.headers["Server-Timing"] = server_timing(elapsed, stats)
+        return response
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
-XLSX_PATH = Path(__file__).resolve().parent / "商品.xlsx"
-XLSX_NS = {"a": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
-
-
-def _column_to_index(column: str) -> int:
-    index = 0
-    for char in column:
-        index = index * 26 + (ord(char) - ord("A") + 1)
-    return index - 1
-
-
-def _load_products_from_xlsx() -> list[dict]:
-    if not XLSX_PATH.exists():
-        return []
-    with zipfile.ZipFile(XLSX_PATH) as workbook:
-        shared = ET.fromstring(workbook.read("xl/sharedStrings.xml"))
-        shared_strings = [
-            "".join(text.text or "" for text in si.iter(f"{{{XLSX_NS['a']}}}t"))
-            for si in shared.iter(f"{{{XLSX_NS['a']}}}si")
-        ]
-        sheet = ET.fromstring(workbook.read("xl/worksheets/sheet1.xml"))
-
-    rows = []
-    for row in sheet.findall("a:sheetData/a:row", XLSX_NS):
-        values: list[str | None] = []
-        for cell in row.findall("a:c", XLSX_NS):
-            ref = cell.get("r") or ""
-            match = re.match(r"([A-Z]+)", ref)
-            if not match:
-                continue
-            index = _column_to_index(match.group(1))
-            while len(values) <= index:
-                values.append(None)
-            value_node = cell.find("a:v", XLSX_NS)
-            if value_node is None:
-                values[index] = None
-                continue
-            if cell.get("t") == "s":
-                values[index] = shared_strings[int(value_node.text)]
-            else:
-                values[index] = value_node.text
-        if values:
-            rows.append(values)
-
-    products = []
-    for row in rows[1:]:
-        if not row or not row[0]:
-            continue
-        name = row[0]
-        category = row[1] if len(row) > 1 else ""
-        price = float(row[2]) if len(row) > 2 and row[2] else 0.0
-        image_name = row[3] if len(row) > 3 else ""
-        products.append(
-            {
-                "name": name,
-                "category": category,
-                "price": price,
-                "image_url": f"/images/{image_name}" if image_name else "",
-                "tags": category or "",
-            }
-        )
-    return products
-
-
-def _generate_order_number() -> str:
-    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    suffix = random.randint(1000, 9999)
-    return f"WD{timestamp}{suffix}"
-
-
 @app.on_event("startup")
 def on_startup() -> None:
-    init_db()
-    with Session(engine) as session:
-        for account in AUTH_CONFIG:
-            user_payload = account["user"]
-            user = session.exec(select(User).where(User.phone == user_payload["phone"])).first()
-            if not user:
-                user = User(
-                    name=user_payload["name"],
-                    phone=user_payload["phone"],
-                    role=account["role"],
-                    pickup_address=user_payload.get("pickup_address"),
-                )
-                session.add(user)
-                session.commit()
-                session.refresh(user)
-            else:
-                user.name = user_payload["name"]
-                user.role = account["role"]
-                user.phone = user_payload["phone"]
-                user.pickup_address = user_payload.get("pickup_address")
-                session.add(user)
-                session.commit()
+    run_bootstrap()
+    configure_order_numbers()
+    distributor_directory.refresh()
+    warm_image_variants()
 
-            existing_account = session.exec(
-                select(AuthAccount).where(AuthAccount.username == account["username"])
-            ).first()
-            if not existing_account:
-                session.add(
-                    AuthAccount(
-                        username=account["username"],
-                        password=account["password"],
-                        role=account["role"],
-                        user_id=user.id,
-                    )
-                )
-                session.commit()
 
-        has_products = bool(session.exec(select(Product)).first())
-        if not has_products:
-            for payload in _load_products_from_xlsx():
-                session.add(Product(**payload))
-            session.commit()
+@app.on_event("startup")
+async def start_order_events() -> None:
+    await order_events.start()
 
-        orders_missing_number = session.exec(
-            select(Order).where(Order.order_number.is_(None))
-        ).all()
-        for order in orders_missing_number:
-            order.order_number = _generate_order_number()
-            session.add(order)
-        if orders_missing_number:
-            session.commit()
 
-        orders_missing_items = session.exec(select(Order).where(Order.items.is_(None))).all()
-        for order in orders_missing_items:
-            order.items = []
-            session.add(order)
-        if orders_missing_items:
-            session.commit()
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await order_events.stop()
+    shutdown_order_numbers()
+    image_derivatives.shutdown()
+    await shard_router.dispose()
+    await async_engine.dispose()
 
 
 @app.post("/auth/login", response_model=AuthLoginResponse)
 def login(payload: AuthLoginRequest, session: Session = Depends(get_session)) -> AuthLoginResponse:
-    account = session.exec(
-        select(AuthAccount).where(
-            AuthAccount.username == payload.username,
-            AuthAccount.password == payload.password,
-        )
-    ).first()
+    account = authenticate(session, payload.username, payload.password)
     if not account or not account.user_id:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     user = session.get(User, account.user_id)
@@ -203,23 +231,48 @@ def login(payload: AuthLoginRequest, session: Session = Depends(get_session)) ->
 def phone_login(
     payload: PhoneLoginRequest, session: Session = Depends(get_session)
 ) -> UserRead:
-    user = session.exec(select(User).where(User.phone == payload.phone)).first()
-    if not user:
-        user = User(name="手机用户", phone=payload.phone, role="customer")
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-    return user
+    return get_or_create_phone_user(session, payload.phone)
 
 
 @app.get("/users", response_model=list[UserRead])
 def list_users(session: Session = Depends(get_session)) -> list[UserRead]:
+    if FAST_SERIALIZATION:
+        return json_response(
+            rows_as_dicts(session.exec(select_schema(User, UserRead)).all())
+        )
     return session.exec(select(User)).all()
 
 
+PRODUCT_LIST_ADAPTER = TypeAdapter(list[ProductRead])
+SUPPLIER_LIST_ADAPTER = TypeAdapter(list[SupplierRead])
+
+
 @app.get("/products", response_model=list[ProductRead])
-def list_products(session: Session = Depends(get_session)) -> list[ProductRead]:
-    return session.exec(select(Product)).all()
+async def list_products(
+    request: Request, session: AsyncSession = Depends(get_async_session)
+) -> Response:
+    async def build() -> bytes:
+        if FAST_SERIALIZATION:
+            rows = (await session.exec(select_schema(Product, ProductRead))).all()
+            return to_json(attach_image_variants(rows_as_dicts(rows)))
+        products = (await session.exec(select(Product))).all()
+        return PRODUCT_LIST_ADAPTER.dump_json(
+            PRODUCT_LIST_ADAPTER.validate_python(
+                attach_image_variants([product.model_dump() for product in products])
+            )
+        )
+
+    return cached_json_response(request, await product_cache.get_or_build(build))
+
+
+@app.get("/products/search", response_model=ProductSearchPage)
+async def search_product_catalog(
+    query: Annotated[ProductSearchQuery, Query()],
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    page = await session.run_sync(search_products, query)
+    attach_image_variants(page["items"])
+    return json_response(page)
 
 
 @app.post("/products", response_model=ProductRead)
@@ -229,24 +282,79 @@ def create_product(
     product = Product(**payload.model_dump())
     session.add(product)
     session.commit()
+    product_cache.invalidate()
+    storefront_cache.invalidate()
+    image_derivatives.schedule(product.image_url)
     session.refresh(product)
     return product
 
 
+@app.post(
+    "/admin/products/import", response_model=ProductImportStatus, status_code=202
+)
+async def start_product_import(
+    request: Request, background_tasks: BackgroundTasks
+) -> ProductImportStatus:
+    workbook = SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    async for chunk in request.stream():
+        workbook.write(chunk)
+    workbook.seek(0)
+    job = register_import_job()
+    background_tasks.add_task(run_import_job, job, workbook)
+    return job.as_dict()
+
+
+@app.get("/admin/products/import/{job_id}", response_model=ProductImportStatus)
+def product_import_status(job_id: str) -> ProductImportStatus:
+    job = IMPORT_JOBS.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.as_dict()
+
+
 @app.get("/suppliers", response_model=list[SupplierRead])
-def list_suppliers() -> list[SupplierRead]:
-    return SUPPLIER_CONFIG
+async def list_suppliers(request: Request) -> Response:
+    async def build() -> bytes:
+        return SUPPLIER_LIST_ADAPTER.dump_json(
+            SUPPLIER_LIST_ADAPTER.validate_python(SUPPLIER_CONFIG)
+        )
+
+    return cached_json_response(request, await supplier_cache.get_or_build(build))
+
+
+@app.get("/storefront/{suffix}", response_model=StorefrontPage)
+async def get_storefront(
+    suffix: str,
+    query: Annotated[StorefrontQuery, Query()],
+    request: Request,
+) -> Response:
+    supplier = resolve_supplier(suffix)
+    if supplier is None:
+        raise HTTPException(status_code=404, detail="Supplier not found")
+    distributor_code = supplier["distributor"]["code"]
+
+    async def build() -> bytes:
+        async with shard_router.async_session(distributor_code) as session:
+            page = await session.run_sync(load_storefront, distributor_code, query)
+        attach_image_variants(page["items"])
+        return to_json(page)
+
+    return cached_json_response(
+        request,
+        await storefront_cache.get_or_build(
+            build, storefront_cache_key(distributor_code, query)
+        ),
+    )
 
 
 @app.get("/inventory/{distributor_code}", response_model=list[InventoryItem])
-def list_inventory(
-    distributor_code: str, session: Session = Depends(get_session)
-) -> list[InventoryItem]:
-    records = session.exec(
-        select(DistributorInventory).where(
-            DistributorInventory.distributor_code == distributor_code
-        )
-    ).all()
+def list_inventory(distributor_code: str) -> list[InventoryItem]:
+    with shard_router.session(distributor_code) as session:
+        records = session.exec(
+            select(DistributorInventory).where(
+                DistributorInventory.distributor_code == distributor_code
+            )
+        ).all()
     return [
         InventoryItem(product_id=record.product_id, stock=record.stock)
         for record in records
@@ -257,208 +365,289 @@ def list_inventory(
 def update_inventory(
     distributor_code: str,
     payload: InventoryUpdate,
-    session: Session = Depends(get_session),
 ) -> list[InventoryItem]:
-    session.exec(
-        delete(DistributorInventory).where(
-            DistributorInventory.distributor_code == distributor_code
-        )
-    )
-    for item in payload.items:
-        session.add(
-            DistributorInventory(
-                distributor_code=distributor_code,
-                product_id=item.product_id,
-                stock=item.stock,
-            )
-        )
-    session.commit()
+    with shard_router.session(distributor_code) as session:
+        replace_inventory(session, distributor_code, payload.items)
+        session.commit()
+    storefront_cache.invalidate()
     return payload.items
 
 
+@app.patch("/inventory/{distributor_code}", response_model=list[InventoryItem])
+def patch_inventory(
+    distributor_code: str,
+    payload: InventoryPatch,
+) -> list[InventoryItem]:
+    with shard_router.session(distributor_code) as session:
+        items = adjust_inventory(session, distributor_code, payload.items)
+        session.commit()
+    storefront_cache.invalidate()
+    return items
+
+
 
 @app.get("/orders", response_model=list[OrderRead])
-def list_orders(session: Session = Depends(get_session)) -> list[OrderRead]:
-    return session.exec(select(Order)).all()
+async def list_orders(
+    query: Annotated[OrderListQuery, Query()],
+    response: Response,
+) -> list[OrderRead]:
+    if shard_router.enabled and not query.distributor_code:
+        return await list_orders_across_shards(shard_router, query)
+    async with shard_router.async_session(query.distributor_code) as session:
+        return await session.run_sync(list_orders_page, query, response)
 
 
 @app.post("/orders", response_model=OrderRead)
-def create_order(
-    payload: OrderCreate, session: Session = Depends(get_session)
-) -> OrderRead:
-    user = None
-    if payload.phone:
-        user = session.exec(select(User).where(User.phone == payload.phone)).first()
-    elif payload.user_id:
-        user = session.get(User, payload.user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    order = Order(
-        user_id=user.id,
-        distributor_code=payload.distributor_code,
-        order_number=_generate_order_number(),
-        status="待提货",
-        total=payload.total,
-        items=[item.model_dump() for item in payload.items],
+async def create_order(payload: OrderCreate) -> OrderRead:
+    async with shard_router.async_session(payload.distributor_code) as session:
+        if payload.idempotency_key:
+            existing = await session.run_sync(
+                existing_orders_by_key, [payload.idempotency_key]
+            )
+            if existing:
+                return existing[payload.idempotency_key]
+        user_id = None
+        if payload.phone:
+            user_id = await session.run_sync(user_id_for_phone, payload.phone)
+        elif payload.user_id:
+            user = await session.get(User, payload.user_id)
+            user_id = user.id if user else None
+        if user_id is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        if payload.distributor_code:
+            await session.run_sync(
+                reserve_stock,
+                payload.distributor_code,
+                order_item_quantities(payload.items),
+            )
+        order = Order(
+            user_id=user_id,
+            distributor_code=payload.distributor_code,
+            order_number=generate_order_number(),
+            status="待提货",
+            total=payload.total,
+            idempotency_key=payload.idempotency_key,
+        )
+        session.add(order)
+        try:
+            await session.flush()
+        except IntegrityError:
+            await session.rollback()
+            if not payload.idempotency_key:
+                raise
+            raise HTTPException(status_code=409, detail="Duplicate idempotency key")
+        if payload.items:
+            await session.exec(
+                insert(OrderLine.__table__),
+                params=[
+                    {
+                        "order_id": order.id,
+                        "product_id": item.id,
+                        "name": item.name,
+                        "price": item.price,
+                        "quantity": item.quantity,
+                        "image_url": item.image_url,
+                    }
+                    for item in payload.items
+                ],
+            )
+        await session.run_sync(record_order_created, order)
+        order_read = OrderRead(**order.model_dump(), items=payload.items)
+        await session.run_sync(record_order_event, ORDER_CREATED, order_read)
+        await session.commit()
+        return order_read
+
+
+@app.post("/orders/batch", response_model=OrderBatchResponse)
+async def create_orders_batch(
+    payload: OrderBatchCreate, session: AsyncSession = Depends(get_async_session)
+) -> OrderBatchResponse:
+    if shard_router.enabled:
+        return await create_sharded_order_batch(shard_router, payload.orders)
+    for _ in range(ORDER_BATCH_ATTEMPTS):
+        try:
+            result = await session.run_sync(create_order_batch, payload.orders)
+            await session.commit()
+            return result
+        except IntegrityError:
+            await session.rollback()
+    raise HTTPException(status_code=409, detail="Duplicate idempotency key")
+
+
+def order_event_response(distributor_code: Optional[str]) -> StreamingResponse:
+    return StreamingResponse(
+        order_events.stream(distributor_code),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    session.add(order)
-    session.commit()
-    session.refresh(order)
-    return order
+
+
+@app.get("/orders/events")
+async def stream_order_events(
+    distributor_code: Optional[str] = None,
+) -> StreamingResponse:
+    return order_event_response(distributor_code)
 
 
 @app.get("/users/{user_id}/orders", response_model=list[OrderRead])
-def list_user_orders(
-    user_id: int, session: Session = Depends(get_session)
+async def list_user_orders(
+    user_id: int,
+    query: Annotated[UserOrderListQuery, Query()],
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
 ) -> list[OrderRead]:
-    return session.exec(select(Order).where(Order.user_id == user_id)).all()
+    if query.include_archived:
+        return await list_orders_across_shards(
+            shard_router,
+            query,
+            Order.user_id == user_id,
+            archive_conditions=(OrderArchive.user_id == user_id,),
+        )
+    if shard_router.enabled:
+        return await list_orders_across_shards(
+            shard_router, query, Order.user_id == user_id
+        )
+    return await session.run_sync(
+        list_orders_page, query, response, Order.user_id == user_id
+    )
 
 
 @app.patch("/orders/{order_id}", response_model=OrderRead)
-def update_order_status(
-    order_id: int,
-    payload: OrderStatusUpdate,
-    session: Session = Depends(get_session),
-) -> OrderRead:
-    order = session.get(Order, order_id)
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    order.status = payload.status
-    if payload.status == "已完成":
-        order.completed_at = datetime.utcnow()
-    else:
-        order.completed_at = None
-    session.add(order)
-    session.commit()
-    session.refresh(order)
-    return order
+def update_order_status(order_id: int, payload: OrderStatusUpdate) -> OrderRead:
+    for shard in shard_router.order_shards(order_id):
+        with Session(shard.engine) as session:
+            order = session.get(Order, order_id)
+            if order:
+                order_read = apply_order_status(session, order, payload.status)
+                session.commit()
+                return order_read
+    raise HTTPException(status_code=404, detail="Order not found")
+
+
+@app.post("/orders/status", response_model=OrderBulkStatusResult)
+def bulk_update_orders_status(payload: OrderBulkStatusUpdate) -> OrderBulkStatusResult:
+    # Each shard commits on its own, so a failure part way through a
+    # cross-shard update leaves the earlier shards updated.
+    results = []
+    for shard in shard_router.shards_for(payload.distributor_code):
+        with Session(shard.engine) as session:
+            results.append(bulk_update_order_status(session, payload))
+            session.commit()
+    return merge_bulk_status_results(results)
 
 
 @app.get("/admin/summary", response_model=DashboardSummary)
-def admin_summary(session: Session = Depends(get_session)) -> DashboardSummary:
-    total_sales = sum(order.total for order in session.exec(select(Order)).all())
-    pending_orders = len(
-        [order for order in session.exec(select(Order)).all() if order.status != "已完成"]
-    )
-    active_distributors = len(
-        [user for user in session.exec(select(User)).all() if user.role == "distributor"]
-    )
-    featured_products = len(
-        [product for product in session.exec(select(Product)).all() if product.is_featured]
-    )
-    return DashboardSummary(
-        total_sales=total_sales,
-        pending_orders=pending_orders,
-        active_distributors=active_distributors,
-        featured_products=featured_products,
+async def admin_summary() -> DashboardSummary:
+    return merge_admin_summaries(await shard_router.gather(build_admin_summary))
+
+
+@app.get("/admin/diagnostics/database", response_model=DatabaseDiagnostics)
+def admin_database_diagnostics() -> DatabaseDiagnostics:
+    return database_diagnostics(engine)
+
+
+@app.get("/admin/diagnostics/cache", response_model=dict[str, CacheStats])
+def admin_cache_diagnostics() -> dict[str, CacheStats]:
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
     )
 
 
+@app.get("/admin/diagnostics/images", response_model=ImageDerivativeStats)
+def admin_image_diagnostics() -> ImageDerivativeStats:
+    return image_derivatives.stats()
+
+
+@app.get("/admin/diagnostics/events", response_model=EventHubStats)
+def admin_event_diagnostics() -> EventHubStats:
+    return order_events.stats()
+
+
+@app.get("/admin/products/top", response_model=list[ProductSales])
+async def admin_top_products(
+    limit: int = Query(default=10, ge=1, le=100),
+    by: Literal["units", "revenue"] = "units",
+    distributor_code: Optional[str] = None,
+    status: Optional[str] = None,
+) -> list[ProductSales]:
+    if distributor_code or not shard_router.enabled:
+        with shard_router.session(distributor_code) as session:
+            return top_products(session, limit, by, distributor_code, status)
+    results = await shard_router.gather(top_products, None, by, None, status)
+    return merge_product_sales(results, limit, by)
+
+
+@app.get("/admin/sales/categories", response_model=list[CategorySales])
+async def admin_sales_by_category(
+    distributor_code: Optional[str] = None,
+    status: Optional[str] = None,
+) -> list[CategorySales]:
+    if distributor_code or not shard_router.enabled:
+        with shard_router.session(distributor_code) as session:
+            return sales_by_category(session, distributor_code, status)
+    results = await shard_router.gather(sales_by_category, None, status)
+    return merge_category_sales(results)
+
+
 @app.get("/distributor/{user_id}/summary", response_model=DistributorSummary)
-def distributor_summary(
-    user_id: int, session: Session = Depends(get_session)
+async def distributor_summary(
+    user_id: int, session: AsyncSession = Depends(get_async_session)
 ) -> DistributorSummary:
-    user = session.get(User, user_id)
-    if not user or user.role != "distributor":
+    distributor = await resolve_distributor(session, user_id)
+    if not distributor:
         raise HTTPException(status_code=404, detail="Distributor not found")
-    account = session.exec(
-        select(AuthAccount).where(AuthAccount.user_id == user_id)
-    ).first()
-    distributor_code = (
-        DISTRIBUTOR_CODE_BY_USERNAME.get(account.username, account.username)
-        if account
-        else None
-    )
-    orders = (
-        session.exec(
-            select(Order).where(Order.distributor_code == distributor_code)
-        ).all()
-        if distributor_code
-        else []
-    )
-    total_orders = len(orders)
-    commission = sum(order.total for order in orders) * 0.15
-    completed_orders = [order for order in orders if order.status == "已完成"]
-    completion_dates = {
-        order.id: (order.completed_at or order.created_at).date()
-        for order in completed_orders
-    }
-    now = datetime.utcnow()
-    today = now.date()
-    daily_completed_orders = len(
-        [order for order in completed_orders if completion_dates[order.id] == today]
-    )
-    monthly_completed_orders = len(
-        [
-            order
-            for order in completed_orders
-            if (order.completed_at or order.created_at).year == now.year
-            and (order.completed_at or order.created_at).month == now.month
-        ]
-    )
-    daily_completed_order_series = []
-    for offset in range(6, -1, -1):
-        day = today - timedelta(days=offset)
-        daily_completed_order_series.append(
-            {
-                "label": day.strftime("%m-%d"),
-                "count": len(
-                    [
-                        order
-                        for order in completed_orders
-                        if completion_dates[order.id] == day
-                    ]
-                ),
-            }
-        )
-    monthly_completed_order_series = []
-    for offset in range(6, -1, -1):
-        target_month = now.month - offset
-        target_year = now.year
-        while target_month <= 0:
-            target_month += 12
-            target_year -= 1
-        monthly_completed_order_series.append(
-            {
-                "label": f"{target_year}-{target_month:02d}",
-                "count": len(
-                    [
-                        order
-                        for order in completed_orders
-                        if (order.completed_at or order.created_at).year == target_year
-                        and (order.completed_at or order.created_at).month == target_month
-                    ]
-                ),
-            }
-        )
-    return DistributorSummary(
-        distributor_id=user.id,
-        code=distributor_code,
-        name=user.name,
-        pickup_address=user.pickup_address,
-        total_orders=total_orders,
-        daily_completed_orders=daily_completed_orders,
-        monthly_completed_orders=monthly_completed_orders,
-        daily_completed_order_series=daily_completed_order_series,
-        monthly_completed_order_series=monthly_completed_order_series,
-        commission=commission,
-        wallet_balance=1200.0,
-        coupons=3,
-        points=180,
-    )
+    async with shard_router.async_session(distributor.code) as shard_session:
+        return await shard_session.run_sync(build_distributor_summary, distributor)
 
 
 @app.get("/distributor/{user_id}/orders", response_model=list[OrderRead])
-def list_distributor_orders(
-    user_id: int, session: Session = Depends(get_session)
+async def list_distributor_orders(
+    user_id: int,
+    query: Annotated[OrderListQuery, Query()],
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
 ) -> list[OrderRead]:
-    user = session.get(User, user_id)
-    if not user or user.role != "distributor":
+    distributor = await resolve_distributor(session, user_id)
+    if not distributor:
         raise HTTPException(status_code=404, detail="Distributor not found")
-    account = session.exec(
-        select(AuthAccount).where(AuthAccount.user_id == user_id)
-    ).first()
-    if not account:
+    if not distributor.code:
         return []
-    distributor_code = DISTRIBUTOR_CODE_BY_USERNAME.get(account.username, account.username)
-    return session.exec(select(Order).where(Order.distributor_code == distributor_code)).all()
+    async with shard_router.async_session(distributor.code) as shard_session:
+        return await shard_session.run_sync(
+            list_orders_page,
+            query,
+            response,
+            Order.distributor_code == distributor.code,
+        )
+
+
+@app.get("/distributor/{user_id}/orders/events")
+async def stream_distributor_order_events(user_id: int) -> StreamingResponse:
+    async with AsyncSession(async_engine) as session:
+        distributor = await resolve_distributor(session, user_id)
+    if not distributor or not distributor.code:
+        raise HTTPException(status_code=404, detail="Distributor not found")
+    return order_event_response(distributor.code)
+
+
+@app.post(
+    "/distributor/{user_id}/orders/status", response_model=OrderBulkStatusResult
+)
+async def bulk_update_distributor_orders_status(
+    user_id: int,
+    payload: OrderBulkStatusUpdate,
+    session: AsyncSession = Depends(get_async_session),
+) -> OrderBulkStatusResult:
+    distributor = await resolve_distributor(session, user_id)
+    if not distributor or not distributor.code:
+        raise HTTPException(status_code=404, detail="Distributor not found")
+    scoped = payload.model_copy(update={"distributor_code": distributor.code})
+    async with shard_router.async_session(distributor.code) as shard_session:
+        result = await shard_session.run_sync(bulk_update_order_status, scoped)
+        await shard_session.commit()
+    return result
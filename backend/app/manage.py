@@ -0,0 +1,87 @@
+import argparse
+import sys
+
+from sqlmodel import Session
+
+from app.archive import archive_orders
+from app.bootstrap import init_db
+from app.config import ARCHIVE_CONFIG
+from app.shards import shard_router
+from app.summary import (
+    backfill_completion_buckets,
+    check_completion_buckets,
+    rebuild_order_rollups,
+)
+
+
+def rebuild_rollups() -> None:
+    rows = 0
+    for shard in shard_router.shards:
+        with Session(shard.engine) as session:
+            rows += rebuild_order_rollups(session)
+            session.commit()
+    print(f"rebuilt {rows} order rollup rows")
+
+
+def backfill_buckets() -> None:
+    buckets = 0
+    for shard in shard_router.shards:
+        with Session(shard.engine) as session:
+            buckets += backfill_completion_buckets(session)
+            session.commit()
+    print(f"backfilled {buckets} completion buckets")
+
+
+def check_buckets() -> None:
+    mismatches = []
+    for shard in shard_router.shards:
+        with Session(shard.engine) as session:
+            mismatches.extend(check_completion_buckets(session))
+    for mismatch in mismatches:
+        print(
+            f"{mismatch['distributor_code'] or '-'} {mismatch['period']} "
+            f"{mismatch['bucket_start']}: expected {mismatch['expected']}, "
+            f"stored {mismatch['stored']}"
+        )
+    if mismatches:
+        sys.exit(1)
+    print("completion buckets are consistent")
+
+
+def archive_completed_orders() -> None:
+    archived = sum(archive_orders(shard.engine) for shard in shard_router.shards)
+    print(
+        f"archived {archived} orders completed more than "
+        f"{ARCHIVE_CONFIG['after_months']} months ago"
+    )
+
+
+def split_shards() -> None:
+    if not shard_router.enabled:
+        print("sharding is disabled; set SHOPMALL_SHARDING=1")
+        sys.exit(1)
+    for code, orders in shard_router.split_catalog().items():
+        print(f"moved {orders} orders for {code}")
+    rebuild_rollups()
+    backfill_buckets()
+
+
+COMMANDS = {
+    "archive-orders": archive_completed_orders,
+    "backfill-buckets": backfill_buckets,
+    "check-buckets": check_buckets,
+    "rebuild-rollups": rebuild_rollups,
+    "split-shards": split_shards,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.manage")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+    init_db()
+    COMMANDS[args.command]()
+
+
+if __name__ == "__main__":
+    main()
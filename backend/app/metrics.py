@@ -0,0 +1,237 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import METRICS_CONFIG
+
+logger = logging.getLogger("uvicorn.error")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+SLOW_QUERY_SERIES = 50
+_PLACEHOLDER = r"(?:\?|%\(\w+\)s|\$\d+|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    query_time: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.total += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+class MetricsRegistry:
+    def __init__(
+        self,
+        slow_query_seconds: float = METRICS_CONFIG["slow_query_ms"] / 1000,
+        n_plus_one_threshold: int = METRICS_CONFIG["n_plus_one_threshold"],
+    ) -> None:
+        self.slow_query_seconds = slow_query_seconds
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.request_latency: dict[tuple[str, str, str], Histogram] = {}
+        self.request_queries: dict[tuple[str, str], Histogram] = {}
+        self.request_query_time: dict[tuple[str, str], float] = defaultdict(float)
+        self.slow_queries: Counter = Counter()
+        self.n_plus_one: Counter = Counter()
+        self.queries_outside_requests = 0
+        self._lock = threading.Lock()
+
+    def record_query(self, statement: str, elapsed: float) -> None:
+        stats = _request_stats.get()
+        if stats is None:
+            with self._lock:
+                self.queries_outside_requests += 1
+        else:
+            stats.queries += 1
+            stats.query_time += elapsed
+            stats.statements[normalize_statement(statement)] += 1
+        if elapsed >= self.slow_query_seconds:
+            with self._lock:
+                self.slow_queries[normalize_statement(statement)[:200]] += 1
+            logger.warning("slow query (%.1f ms): %s", elapsed * 1000, statement)
+
+    def record_request(
+        self, method: str, route: str, status: int, elapsed: float, stats: RequestStats
+    ) -> None:
+        repeated = [
+            statement
+            for statement, count in stats.statements.items()
+            if count >= self.n_plus_one_threshold
+        ]
+        with self._lock:
+            latency = self.request_latency.setdefault(
+                (method, route, str(status)), Histogram(LATENCY_BUCKETS)
+            )
+            latency.observe(elapsed)
+            queries = self.request_queries.setdefault(
+                (method, route), Histogram(QUERY_COUNT_BUCKETS)
+            )
+            queries.observe(stats.queries)
+            self.request_query_time[(method, route)] += stats.query_time
+            for _ in repeated:
+                self.n_plus_one[(method, route)] += 1
+        for statement in repeated:
+            logger.warning(
+                "possible N+1 in %s %s: %d executions of %s",
+                method,
+                route,
+                stats.statements[statement],
+                statement[:200],
+            )
+
+    def render(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            _render_histogram(
+                lines,
+                "shopmall_http_request_duration_seconds",
+                "HTTP request latency by route.",
+                ("method", "route", "status"),
+                self.request_latency,
+            )
+            _render_histogram(
+                lines,
+                "shopmall_db_queries_per_request",
+                "SQL statements executed per request.",
+                ("method", "route"),
+                self.request_queries,
+            )
+            lines.append(
+                "# HELP shopmall_db_query_seconds_total Time spent in SQL per route."
+            )
+            lines.append("# TYPE shopmall_db_query_seconds_total counter")
+            for (method, route), seconds in sorted(self.request_query_time.items()):
+                lines.append(
+                    f"shopmall_db_query_seconds_total{_labels(method=method, route=route)} "
+                    f"{seconds:.6f}"
+                )
+            lines.append(
+                "# HELP shopmall_db_n_plus_one_total Requests that repeated one "
+                "statement at least the N+1 threshold times."
+            )
+            lines.append("# TYPE shopmall_db_n_plus_one_total counter")
+            for (method, route), count in sorted(self.n_plus_one.items()):
+                lines.append(
+                    f"shopmall_db_n_plus_one_total{_labels(method=method, route=route)} "
+                    f"{count}"
+                )
+            lines.append(
+                "# HELP shopmall_db_slow_queries_total Statements slower than the "
+                "slow query threshold."
+            )
+            lines.append("# TYPE shopmall_db_slow_queries_total counter")
+            for statement, count in self.slow_queries.most_common(SLOW_QUERY_SERIES):
+                lines.append(
+                    f"shopmall_db_slow_queries_total{_labels(statement=statement)} {count}"
+                )
+            lines.append(
+                "# HELP shopmall_db_queries_outside_requests_total SQL statements "
+                "executed outside any request."
+            )
+            lines.append("# TYPE shopmall_db_queries_outside_requests_total counter")
+            lines.append(
+                f"shopmall_db_queries_outside_requests_total {self.queries_outside_requests}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _render_histogram(
+    lines: list[str],
+    name: str,
+    description: str,
+    label_names: tuple[str, ...],
+    histograms: dict[tuple, Histogram],
+) -> None:
+    lines.append(f"# HELP {name} {description}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, histogram in sorted(histograms.items()):
+        labels = dict(zip(label_names, key))
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            lines.append(f"{name}_bucket{_labels(**labels, le=str(bound))} {count}")
+        lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.total}")
+        lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{_labels(**labels)} {histogram.total}")
+
+
+metrics = MetricsRegistry()
+
+
+def instrument_engine(db_engine: Engine, registry: MetricsRegistry = metrics) -> None:
+    @event.listens_for(db_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        connection, cursor, statement, parameters, context, executemany
+    ) -> None:
+        connection.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(db_engine, "after_cursor_execute")
+    def after_cursor_execute(
+        connection, cursor, statement, parameters, context, executemany
+    ) -> None:
+        started = connection.info.pop("query_started", None)
+        if started is not None:
+            registry.record_query(statement, time.perf_counter() - started)
+
+
+@contextmanager
+def track_request() -> Iterator[RequestStats]:
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+def route_template(scope: dict) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def server_timing(elapsed: float, stats: RequestStats) -> str:
+    return (
+        f"app;dur={elapsed * 1000:.1f}, "
+        f'db;dur={stats.query_time * 1000:.1f};desc="{stats.queries} queries"'
+    )
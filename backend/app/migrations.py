@@ -0,0 +1,219 @@
+import json
+from collections.abc import Callable
+from datetime import datetime
+
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.schema import CreateTable
+from sqlmodel import Session, select
+
+from app.models import Order, SchemaMigration, User
+from app.product_search import create_product_search
+from app.summary import backfill_completion_buckets, rebuild_order_rollups
+
+ORDER_ITEMS_MIGRATION_BATCH = 1000
+
+
+def _columns(session: Session, table: str) -> set[str]:
+    columns = inspect(session.connection()).get_columns(table)
+    return {column["name"] for column in columns}
+
+
+def add_user_pickup_address(session: Session) -> None:
+    if "pickup_address" not in _columns(session, "user"):
+        session.exec(text("ALTER TABLE user ADD COLUMN pickup_address VARCHAR"))
+
+
+def add_order_number(session: Session) -> None:
+    if "order_number" not in _columns(session, "order"):
+        session.exec(text('ALTER TABLE "order" ADD COLUMN order_number VARCHAR'))
+
+
+def add_order_completed_at(session: Session) -> None:
+    if "completed_at" not in _columns(session, "order"):
+        session.exec(text('ALTER TABLE "order" ADD COLUMN completed_at TIMESTAMP'))
+        session.exec(
+            text('UPDATE "order" SET completed_at = created_at WHERE status = :status'),
+            params={"status": "已完成"},
+        )
+
+
+def dedupe_distributor_inventory(session: Session) -> None:
+    session.exec(
+        text(
+            "DELETE FROM distributorinventory WHERE id NOT IN ("
+            "SELECT MAX(id) FROM distributorinventory "
+            "GROUP BY distributor_code, product_id)"
+        )
+    )
+
+
+def move_order_items_to_order_lines(
+    session: Session, batch_size: int = ORDER_ITEMS_MIGRATION_BATCH
+) -> None:
+    if "items" not in _columns(session, "order"):
+        return
+    last_id = 0
+    while True:
+        rows = session.exec(
+            text(
+                'SELECT id, items FROM "order" WHERE id > :last_id AND items IS NOT NULL '
+                "ORDER BY id LIMIT :limit"
+            ),
+            params={"last_id": last_id, "limit": batch_size},
+        ).all()
+        if not rows:
+            break
+        lines = []
+        for order_id, items in rows:
+            if isinstance(items, str):
+                items = json.loads(items or "[]")
+            for item in items or []:
+                lines.append(
+                    {
+                        "order_id": order_id,
+                        "product_id": item["id"],
+                        "name": item["name"],
+                        "price": item["price"],
+                        "quantity": item["quantity"],
+                        "image_url": item.get("image_url"),
+                    }
+                )
+        if lines:
+            session.exec(
+                text(
+                    "INSERT INTO order_line "
+                    "(order_id, product_id, name, price, quantity, image_url) "
+                    "VALUES (:order_id, :product_id, :name, :price, :quantity, :image_url)"
+                ),
+                params=lines,
+            )
+        last_id = rows[-1][0]
+    session.exec(text('ALTER TABLE "order" DROP COLUMN items'))
+
+
+def backfill_order_numbers(session: Session) -> None:
+    if session.get_bind().dialect.name != "sqlite":
+        return
+    session.exec(
+        text(
+            "UPDATE \"order\" SET order_number = 'WD' "
+            "|| strftime('%Y%m%d%H%M%S', created_at) || printf('%06d', id) "
+            "WHERE order_number IS NULL"
+        )
+    )
+
+
+def dedupe_order_numbers(session: Session) -> None:
+    session.exec(
+        text(
+            "UPDATE \"order\" SET order_number = order_number || '-' || id "
+            "WHERE id NOT IN (SELECT MIN(id) FROM \"order\" GROUP BY order_number)"
+        )
+    )
+    session.exec(text("DROP INDEX IF EXISTS ix_order_order_number"))
+
+
+def dedupe_users_by_phone(session: Session) -> None:
+    duplicates = (
+        "SELECT user.id AS duplicate_id, keep.id AS keep_id FROM user "
+        "JOIN (SELECT phone, MIN(id) AS id FROM user GROUP BY phone) AS keep "
+        "ON keep.phone = user.phone AND keep.id != user.id"
+    )
+    for table in ('"order"', "authaccount"):
+        session.exec(
+            text(
+                f"UPDATE {table} SET user_id = (SELECT keep_id FROM ({duplicates}) "
+                f"WHERE duplicate_id = {table}.user_id) "
+                f"WHERE user_id IN (SELECT duplicate_id FROM ({duplicates}))"
+            )
+        )
+    session.exec(
+        text("DELETE FROM user WHERE id NOT IN (SELECT MIN(id) FROM user GROUP BY phone)")
+    )
+    session.exec(
+        text(
+            "DELETE FROM authaccount WHERE id NOT IN "
+            "(SELECT MIN(id) FROM authaccount GROUP BY username)"
+        )
+    )
+    session.exec(text("DROP INDEX IF EXISTS ix_user_phone"))
+    session.exec(text("DROP INDEX IF EXISTS ix_authaccount_username"))
+
+
+def add_order_idempotency_key(session: Session) -> None:
+    if "idempotency_key" not in _columns(session, "order"):
+        session.exec(text('ALTER TABLE "order" ADD COLUMN idempotency_key VARCHAR'))
+
+
+def rebuild_order_autoincrement(session: Session) -> None:
+    # Archiving removes the newest completed orders, and without AUTOINCREMENT
+    # SQLite would hand their ids out again, colliding with order_archive.
+    if session.get_bind().dialect.name != "sqlite":
+        return
+    table_sql = session.exec(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'order'")
+    ).one()[0]
+    if "AUTOINCREMENT" not in table_sql.upper():
+        metadata = MetaData()
+        User.__table__.to_metadata(metadata)
+        rebuilt = Order.__table__.to_metadata(metadata, name="order_rebuild")
+        existing = _columns(session, "order")
+        columns = ", ".join(
+            column.name for column in rebuilt.columns if column.name in existing
+        )
+        session.exec(
+            text(str(CreateTable(rebuilt).compile(dialect=session.get_bind().dialect)))
+        )
+        session.exec(
+            text(f'INSERT INTO order_rebuild ({columns}) SELECT {columns} FROM "order"')
+        )
+        session.exec(text('DROP TABLE "order"'))
+        session.exec(text('ALTER TABLE order_rebuild RENAME TO "order"'))
+    last_id = (
+        "SELECT COALESCE(MAX(id), 0) FROM (SELECT MAX(id) AS id FROM \"order\" "
+        "UNION ALL SELECT MAX(id) FROM order_archive)"
+    )
+    session.exec(
+        text(
+            f"UPDATE sqlite_sequence SET seq = MAX(seq, ({last_id})) "
+            "WHERE name = 'order'"
+        )
+    )
+    session.exec(
+        text(
+            f"INSERT INTO sqlite_sequence (name, seq) SELECT 'order', ({last_id}) "
+            "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'order')"
+        )
+    )
+
+
+MIGRATIONS: list[tuple[int, str, Callable[[Session], object]]] = [
+    (1, "add_user_pickup_address", add_user_pickup_address),
+    (2, "add_order_number", add_order_number),
+    (3, "add_order_completed_at", add_order_completed_at),
+    (4, "dedupe_distributor_inventory", dedupe_distributor_inventory),
+    (5, "move_order_items_to_order_lines", move_order_items_to_order_lines),
+    (6, "backfill_order_numbers", backfill_order_numbers),
+    (7, "rebuild_order_rollups", rebuild_order_rollups),
+    (8, "backfill_completion_buckets", backfill_completion_buckets),
+    (9, "dedupe_order_numbers", dedupe_order_numbers),
+    (10, "dedupe_users_by_phone", dedupe_users_by_phone),
+    (11, "add_order_idempotency_key", add_order_idempotency_key),
+    (12, "create_product_search", create_product_search),
+    (13, "rebuild_order_autoincrement", rebuild_order_autoincrement),
+]
+
+
+def apply_migrations(session: Session) -> list[str]:
+    applied_versions = set(session.exec(select(SchemaMigration.version)).all())
+    applied = []
+    for version, name, migration in MIGRATIONS:
+        if version in applied_versions:
+            continue
+        migration(session)
+        session.add(
+            SchemaMigration(version=version, name=name, applied_at=datetime.utcnow())
+        )
+        session.flush()
+        applied.append(name)
+    return applied
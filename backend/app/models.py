@@ -1,50 +1,167 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import Column, JSON
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
 class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
-    phone: str
-    role: str
+    phone: str = Field(unique=True, index=True)
+    role: str = Field(index=True)
     pickup_address: Optional[str] = None
 
 
 class Product(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    name: str
+    name: str = Field(index=True)
     category: str
     price: float
     image_url: str
     tags: Optional[str] = None
-    is_featured: bool = False
+    is_featured: bool = Field(default=False, index=True)
 
 
 class Order(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_order_created_at_id", "created_at", "id"),
+        Index("ix_order_status_created_at_id", "status", "created_at", "id"),
+        Index(
+            "ix_order_distributor_code_created_at_id",
+            "distributor_code",
+            "created_at",
+            "id",
+        ),
+        Index("ix_order_user_id_created_at_id", "user_id", "created_at", "id"),
+        {"sqlite_autoincrement": True},
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     distributor_code: Optional[str] = Field(default=None, index=True)
-    order_number: str
+    order_number: str = Field(unique=True, index=True)
     status: str
     total: float
-    items: list[dict] = Field(default_factory=list, sa_column=Column(JSON))
     created_at: datetime = Field(default_factory=datetime.utcnow)
     completed_at: Optional[datetime] = None
+    idempotency_key: Optional[str] = Field(default=None, unique=True, index=True)
+
+
+class OrderLine(SQLModel, table=True):
+    __tablename__ = "order_line"
+    __table_args__ = (
+        Index("ix_order_line_product_id_order_id", "product_id", "order_id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    order_id: int = Field(foreign_key="order.id", index=True)
+    product_id: int
+    name: str
+    price: float
+    quantity: int
+    image_url: Optional[str] = None
+
+
+class OrderArchive(SQLModel, table=True):
+    __tablename__ = "order_archive"
+    __table_args__ = (
+        Index("ix_order_archive_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index(
+            "ix_order_archive_distributor_code_created_at_id",
+            "distributor_code",
+            "created_at",
+            "id",
+        ),
+    )
+
+    id: int = Field(primary_key=True)
+    user_id: int
+    distributor_code: Optional[str] = None
+    order_number: str
+    status: str
+    total: float
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    idempotency_key: Optional[str] = None
+    items: bytes
+
+
+class OrderSalesArchive(SQLModel, table=True):
+    __tablename__ = "order_sales_archive"
+
+    distributor_code: str = Field(default="", primary_key=True)
+    status: str = Field(primary_key=True)
+    product_id: int = Field(primary_key=True)
+    name: str
+    units: int = 0
+    revenue: float = 0.0
 
 
 class AuthAccount(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    username: str
+    username: str = Field(unique=True, index=True)
     password: str
     role: str
     user_id: Optional[int] = Field(default=None, foreign_key="user.id")
 
 
 class DistributorInventory(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ux_distributorinventory_distributor_code_product_id",
+            "distributor_code",
+            "product_id",
+            unique=True,
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     distributor_code: str = Field(index=True)
     product_id: int = Field(foreign_key="product.id")
     stock: int = 0
+
+
+class OrderRollup(SQLModel, table=True):
+    __tablename__ = "order_rollup"
+
+    distributor_code: str = Field(default="", primary_key=True)
+    status: str = Field(primary_key=True)
+    order_count: int = 0
+    total_amount: float = 0.0
+
+
+class OrderCompletionBucket(SQLModel, table=True):
+    __tablename__ = "order_completion_bucket"
+
+    distributor_code: str = Field(default="", primary_key=True)
+    period: str = Field(primary_key=True)
+    bucket_start: date = Field(primary_key=True)
+    completed_count: int = 0
+
+
+class SchemaMigration(SQLModel, table=True):
+    __tablename__ = "schema_migration"
+
+    version: int = Field(primary_key=True)
+    name: str
+    applied_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class OrderNumberWorker(SQLModel, table=True):
+    __tablename__ = "order_number_worker"
+
+    worker_id: int = Field(primary_key=True)
+    hostname: str
+    pid: int
+    leased_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class OrderEventLog(SQLModel, table=True):
+    __tablename__ = "order_event_log"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    type: str
+    distributor_code: Optional[str] = None
+    data: str
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -0,0 +1,207 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.events import ORDER_CREATED, record_order_event
+from app.inventory import order_item_quantities, try_reserve_stock
+from app.models import Order, OrderLine, User
+from app.order_numbers import generate_order_number
+from app.order_queries import build_order_reads
+from app.schemas import OrderBatchResponse, OrderBatchResult, OrderCreate, OrderRead
+from app.summary import apply_order_rollup
+
+ORDER_BATCH_STATUS = "待提货"
+ORDER_BATCH_ATTEMPTS = 2
+
+
+def existing_orders_by_key(session: Session, keys: list[str]) -> dict[str, OrderRead]:
+    if not keys:
+        return {}
+    orders = session.exec(select(Order).where(Order.idempotency_key.in_(keys))).all()
+    reads = build_order_reads(session, orders)
+    return {order.idempotency_key: read for order, read in zip(orders, reads)}
+
+
+def resolve_order_users(
+    session: Session, payloads: list[OrderCreate]
+) -> tuple[dict[str, int], set[int]]:
+    phones = {payload.phone for payload in payloads if payload.phone}
+    user_ids = {
+        payload.user_id for payload in payloads if not payload.phone and payload.user_id
+    }
+    if not phones and not user_ids:
+        return {}, set()
+    rows = session.exec(
+        select(User.id, User.phone).where(
+            or_(User.phone.in_(phones), User.id.in_(user_ids))
+        )
+    ).all()
+    return (
+        {phone: user_id for user_id, phone in rows if phone in phones},
+        {user_id for user_id, _ in rows if user_id in user_ids},
+    )
+
+
+def _error(index: int, status_code: int, message: str, **extra) -> OrderBatchResult:
+    return OrderBatchResult(
+        index=index, status="error", status_code=status_code, error=message, **extra
+    )
+
+
+def _batch_response(results: list[OrderBatchResult]) -> OrderBatchResponse:
+    return OrderBatchResponse(
+        created=sum(result.status == "created" for result in results),
+        existing=sum(result.status == "existing" for result in results),
+        failed=sum(result.status == "error" for result in results),
+        results=results,
+    )
+
+
+def create_order_batch(
+    session: Session, payloads: list[OrderCreate]
+) -> OrderBatchResponse:
+    existing = existing_orders_by_key(
+        session,
+        list({payload.idempotency_key for payload in payloads if payload.idempotency_key}),
+    )
+    users_by_phone, known_user_ids = resolve_order_users(session, payloads)
+
+    results: list[Optional[OrderBatchResult]] = [None] * len(payloads)
+    accepted: list[tuple[int, OrderCreate, dict]] = []
+    claimed_keys: dict[str, int] = {}
+    repeats: list[tuple[int, str]] = []
+    created_at = datetime.utcnow()
+    for index, payload in enumerate(payloads):
+        key = payload.idempotency_key
+        if key and key in existing:
+            results[index] = OrderBatchResult(
+                index=index, status="existing", order=existing[key]
+            )
+            continue
+        if key and key in claimed_keys:
+            repeats.append((index, key))
+            continue
+        if payload.phone:
+            user_id = users_by_phone.get(payload.phone)
+        else:
+            user_id = payload.user_id if payload.user_id in known_user_ids else None
+        if user_id is None:
+            results[index] = _error(index, 404, "User not found")
+            continue
+        if payload.distributor_code:
+            insufficient = try_reserve_stock(
+                session, payload.distributor_code, order_item_quantities(payload.items)
+            )
+            if insufficient:
+                results[index] = _error(
+                    index, 409, "Insufficient stock", product_ids=insufficient
+                )
+                continue
+        if key:
+            claimed_keys[key] = index
+        accepted.append(
+            (
+                index,
+                payload,
+                {
+                    "user_id": user_id,
+                    "distributor_code": payload.distributor_code,
+                    "order_number": generate_order_number(),
+                    "status": ORDER_BATCH_STATUS,
+                    "total": payload.total,
+                    "created_at": created_at,
+                    "idempotency_key": key,
+                },
+            )
+        )
+
+    if accepted:
+        order_table = Order.__table__
+        order_ids = session.exec(
+            insert(order_table).returning(order_table.c.id, sort_by_parameter_order=True),
+            params=[row for _, _, row in accepted],
+        ).scalars().all()
+        lines = [
+            {
+                "order_id": order_id,
+                "product_id": item.id,
+                "name": item.name,
+                "price": item.price,
+                "quantity": item.quantity,
+                "image_url": item.image_url,
+            }
+            for order_id, (_, payload, _) in zip(order_ids, accepted)
+            for item in payload.items
+        ]
+        if lines:
+            session.exec(insert(OrderLine.__table__), params=lines)
+        rollups: dict[Optional[str], list[float]] = defaultdict(lambda: [0, 0.0])
+        for order_id, (index, payload, row) in zip(order_ids, accepted):
+            rollup = rollups[payload.distributor_code]
+            rollup[0] += 1
+            rollup[1] += payload.total
+            order = OrderRead(
+                id=order_id,
+                user_id=row["user_id"],
+                distributor_code=row["distributor_code"],
+                order_number=row["order_number"],
+                status=row["status"],
+                total=row["total"],
+                items=payload.items,
+                created_at=created_at,
+            )
+            record_order_event(session, ORDER_CREATED, order)
+            results[index] = OrderBatchResult(index=index, status="created", order=order)
+        for distributor_code, (count, amount) in rollups.items():
+            apply_order_rollup(
+                session, distributor_code, ORDER_BATCH_STATUS, count, amount
+            )
+
+    for index, key in repeats:
+        results[index] = OrderBatchResult(
+            index=index, status="existing", order=results[claimed_keys[key]].order
+        )
+
+    return _batch_response(results)
+
+
+async def create_sharded_order_batch(
+    router: Any, payloads: list[OrderCreate]
+) -> OrderBatchResponse:
+    groups: dict[int, tuple[Any, list[int]]] = {}
+    for index, payload in enumerate(payloads):
+        shard = router.for_code(payload.distributor_code)
+        groups.setdefault(shard.index, (shard, []))[1].append(index)
+
+    async def run(shard: Any, indexes: list[int]) -> list[OrderBatchResult]:
+        async with AsyncSession(shard.async_engine) as session:
+            for _ in range(ORDER_BATCH_ATTEMPTS):
+                try:
+                    response = await session.run_sync(
+                        create_order_batch, [payloads[index] for index in indexes]
+                    )
+                    await session.commit()
+                except IntegrityError:
+                    await session.rollback()
+                    continue
+                return [
+                    result.model_copy(update={"index": indexes[result.index]})
+                    for result in response.results
+                ]
+        # Shards commit independently, so a shard that keeps losing the
+        # idempotency race fails only its own orders.
+        return [_error(index, 409, "Duplicate idempotency key") for index in indexes]
+
+    results: list[Optional[OrderBatchResult]] = [None] * len(payloads)
+    for shard_results in await asyncio.gather(
+        *(run(shard, indexes) for shard, indexes in groups.values())
+    ):
+        for result in shard_results:
+            results[result.index] = result
+    return _batch_response(results)
@@ -0,0 +1,142 @@
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.db import engine
+from app.models import OrderNumberWorker
+
+ORDER_NUMBER_PREFIX = "WD"
+# Legacy and backfilled numbers continue with a year (WD2026...), so the
+# marker digit keeps every generated number sorting after them.
+ORDER_NUMBER_MARKER = "9"
+ORDER_NUMBER_EPOCH_MS = 1_704_067_200_000
+WORKER_ID_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+
+class OrderNumberGenerator:
+    def __init__(self, worker_id: int) -> None:
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        self.worker_id = worker_id
+        self._last_ms = 0
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def next_value(self) -> int:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000 - ORDER_NUMBER_EPOCH_MS
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            else:
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    self._last_ms += 1
+                    self._sequence = 0
+            return (
+                (self._last_ms << (WORKER_ID_BITS + SEQUENCE_BITS))
+                | (self.worker_id << SEQUENCE_BITS)
+                | self._sequence
+            )
+
+    def next(self) -> str:
+        return f"{ORDER_NUMBER_PREFIX}{ORDER_NUMBER_MARKER}{self.next_value():019d}"
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def lease_worker_id(db_engine: Engine = engine) -> int:
+    hostname = socket.gethostname()
+    while True:
+        with Session(db_engine) as session:
+            leases = session.exec(select(OrderNumberWorker)).all()
+            stale = [
+                lease.worker_id
+                for lease in leases
+                if lease.hostname == hostname and not _pid_alive(lease.pid)
+            ]
+            if stale:
+                session.exec(
+                    delete(OrderNumberWorker).where(
+                        OrderNumberWorker.worker_id.in_(stale)
+                    )
+                )
+            used = {lease.worker_id for lease in leases} - set(stale)
+            free = (
+                candidate for candidate in range(MAX_WORKER_ID + 1) if candidate not in used
+            )
+            worker_id = next(free, None)
+            if worker_id is None:
+                raise RuntimeError("No free order number worker ids")
+            session.add(
+                OrderNumberWorker(
+                    worker_id=worker_id,
+                    hostname=hostname,
+                    pid=os.getpid(),
+                    leased_at=datetime.utcnow(),
+                )
+            )
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+                continue
+            return worker_id
+
+
+def release_worker_id(worker_id: int, db_engine: Engine = engine) -> None:
+    with Session(db_engine) as session:
+        session.exec(
+            delete(OrderNumberWorker).where(
+                OrderNumberWorker.worker_id == worker_id,
+                OrderNumberWorker.pid == os.getpid(),
+            )
+        )
+        session.commit()
+
+
+_generator: Optional[OrderNumberGenerator] = None
+_generator_lock = threading.Lock()
+
+
+def configure_order_numbers(db_engine: Engine = engine) -> OrderNumberGenerator:
+    global _generator
+    with _generator_lock:
+        if _generator is None:
+            configured = os.getenv("SHOPMALL_WORKER_ID")
+            worker_id = int(configured) if configured else lease_worker_id(db_engine)
+            _generator = OrderNumberGenerator(worker_id)
+        return _generator
+
+
+def shutdown_order_numbers(db_engine: Engine = engine) -> None:
+    global _generator
+    with _generator_lock:
+        if _generator is not None and not os.getenv("SHOPMALL_WORKER_ID"):
+            release_worker_id(_generator.worker_id, db_engine)
+        _generator = None
+
+
+def generate_order_number() -> str:
+    return (_generator or configure_order_numbers()).next()
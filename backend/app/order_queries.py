@@ -0,0 +1,244 @@
+import base64
+import json
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, Response
+from pydantic_core import to_json
+from sqlalchemy import and_, or_
+from sqlmodel import Session, SQLModel, select
+
+from app.models import Order, OrderArchive, OrderLine
+from app.schemas import OrderItem, OrderListQuery, OrderRead
+from app.serialization import FAST_SERIALIZATION, json_response, rows_as_dicts
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+ORDER_FIELDS = tuple(OrderRead.model_fields)
+ORDER_COLUMNS = tuple(field for field in ORDER_FIELDS if field != "items")
+ORDER_ITEMS_CHUNK = 900
+
+
+def encode_cursor(created_at: datetime, order_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{order_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, order_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(order_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: str | None) -> list[str] | None:
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in ORDER_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown order fields: {', '.join(unknown)}"
+        )
+    return requested
+
+
+def load_order_item_dicts(
+    session: Session, order_ids: list[int]
+) -> dict[int, list[dict[str, Any]]]:
+    items: dict[int, list[dict[str, Any]]] = defaultdict(list)
+    for start in range(0, len(order_ids), ORDER_ITEMS_CHUNK):
+        lines = session.exec(
+            select(
+                OrderLine.order_id,
+                OrderLine.product_id,
+                OrderLine.name,
+                OrderLine.price,
+                OrderLine.quantity,
+                OrderLine.image_url,
+            )
+            .where(OrderLine.order_id.in_(order_ids[start : start + ORDER_ITEMS_CHUNK]))
+            .order_by(OrderLine.order_id, OrderLine.id)
+        ).all()
+        for order_id, product_id, name, price, quantity, image_url in lines:
+            items[order_id].append(
+                {
+                    "id": product_id,
+                    "name": name,
+                    "price": price,
+                    "quantity": quantity,
+                    "image_url": image_url,
+                }
+            )
+    return items
+
+
+def pack_order_items(items: list[dict[str, Any]]) -> bytes:
+    return zlib.compress(to_json(items))
+
+
+def unpack_order_items(packed: bytes) -> list[dict[str, Any]]:
+    return json.loads(zlib.decompress(packed))
+
+
+def load_order_items(
+    session: Session, order_ids: list[int]
+) -> dict[int, list[OrderItem]]:
+    return {
+        order_id: [OrderItem(**item) for item in items]
+        for order_id, items in load_order_item_dicts(session, order_ids).items()
+    }
+
+
+def build_order_reads(session: Session, orders: list[Order]) -> list[OrderRead]:
+    items = load_order_items(session, [order.id for order in orders])
+    return [
+        OrderRead(**order.model_dump(), items=items.get(order.id, []))
+        for order in orders
+    ]
+
+
+def order_list_conditions(
+    query: OrderListQuery, model: type[SQLModel] = Order
+) -> list[Any]:
+    conditions = []
+    if query.status:
+        conditions.append(model.status == query.status)
+    if query.distributor_code:
+        conditions.append(model.distributor_code == query.distributor_code)
+    if query.created_after:
+        conditions.append(model.created_at >= query.created_after)
+    if query.created_before:
+        conditions.append(model.created_at < query.created_before)
+    if query.cursor:
+        created_at, order_id = decode_cursor(query.cursor)
+        if query.order == "desc":
+            conditions.append(
+                or_(
+                    model.created_at < created_at,
+                    and_(model.created_at == created_at, model.id < order_id),
+                )
+            )
+        else:
+            conditions.append(
+                or_(
+                    model.created_at > created_at,
+                    and_(model.created_at == created_at, model.id > order_id),
+                )
+            )
+    return conditions
+
+
+def _order_page_statement(
+    query: OrderListQuery, statement, *conditions: Any, model: type[SQLModel] = Order
+):
+    if query.order == "desc":
+        ordering = (model.created_at.desc(), model.id.desc())
+    else:
+        ordering = (model.created_at, model.id)
+    statement = statement.where(
+        *conditions, *order_list_conditions(query, model)
+    ).order_by(*ordering)
+    if query.limit:
+        statement = statement.limit(query.limit + 1)
+    return statement
+
+
+def load_order_page_rows(
+    session: Session, query: OrderListQuery, fields: tuple[str, ...], *conditions: Any
+) -> list[dict[str, Any]]:
+    columns = {"id", "created_at", *fields}
+    statement = select(
+        *(getattr(Order, name) for name in ORDER_COLUMNS if name in columns)
+    )
+    rows = rows_as_dicts(
+        session.exec(_order_page_statement(query, statement, *conditions)).all()
+    )
+    if "items" in fields:
+        items = load_order_item_dicts(session, [row["id"] for row in rows])
+        for row in rows:
+            row["items"] = items.get(row["id"], [])
+    return rows
+
+
+def load_archived_order_page_rows(
+    session: Session, query: OrderListQuery, fields: tuple[str, ...], *conditions: Any
+) -> list[dict[str, Any]]:
+    columns = {"id", "created_at", *fields}
+    statement = select(
+        *(getattr(OrderArchive, name) for name in ORDER_FIELDS if name in columns)
+    )
+    rows = rows_as_dicts(
+        session.exec(
+            _order_page_statement(query, statement, *conditions, model=OrderArchive)
+        ).all()
+    )
+    if "items" in fields:
+        for row in rows:
+            row["items"] = unpack_order_items(row["items"])
+    return rows
+
+
+def order_page_response(
+    query: OrderListQuery, fields: tuple[str, ...], rows: list[dict[str, Any]]
+) -> Response:
+    next_cursor = None
+    if query.limit and len(rows) > query.limit:
+        rows = rows[: query.limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    content = [{name: row[name] for name in fields} for row in rows]
+    return json_response(content, headers)
+
+
+def merge_order_pages(
+    query: OrderListQuery, pages: list[list[dict[str, Any]]]
+) -> list[dict[str, Any]]:
+    rows = sorted(
+        (row for page in pages for row in page),
+        key=lambda row: (row["created_at"], row["id"]),
+        reverse=query.order == "desc",
+    )
+    return rows[: query.limit + 1] if query.limit else rows
+
+
+def list_orders_page(
+    session: Session,
+    query: OrderListQuery,
+    response: Response,
+    *conditions: Any,
+) -> Any:
+    fields = parse_fields(query.fields)
+    if fields is not None or FAST_SERIALIZATION:
+        fields = tuple(fields or ORDER_FIELDS)
+        return order_page_response(
+            query, fields, load_order_page_rows(session, query, fields, *conditions)
+        )
+
+    rows = session.exec(_order_page_statement(query, select(Order), *conditions)).all()
+    if query.limit and len(rows) > query.limit:
+        rows = rows[: query.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            rows[-1].created_at, rows[-1].id
+        )
+    return build_order_reads(session, rows)
+
+
+async def list_orders_across_shards(
+    router: Any,
+    query: OrderListQuery,
+    *conditions: Any,
+    archive_conditions: Optional[tuple[Any, ...]] = None,
+) -> Response:
+    fields = tuple(parse_fields(query.fields) or ORDER_FIELDS)
+    pages = await router.gather(load_order_page_rows, query, fields, *conditions)
+    if archive_conditions is not None:
+        # Archived orders keep their ids and created_at, so the same keyset
+        # cursor pages through hot and archived orders as one list.
+        pages += await router.gather(
+            load_archived_order_page_rows, query, fields, *archive_conditions
+        )
+    return order_page_response(query, fields, merge_order_pages(query, pages))
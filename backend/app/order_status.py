@@ -0,0 +1,152 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+
+from app.events import ORDER_UPDATED, record_order_event
+from app.inventory import order_line_quantities, release_stock, reserve_stock
+from app.models import Order, OrderLine
+from app.order_queries import ORDER_ITEMS_CHUNK, build_order_reads
+from app.schemas import OrderBulkStatusResult, OrderBulkStatusUpdate, OrderRead
+from app.summary import (
+    apply_completion_bucket,
+    apply_order_rollup,
+    record_order_completion_change,
+    record_order_status_change,
+)
+
+CANCELLED = "已取消"
+COMPLETED = "已完成"
+
+
+def _chunks(ids: list[int], size: int = ORDER_ITEMS_CHUNK):
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+def apply_order_status(session: Session, order: Order, status: str) -> OrderRead:
+    previous_status = order.status
+    previous_completed_on = (order.completed_at or order.created_at).date()
+    if order.distributor_code and (previous_status == CANCELLED) != (
+        status == CANCELLED
+    ):
+        quantities = order_line_quantities(session, order.id)
+        if status == CANCELLED:
+            release_stock(session, order.distributor_code, quantities)
+        else:
+            reserve_stock(session, order.distributor_code, quantities)
+    order.status = status
+    order.completed_at = datetime.utcnow() if status == COMPLETED else None
+    session.add(order)
+    record_order_status_change(session, order, previous_status)
+    record_order_completion_change(
+        session, order, previous_status, previous_completed_on
+    )
+    order_read = build_order_reads(session, [order])[0]
+    record_order_event(session, ORDER_UPDATED, order_read)
+    return order_read
+
+
+def _bulk_conditions(payload: OrderBulkStatusUpdate) -> list:
+    conditions = [Order.status != payload.status]
+    if payload.order_ids is not None:
+        conditions.append(Order.id.in_(payload.order_ids))
+    if payload.distributor_code:
+        conditions.append(Order.distributor_code == payload.distributor_code)
+    if payload.current_status:
+        conditions.append(Order.status == payload.current_status)
+    if payload.created_before:
+        conditions.append(Order.created_at < payload.created_before)
+    return conditions
+
+
+def _line_quantities(
+    session: Session, order_ids: list[int]
+) -> dict[str, dict[int, int]]:
+    quantities: dict[str, Counter] = defaultdict(Counter)
+    for chunk in _chunks(order_ids):
+        rows = session.exec(
+            select(Order.distributor_code, OrderLine.product_id, func.sum(OrderLine.quantity))
+            .join(Order, Order.id == OrderLine.order_id)
+            .where(OrderLine.order_id.in_(chunk))
+            .group_by(Order.distributor_code, OrderLine.product_id)
+        ).all()
+        for distributor_code, product_id, quantity in rows:
+            quantities[distributor_code][product_id] += quantity
+    return {code: dict(counts) for code, counts in quantities.items()}
+
+
+def bulk_update_order_status(
+    session: Session, payload: OrderBulkStatusUpdate
+) -> OrderBulkStatusResult:
+    rows = session.exec(
+        select(
+            Order.id,
+            Order.distributor_code,
+            Order.status,
+            Order.total,
+            Order.created_at,
+            Order.completed_at,
+        )
+        .where(*_bulk_conditions(payload))
+        .order_by(Order.id)
+        .with_for_update()
+    ).all()
+    if not rows:
+        return OrderBulkStatusResult(updated=0, order_ids=[])
+
+    new_status = payload.status
+    completed_at: Optional[datetime] = (
+        datetime.utcnow() if new_status == COMPLETED else None
+    )
+    rollups: dict[tuple[Optional[str], str], list[float]] = defaultdict(lambda: [0, 0.0])
+    buckets: Counter = Counter()
+    toggled_ids = []
+    for order_id, distributor_code, status, total, created_at, previous_completed in rows:
+        rollups[(distributor_code, status)][0] -= 1
+        rollups[(distributor_code, status)][1] -= total
+        rollups[(distributor_code, new_status)][0] += 1
+        rollups[(distributor_code, new_status)][1] += total
+        if status == COMPLETED:
+            buckets[(distributor_code, (previous_completed or created_at).date())] -= 1
+        if completed_at is not None:
+            buckets[(distributor_code, completed_at.date())] += 1
+        if distributor_code and (status == CANCELLED) != (new_status == CANCELLED):
+            toggled_ids.append(order_id)
+
+    if toggled_ids:
+        for distributor_code, quantities in _line_quantities(session, toggled_ids).items():
+            if new_status == CANCELLED:
+                release_stock(session, distributor_code, quantities)
+            else:
+                reserve_stock(session, distributor_code, quantities)
+
+    order_ids = [row[0] for row in rows]
+    for chunk in _chunks(order_ids):
+        session.exec(
+            update(Order)
+            .where(Order.id.in_(chunk))
+            .values(status=new_status, completed_at=completed_at)
+            .execution_options(synchronize_session=False)
+        )
+    for (distributor_code, status), (count, amount) in rollups.items():
+        if count:
+            apply_order_rollup(session, distributor_code, status, count, amount)
+    for (distributor_code, completed_on), count in buckets.items():
+        if count:
+            apply_completion_bucket(session, distributor_code, completed_on, count)
+
+    for chunk in _chunks(order_ids):
+        orders = session.exec(select(Order).where(Order.id.in_(chunk))).all()
+        for order in build_order_reads(session, orders):
+            record_order_event(session, ORDER_UPDATED, order)
+    return OrderBulkStatusResult(updated=len(order_ids), order_ids=order_ids)
+
+
+def merge_bulk_status_results(
+    results: list[OrderBulkStatusResult],
+) -> OrderBulkStatusResult:
+    order_ids = [order_id for result in results for order_id in result.order_ids]
+    return OrderBulkStatusResult(updated=len(order_ids), order_ids=order_ids)
@@ -0,0 +1,144 @@
+import logging
+
+from sqlalchemy import case, column, func, literal_column, or_, table, text
+from sqlmodel import Session, select
+
+from app.models import Product
+from app.schemas import ProductRead, ProductSearchQuery
+from app.serialization import rows_as_dicts, schema_columns
+
+logger = logging.getLogger("uvicorn.error")
+
+PRODUCT_SEARCH_TABLE = "product_search"
+TRIGRAM_MIN_LENGTH = 3
+# bm25 column weights for name, category and tags.
+PRODUCT_SEARCH_WEIGHTS = (10.0, 4.0, 2.0)
+FTS5_TRIGRAM_VERSION = (3, 34, 0)
+
+product_search = table(
+    PRODUCT_SEARCH_TABLE,
+    column("rowid"),
+    column("name"),
+    column("category"),
+    column("tags"),
+)
+
+PRODUCT_SEARCH_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {PRODUCT_SEARCH_TABLE} USING fts5("
+    "name, category, tags, content='product', content_rowid='id', "
+    "tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {PRODUCT_SEARCH_TABLE}_ai AFTER INSERT ON product "
+    f"BEGIN INSERT INTO {PRODUCT_SEARCH_TABLE} (rowid, name, category, tags) "
+    "VALUES (new.id, new.name, new.category, new.tags); END",
+    f"CREATE TRIGGER IF NOT EXISTS {PRODUCT_SEARCH_TABLE}_ad AFTER DELETE ON product "
+    f"BEGIN INSERT INTO {PRODUCT_SEARCH_TABLE} "
+    f"({PRODUCT_SEARCH_TABLE}, rowid, name, category, tags) "
+    "VALUES ('delete', old.id, old.name, old.category, old.tags); END",
+    f"CREATE TRIGGER IF NOT EXISTS {PRODUCT_SEARCH_TABLE}_au "
+    "AFTER UPDATE OF name, category, tags ON product "
+    f"BEGIN INSERT INTO {PRODUCT_SEARCH_TABLE} "
+    f"({PRODUCT_SEARCH_TABLE}, rowid, name, category, tags) "
+    "VALUES ('delete', old.id, old.name, old.category, old.tags); "
+    f"INSERT INTO {PRODUCT_SEARCH_TABLE} (rowid, name, category, tags) "
+    "VALUES (new.id, new.name, new.category, new.tags); END",
+)
+
+_search_tables: dict[str, bool] = {}
+
+
+def fts5_trigram_supported(session: Session) -> bool:
+    if session.get_bind().dialect.name != "sqlite":
+        return False
+    version, has_fts5 = session.exec(
+        text("SELECT sqlite_version(), sqlite_compileoption_used('ENABLE_FTS5')")
+    ).one()
+    return bool(has_fts5) and tuple(map(int, version.split("."))) >= FTS5_TRIGRAM_VERSION
+
+
+def create_product_search(session: Session) -> None:
+    if not fts5_trigram_supported(session):
+        logger.warning(
+            "SQLite FTS5 with the trigram tokenizer is unavailable; "
+            "product search falls back to LIKE scans"
+        )
+        return
+    for statement in PRODUCT_SEARCH_DDL:
+        session.exec(text(statement))
+    session.exec(
+        text(f"INSERT INTO {PRODUCT_SEARCH_TABLE} ({PRODUCT_SEARCH_TABLE}) VALUES ('rebuild')")
+    )
+    _search_tables.clear()
+
+
+def product_search_enabled(session: Session) -> bool:
+    bind = session.get_bind()
+    key = bind.url.render_as_string(hide_password=True)
+    if key not in _search_tables:
+        _search_tables[key] = bind.dialect.name == "sqlite" and (
+            session.exec(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                params={"name": PRODUCT_SEARCH_TABLE},
+            ).first()
+            is not None
+        )
+    return _search_tables[key]
+
+
+def _match_expression(terms: list[str]) -> str:
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def _contains_term(term: str):
+    return or_(
+        Product.name.contains(term, autoescape=True),
+        Product.category.contains(term, autoescape=True),
+        Product.tags.contains(term, autoescape=True),
+    )
+
+
+def search_products(session: Session, query: ProductSearchQuery) -> dict:
+    terms = list(dict.fromkeys(query.q.split())) if query.q else []
+    use_index = bool(terms) and product_search_enabled(session)
+    # Trigram indexes cannot answer terms shorter than three characters (most
+    # two-character Chinese words), so those are matched with LIKE instead.
+    match_terms = [
+        term for term in terms if use_index and len(term) >= TRIGRAM_MIN_LENGTH
+    ]
+    like_terms = [term for term in terms if term not in match_terms]
+
+    conditions = [_contains_term(term) for term in like_terms]
+    if query.category:
+        conditions.append(Product.category == query.category)
+    if query.min_price is not None:
+        conditions.append(Product.price >= query.min_price)
+    if query.max_price is not None:
+        conditions.append(Product.price <= query.max_price)
+
+    if match_terms:
+        rank = func.bm25(literal_column(PRODUCT_SEARCH_TABLE), *PRODUCT_SEARCH_WEIGHTS)
+        conditions.append(
+            literal_column(PRODUCT_SEARCH_TABLE).op("MATCH")(
+                _match_expression(match_terms)
+            )
+        )
+    elif terms:
+        rank = case((Product.name.contains(terms[0], autoescape=True), 0), else_=1)
+    else:
+        rank = None
+
+    statement = select(*schema_columns(Product, ProductRead)).where(*conditions)
+    if match_terms:
+        statement = statement.join(product_search, product_search.c.rowid == Product.id)
+    total = session.exec(
+        select(func.count()).select_from(statement.subquery())
+    ).one()
+
+    ordering = [Product.is_featured.desc()] if query.featured_first else []
+    if rank is not None:
+        ordering.append(rank)
+    rows = session.exec(
+        statement.order_by(*ordering, Product.id)
+        .limit(query.limit)
+        .offset(query.offset)
+    ).all()
+    return {"items": rows_as_dicts(rows), "total": total}
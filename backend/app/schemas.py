@@ -1,7 +1,13 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
+
+
+class ImageVariant(BaseModel):
+    width: int
+    url: str
+    webp_url: str
 
 
 class ProductRead(BaseModel):
@@ -12,6 +18,7 @@ class ProductRead(BaseModel):
     image_url: str
     tags: Optional[str] = None
     is_featured: bool
+    image_variants: dict[str, ImageVariant] = {}
 
 
 class InventoryItem(BaseModel):
@@ -38,12 +45,48 @@ class OrderRead(BaseModel):
     created_at: datetime
 
 
+class OrderListQuery(BaseModel):
+    status: Optional[str] = None
+    distributor_code: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    cursor: Optional[str] = None
+    limit: Optional[int] = Field(default=None, ge=1, le=500)
+    order: Literal["asc", "desc"] = "asc"
+    fields: Optional[str] = None
+
+
+class UserOrderListQuery(OrderListQuery):
+    include_archived: bool = False
+
+
 class OrderCreate(BaseModel):
     user_id: Optional[int] = None
     phone: Optional[str] = None
     distributor_code: Optional[str] = None
     total: float
     items: list[OrderItem]
+    idempotency_key: Optional[str] = Field(default=None, max_length=128)
+
+
+class OrderBatchCreate(BaseModel):
+    orders: list[OrderCreate] = Field(min_length=1, max_length=500)
+
+
+class OrderBatchResult(BaseModel):
+    index: int
+    status: Literal["created", "existing", "error"]
+    order: Optional[OrderRead] = None
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    product_ids: Optional[list[int]] = None
+
+
+class OrderBatchResponse(BaseModel):
+    created: int
+    existing: int
+    failed: int
+    results: list[OrderBatchResult]
 
 
 class DashboardSummary(BaseModel):
@@ -53,6 +96,54 @@ class DashboardSummary(BaseModel):
     featured_products: int
 
 
+class ProductSales(BaseModel):
+    product_id: int
+    name: str
+    units: int
+    revenue: float
+
+
+class CategorySales(BaseModel):
+    category: str
+    units: int
+    revenue: float
+
+
+class DatabaseDiagnostics(BaseModel):
+    url: str
+    dialect: str
+    pool_class: str
+    pool_size: int
+    max_overflow: int
+    pool_timeout: int
+    pool_status: str
+    pragmas: dict[str, Any]
+
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    invalidations: int
+    entries: int
+    version: int
+
+
+class EventHubStats(BaseModel):
+    backend: str
+    subscribers: int
+    published: int
+    delivered: int
+    resyncs: int
+
+
+class ImageDerivativeStats(BaseModel):
+    enabled: bool
+    ready: int
+    pending: int
+    generated: int
+    failures: int
+
+
 class CompletedOrderSeries(BaseModel):
     label: str
     count: int
@@ -101,6 +192,31 @@ class OrderStatusUpdate(BaseModel):
     status: str
 
 
+class OrderBulkStatusUpdate(BaseModel):
+    status: str
+    order_ids: Optional[list[int]] = Field(default=None, max_length=5000)
+    distributor_code: Optional[str] = None
+    current_status: Optional[str] = None
+    created_before: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_selection(self) -> "OrderBulkStatusUpdate":
+        if (
+            self.order_ids is None
+            and self.distributor_code is None
+            and self.current_status is None
+        ):
+            raise ValueError(
+                "Provide order_ids or at least one of distributor_code and current_status"
+            )
+        return self
+
+
+class OrderBulkStatusResult(BaseModel):
+    updated: int
+    order_ids: list[int]
+
+
 class ProductCreate(BaseModel):
     name: str
     category: str
@@ -110,6 +226,50 @@ class ProductCreate(BaseModel):
     is_featured: Optional[bool] = False
 
 
+class ProductSearchQuery(BaseModel):
+    q: Optional[str] = Field(default=None, max_length=100)
+    category: Optional[str] = None
+    min_price: Optional[float] = Field(default=None, ge=0)
+    max_price: Optional[float] = Field(default=None, ge=0)
+    featured_first: bool = True
+    limit: int = Field(default=20, ge=1, le=100)
+    offset: int = Field(default=0, ge=0)
+
+
+class ProductSearchPage(BaseModel):
+    items: list[ProductRead]
+    total: int
+
+
+class StorefrontQuery(BaseModel):
+    in_stock: bool = True
+    category: Optional[str] = None
+    limit: Optional[int] = Field(default=None, ge=1, le=500)
+    offset: int = Field(default=0, ge=0)
+
+
+class StorefrontProduct(ProductRead):
+    stock: int
+
+
+class StorefrontPage(BaseModel):
+    distributor_code: str
+    items: list[StorefrontProduct]
+    total: int
+
+
+class ProductImportStatus(BaseModel):
+    id: str
+    status: str
+    rows: int
+    inserted: int
+    updated: int
+    skipped: int
+    batches: int
+    elapsed: float
+    error: Optional[str] = None
+
+
 class SupplierDistributor(BaseModel):
     code: str
     name: str
@@ -125,3 +285,19 @@ class SupplierRead(BaseModel):
 
 class InventoryUpdate(BaseModel):
     items: list[InventoryItem]
+
+
+class InventoryAdjustment(BaseModel):
+    product_id: int
+    stock: Optional[int] = Field(default=None, ge=0)
+    delta: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_stock_or_delta(self) -> "InventoryAdjustment":
+        if (self.stock is None) == (self.delta is None):
+            raise ValueError("Provide exactly one of stock or delta")
+        return self
+
+
+class InventoryPatch(BaseModel):
+    items: list[InventoryAdjustment]
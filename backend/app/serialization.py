@@ -0,0 +1,32 @@
+from collections.abc import Iterable, Mapping
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+from sqlmodel import SQLModel, select
+
+from app.config import SERIALIZATION_CONFIG
+
+FAST_SERIALIZATION = SERIALIZATION_CONFIG["fast_path"]
+
+
+def schema_columns(model: type[SQLModel], schema: type[BaseModel]) -> tuple:
+    columns = model.__table__.columns
+    return tuple(getattr(model, name) for name in schema.model_fields if name in columns)
+
+
+def select_schema(model: type[SQLModel], schema: type[BaseModel]):
+    return select(*schema_columns(model, schema))
+
+
+def rows_as_dicts(rows: Iterable[Any]) -> list[dict[str, Any]]:
+    return [dict(row._mapping) for row in rows]
+
+
+def json_response(
+    content: Any, headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    return Response(
+        content=to_json(content), media_type="application/json", headers=headers
+    )
@@ -0,0 +1,204 @@
+import asyncio
+import os
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import CONFIG, DATABASE_CONFIG, SHARD_CONFIG
+from app.db import async_engine, create_async_db_engine, create_db_engine, engine
+from app.models import (
+    DistributorInventory,
+    Order,
+    OrderArchive,
+    OrderCompletionBucket,
+    OrderEventLog,
+    OrderLine,
+    OrderRollup,
+    OrderSalesArchive,
+)
+
+CATALOG_ALIAS = "catalog"
+# Each shard hands out order ids from its own range so an id alone is enough
+# to find the shard that owns the order; the catalog keeps range 0.
+ORDER_ID_STRIDE = 1 << 40
+SHARDED_TABLES = tuple(
+    model.__table__
+    for model in (
+        Order,
+        OrderLine,
+        DistributorInventory,
+        OrderRollup,
+        OrderCompletionBucket,
+        OrderEventLog,
+        OrderArchive,
+        OrderSalesArchive,
+    )
+)
+SHARD_SPLIT_COLUMNS = {
+    "order": (
+        "id",
+        "user_id",
+        "distributor_code",
+        "order_number",
+        "status",
+        "total",
+        "created_at",
+        "completed_at",
+        "idempotency_key",
+    ),
+    "order_line": ("id", "order_id", "product_id", "name", "price", "quantity", "image_url"),
+    "distributorinventory": ("distributor_code", "product_id", "stock"),
+    "order_archive": tuple(column.name for column in OrderArchive.__table__.columns),
+    "order_sales_archive": tuple(
+        column.name for column in OrderSalesArchive.__table__.columns
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int
+    code: Optional[str]
+    engine: Engine
+    async_engine: AsyncEngine
+
+    @property
+    def order_id_base(self) -> int:
+        return self.index * ORDER_ID_STRIDE
+
+
+class ShardRouter:
+    def __init__(
+        self,
+        settings: dict = SHARD_CONFIG,
+        database: dict = DATABASE_CONFIG,
+        suppliers: list[dict] = CONFIG["suppliers"],
+    ) -> None:
+        self.enabled = settings["enabled"]
+        self.catalog = Shard(0, None, engine, async_engine)
+        self._by_code: dict[str, Shard] = {}
+        if not self.enabled:
+            return
+        catalog_url = make_url(database["url"])
+        if catalog_url.get_backend_name() != "sqlite" or not catalog_url.database:
+            raise ValueError("Sharding requires a file-backed SQLite catalog database")
+        # Shards attach the catalog so joins against product and user still
+        # resolve; only order, inventory and rollup tables live in the shard.
+        attach = {CATALOG_ALIAS: os.path.abspath(catalog_url.database)}
+        for index, supplier in enumerate(suppliers, start=1):
+            code = supplier["distributor"]["code"]
+            shard_settings = {
+                **database,
+                "url": settings["url_template"].format(code=code),
+                "async_url": None,
+                "attach": attach,
+            }
+            self._by_code[code] = Shard(
+                index,
+                code,
+                create_db_engine(shard_settings),
+                create_async_db_engine(shard_settings),
+            )
+
+    @property
+    def shards(self) -> list[Shard]:
+        return [self.catalog, *self._by_code.values()]
+
+    def for_code(self, distributor_code: Optional[str]) -> Shard:
+        return self._by_code.get(distributor_code or "", self.catalog)
+
+    def shards_for(self, distributor_code: Optional[str]) -> list[Shard]:
+        if distributor_code:
+            return [self.for_code(distributor_code)]
+        return self.shards
+
+    def order_shards(self, order_id: int) -> list[Shard]:
+        # Orders moved by split_catalog keep their original ids, so fall back
+        # to the other shards when the id range does not own the order.
+        preferred = order_id // ORDER_ID_STRIDE
+        return sorted(self.shards, key=lambda shard: shard.index != preferred)
+
+    def session(self, distributor_code: Optional[str]) -> Session:
+        return Session(self.for_code(distributor_code).engine)
+
+    def async_session(self, distributor_code: Optional[str]) -> AsyncSession:
+        return AsyncSession(self.for_code(distributor_code).async_engine)
+
+    async def gather(
+        self, function: Callable[..., Any], *args: Any, shards: Optional[list[Shard]] = None
+    ) -> list[Any]:
+        async def run(shard: Shard) -> Any:
+            async with AsyncSession(shard.async_engine) as session:
+                return await session.run_sync(function, *args)
+
+        return await asyncio.gather(*(run(shard) for shard in shards or self.shards))
+
+    def prepare(self) -> None:
+        for shard in self.shards[1:]:
+            with shard.engine.begin() as connection:
+                SQLModel.metadata.create_all(connection, tables=list(SHARDED_TABLES))
+                for table in SHARDED_TABLES:
+                    for index in table.indexes:
+                        index.create(connection, checkfirst=True)
+                connection.execute(
+                    text(
+                        "INSERT INTO sqlite_sequence (name, seq) SELECT 'order', :base "
+                        "WHERE NOT EXISTS "
+                        "(SELECT 1 FROM sqlite_sequence WHERE name = 'order')"
+                    ),
+                    {"base": shard.order_id_base},
+                )
+
+    def split_catalog(self) -> dict[str, int]:
+        moved = {}
+        for shard in self.shards[1:]:
+            with shard.engine.begin() as connection:
+                order_ids = (
+                    f'SELECT id FROM {CATALOG_ALIAS}."order" WHERE distributor_code = :code'
+                )
+                for table, where in (
+                    ("order", "distributor_code = :code"),
+                    ("order_line", f"order_id IN ({order_ids})"),
+                    ("distributorinventory", "distributor_code = :code"),
+                    ("order_archive", "distributor_code = :code"),
+                    ("order_sales_archive", "distributor_code = :code"),
+                ):
+                    columns = ", ".join(SHARD_SPLIT_COLUMNS[table])
+                    connection.execute(
+                        text(
+                            f'INSERT OR IGNORE INTO main."{table}" ({columns}) '
+                            f'SELECT {columns} FROM {CATALOG_ALIAS}."{table}" WHERE {where}'
+                        ),
+                        {"code": shard.code},
+                    )
+            # WAL databases do not commit atomically across attachments, so the
+            # catalog copy is only removed once the shard copy is durable.
+            with shard.engine.begin() as connection:
+                for table, where in (
+                    ("order_line", f"order_id IN ({order_ids})"),
+                    ("distributorinventory", "distributor_code = :code"),
+                    ("order_archive", "distributor_code = :code"),
+                    ("order_sales_archive", "distributor_code = :code"),
+                    ("order", "distributor_code = :code"),
+                ):
+                    result = connection.execute(
+                        text(f'DELETE FROM {CATALOG_ALIAS}."{table}" WHERE {where}'),
+                        {"code": shard.code},
+                    )
+                    if table == "order":
+                        moved[shard.code] = result.rowcount
+        return moved
+
+    async def dispose(self) -> None:
+        for shard in self.shards[1:]:
+            await shard.async_engine.dispose()
+            shard.engine.dispose()
+
+
+shard_router = ShardRouter()
@@ -0,0 +1,77 @@
+from typing import Optional
+
+from sqlalchemy import and_, func
+from sqlmodel import Session, select
+
+from app.config import SUPPLIER_CONFIG
+from app.models import DistributorInventory, Product
+from app.schemas import ProductRead, StorefrontQuery
+from app.serialization import rows_as_dicts, schema_columns
+
+SUPPLIER_BY_SUFFIX = {supplier["suffix"]: supplier for supplier in SUPPLIER_CONFIG}
+
+
+def resolve_supplier(suffix: str) -> Optional[dict]:
+    return SUPPLIER_BY_SUFFIX.get(suffix.strip().lower())
+
+
+def storefront_cache_key(distributor_code: str, query: StorefrontQuery) -> str:
+    return ":".join(
+        str(part)
+        for part in (
+            distributor_code,
+            int(query.in_stock),
+            query.category or "",
+            query.limit or "",
+            query.offset,
+        )
+    )
+
+
+def load_storefront(
+    session: Session, distributor_code: str, query: StorefrontQuery
+) -> dict:
+    stock = func.coalesce(DistributorInventory.stock, 0)
+    inventory = and_(
+        DistributorInventory.product_id == Product.id,
+        DistributorInventory.distributor_code == distributor_code,
+    )
+    statement = (
+        select(
+            *schema_columns(Product, ProductRead),
+            stock.label("stock"),
+            func.count().over().label("total"),
+        )
+        .select_from(Product)
+        .join(DistributorInventory, inventory, isouter=True)
+    )
+    conditions = []
+    if query.in_stock:
+        conditions.append(DistributorInventory.stock > 0)
+    if query.category:
+        conditions.append(Product.category == query.category)
+    statement = statement.where(*conditions).order_by(
+        Product.is_featured.desc(), Product.id
+    )
+    if query.limit is not None:
+        statement = statement.limit(query.limit)
+    if query.offset:
+        statement = statement.offset(query.offset)
+
+    items = rows_as_dicts(session.exec(statement).all())
+    if items:
+        total = items[0]["total"]
+    elif query.offset:
+        # The window count is only reported on returned rows, so a page past
+        # the end needs its own count.
+        total = session.exec(
+            select(func.count())
+            .select_from(Product)
+            .join(DistributorInventory, inventory, isouter=True)
+            .where(*conditions)
+        ).one()
+    else:
+        total = 0
+    for item in items:
+        del item["total"]
+    return {"distributor_code": distributor_code, "items": items, "total": total}
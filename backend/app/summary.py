@@ -0,0 +1,457 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, union_all
+from sqlmodel import Session, select
+
+from app.db import upsert
+from app.distributors import DistributorEntry
+from app.models import (
+    Order,
+    OrderArchive,
+    OrderCompletionBucket,
+    OrderLine,
+    OrderRollup,
+    OrderSalesArchive,
+    Product,
+    User,
+)
+from app.schemas import CategorySales, DashboardSummary, DistributorSummary, ProductSales
+
+
+def _rollup_key(distributor_code: Optional[str]) -> str:
+    return distributor_code or ""
+
+
+def apply_order_rollup(
+    session: Session,
+    distributor_code: Optional[str],
+    status: str,
+    count: int,
+    amount: float,
+) -> None:
+    statement = upsert(session, OrderRollup.__table__).values(
+        distributor_code=_rollup_key(distributor_code),
+        status=status,
+        order_count=count,
+        total_amount=amount,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["distributor_code", "status"],
+        set_={
+            "order_count": OrderRollup.__table__.c.order_count + count,
+            "total_amount": OrderRollup.__table__.c.total_amount + amount,
+        },
+    )
+    session.exec(statement)
+
+
+def record_order_created(session: Session, order: Order) -> None:
+    apply_order_rollup(session, order.distributor_code, order.status, 1, order.total)
+
+
+def record_order_status_change(
+    session: Session, order: Order, previous_status: str
+) -> None:
+    if previous_status == order.status:
+        return
+    apply_order_rollup(
+        session, order.distributor_code, previous_status, -1, -order.total
+    )
+    apply_order_rollup(session, order.distributor_code, order.status, 1, order.total)
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _shift_month(day: date, offset: int) -> date:
+    month_index = day.year * 12 + day.month - 1 + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _completion_day(order: Order) -> date:
+    return (order.completed_at or order.created_at).date()
+
+
+def apply_completion_bucket(
+    session: Session, distributor_code: Optional[str], completed_on: date, count: int
+) -> None:
+    for period, bucket_start in (
+        ("day", completed_on),
+        ("month", _month_start(completed_on)),
+    ):
+        statement = upsert(session, OrderCompletionBucket.__table__).values(
+            distributor_code=_rollup_key(distributor_code),
+            period=period,
+            bucket_start=bucket_start,
+            completed_count=count,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["distributor_code", "period", "bucket_start"],
+            set_={
+                "completed_count": OrderCompletionBucket.__table__.c.completed_count
+                + count
+            },
+        )
+        session.exec(statement)
+
+
+def record_order_completion_change(
+    session: Session,
+    order: Order,
+    previous_status: str,
+    previous_completed_on: Optional[date],
+) -> None:
+    if previous_status == "已完成" and previous_completed_on is not None:
+        apply_completion_bucket(
+            session, order.distributor_code, previous_completed_on, -1
+        )
+    if order.status == "已完成":
+        apply_completion_bucket(session, order.distributor_code, _completion_day(order), 1)
+
+
+def _expected_completion_buckets(session: Session) -> Counter:
+    expected: Counter = Counter()
+    for model in (Order, OrderArchive):
+        rows = session.exec(
+            select(model.distributor_code, model.completed_at, model.created_at)
+            .where(model.status == "已完成")
+            .execution_options(yield_per=1000)
+        )
+        for distributor_code, completed_at, created_at in rows:
+            completed_on = (completed_at or created_at).date()
+            key = _rollup_key(distributor_code)
+            expected[(key, "day", completed_on)] += 1
+            expected[(key, "month", _month_start(completed_on))] += 1
+    return expected
+
+
+def backfill_completion_buckets(session: Session) -> int:
+    expected = _expected_completion_buckets(session)
+    session.exec(delete(OrderCompletionBucket))
+    if expected:
+        session.exec(
+            insert(OrderCompletionBucket.__table__),
+            params=[
+                {
+                    "distributor_code": distributor_code,
+                    "period": period,
+                    "bucket_start": bucket_start,
+                    "completed_count": count,
+                }
+                for (distributor_code, period, bucket_start), count in expected.items()
+            ],
+        )
+    return len(expected)
+
+
+def check_completion_buckets(session: Session) -> list[dict]:
+    expected = _expected_completion_buckets(session)
+    stored = {
+        (bucket.distributor_code, bucket.period, bucket.bucket_start): bucket.completed_count
+        for bucket in session.exec(select(OrderCompletionBucket)).all()
+    }
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        expected_count = expected.get(key, 0)
+        stored_count = stored.get(key, 0)
+        if expected_count != stored_count:
+            distributor_code, period, bucket_start = key
+            mismatches.append(
+                {
+                    "distributor_code": distributor_code,
+                    "period": period,
+                    "bucket_start": bucket_start.isoformat(),
+                    "expected": expected_count,
+                    "stored": stored_count,
+                }
+            )
+    return mismatches
+
+
+def rebuild_order_rollups(session: Session) -> int:
+    session.exec(delete(OrderRollup))
+    orders = union_all(
+        *(
+            select(model.distributor_code, model.status, model.total)
+            for model in (Order, OrderArchive)
+        )
+    ).subquery()
+    distributor_code = func.coalesce(orders.c.distributor_code, "")
+    grouped = select(
+        distributor_code,
+        orders.c.status,
+        func.count(),
+        func.coalesce(func.sum(orders.c.total), 0.0),
+    ).group_by(distributor_code, orders.c.status)
+    result = session.exec(
+        insert(OrderRollup.__table__).from_select(
+            ["distributor_code", "status", "order_count", "total_amount"], grouped
+        )
+    )
+    return result.rowcount
+
+
+def build_admin_summary(session: Session) -> DashboardSummary:
+    total_sales = session.exec(
+        select(func.coalesce(func.sum(OrderRollup.total_amount), 0.0))
+    ).one()
+    pending_orders = session.exec(
+        select(func.coalesce(func.sum(OrderRollup.order_count), 0)).where(
+            OrderRollup.status != "已完成"
+        )
+    ).one()
+    active_distributors = session.exec(
+        select(func.count(User.id)).where(User.role == "distributor")
+    ).one()
+    featured_products = session.exec(
+        select(func.count(Product.id)).where(Product.is_featured == True)  # noqa: E712
+    ).one()
+    return DashboardSummary(
+        total_sales=total_sales,
+        pending_orders=pending_orders,
+        active_distributors=active_distributors,
+        featured_products=featured_products,
+    )
+
+
+def merge_admin_summaries(summaries: list[DashboardSummary]) -> DashboardSummary:
+    # Every shard sees the same attached catalog, so user and product counts
+    # are taken once while order rollups are summed.
+    return summaries[0].model_copy(
+        update={
+            "total_sales": sum(summary.total_sales for summary in summaries),
+            "pending_orders": sum(summary.pending_orders for summary in summaries),
+        }
+    )
+
+
+def _order_line_conditions(
+    distributor_code: Optional[str], status: Optional[str]
+) -> list:
+    conditions = []
+    if distributor_code:
+        conditions.append(Order.distributor_code == distributor_code)
+    if status:
+        conditions.append(Order.status == status)
+    return conditions
+
+
+def _archived_sales_conditions(
+    distributor_code: Optional[str], status: Optional[str]
+) -> list:
+    conditions = []
+    if distributor_code:
+        conditions.append(OrderSalesArchive.distributor_code == distributor_code)
+    if status:
+        conditions.append(OrderSalesArchive.status == status)
+    return conditions
+
+
+def _archived_product_sales(
+    session: Session, distributor_code: Optional[str], status: Optional[str]
+) -> list[ProductSales]:
+    rows = session.exec(
+        select(
+            OrderSalesArchive.product_id,
+            func.max(OrderSalesArchive.name),
+            func.sum(OrderSalesArchive.units),
+            func.sum(OrderSalesArchive.revenue),
+        )
+        .where(*_archived_sales_conditions(distributor_code, status))
+        .group_by(OrderSalesArchive.product_id)
+    ).all()
+    return [
+        ProductSales(product_id=product_id, name=name, units=units, revenue=revenue)
+        for product_id, name, units, revenue in rows
+    ]
+
+
+def top_products(
+    session: Session,
+    limit: Optional[int],
+    by: str = "units",
+    distributor_code: Optional[str] = None,
+    status: Optional[str] = None,
+) -> list[ProductSales]:
+    archived = _archived_product_sales(session, distributor_code, status)
+    if archived:
+        hot = _top_line_products(session, None, by, distributor_code, status)
+        return merge_product_sales([hot, archived], limit, by)
+    return _top_line_products(session, limit, by, distributor_code, status)
+
+
+def _top_line_products(
+    session: Session,
+    limit: Optional[int],
+    by: str,
+    distributor_code: Optional[str],
+    status: Optional[str],
+) -> list[ProductSales]:
+    units = func.sum(OrderLine.quantity)
+    revenue = func.sum(OrderLine.price * OrderLine.quantity)
+    statement = select(
+        OrderLine.product_id, func.max(OrderLine.name), units, revenue
+    ).group_by(OrderLine.product_id)
+    conditions = _order_line_conditions(distributor_code, status)
+    if conditions:
+        statement = statement.join(Order, Order.id == OrderLine.order_id).where(
+            *conditions
+        )
+    ranking = revenue if by == "revenue" else units
+    rows = session.exec(
+        statement.order_by(ranking.desc(), OrderLine.product_id).limit(limit)
+    ).all()
+    return [
+        ProductSales(product_id=product_id, name=name, units=units, revenue=revenue)
+        for product_id, name, units, revenue in rows
+    ]
+
+
+def merge_product_sales(
+    results: list[list[ProductSales]], limit: Optional[int], by: str = "units"
+) -> list[ProductSales]:
+    merged: dict[int, ProductSales] = {}
+    for sales in results:
+        for sale in sales:
+            current = merged.get(sale.product_id)
+            if current is None:
+                merged[sale.product_id] = sale.model_copy()
+            else:
+                current.units += sale.units
+                current.revenue += sale.revenue
+    ranked = sorted(
+        merged.values(),
+        key=lambda sale: (-(sale.revenue if by == "revenue" else sale.units), sale.product_id),
+    )
+    return ranked[:limit]
+
+
+def merge_category_sales(results: list[list[CategorySales]]) -> list[CategorySales]:
+    merged: dict[str, CategorySales] = {}
+    for sales in results:
+        for sale in sales:
+            current = merged.get(sale.category)
+            if current is None:
+                merged[sale.category] = sale.model_copy()
+            else:
+                current.units += sale.units
+                current.revenue += sale.revenue
+    return sorted(merged.values(), key=lambda sale: -sale.revenue)
+
+
+def sales_by_category(
+    session: Session,
+    distributor_code: Optional[str] = None,
+    status: Optional[str] = None,
+) -> list[CategorySales]:
+    category = func.coalesce(Product.category, "")
+    units = func.sum(OrderLine.quantity)
+    revenue = func.sum(OrderLine.price * OrderLine.quantity)
+    statement = (
+        select(category, units, revenue)
+        .select_from(OrderLine)
+        .outerjoin(Product, Product.id == OrderLine.product_id)
+        .group_by(category)
+    )
+    conditions = _order_line_conditions(distributor_code, status)
+    if conditions:
+        statement = statement.join(Order, Order.id == OrderLine.order_id).where(
+            *conditions
+        )
+    rows = session.exec(statement.order_by(revenue.desc())).all()
+    sales = [
+        CategorySales(category=category, units=units, revenue=revenue)
+        for category, units, revenue in rows
+    ]
+    archived = session.exec(
+        select(
+            category,
+            func.sum(OrderSalesArchive.units),
+            func.sum(OrderSalesArchive.revenue),
+        )
+        .select_from(OrderSalesArchive)
+        .outerjoin(Product, Product.id == OrderSalesArchive.product_id)
+        .where(*_archived_sales_conditions(distributor_code, status))
+        .group_by(category)
+    ).all()
+    if not archived:
+        return sales
+    return merge_category_sales(
+        [
+            sales,
+            [
+                CategorySales(category=category, units=units, revenue=revenue)
+                for category, units, revenue in archived
+            ],
+        ]
+    )
+
+
+def _completion_counts(
+    session: Session, distributor_code: str, period: str, start: date, end: date
+) -> dict[date, int]:
+    rows = session.exec(
+        select(OrderCompletionBucket.bucket_start, OrderCompletionBucket.completed_count)
+        .where(
+            OrderCompletionBucket.distributor_code == distributor_code,
+            OrderCompletionBucket.period == period,
+            OrderCompletionBucket.bucket_start >= start,
+            OrderCompletionBucket.bucket_start <= end,
+        )
+    ).all()
+    return {bucket_start: count for bucket_start, count in rows}
+
+
+def build_distributor_summary(
+    session: Session, distributor: DistributorEntry
+) -> DistributorSummary:
+    distributor_code = distributor.code
+    total_orders = 0
+    total_amount = 0.0
+    daily_counts: dict[date, int] = {}
+    monthly_counts: dict[date, int] = {}
+    today = datetime.utcnow().date()
+    this_month = _month_start(today)
+    if distributor_code:
+        total_orders, total_amount = session.exec(
+            select(
+                func.coalesce(func.sum(OrderRollup.order_count), 0),
+                func.coalesce(func.sum(OrderRollup.total_amount), 0.0),
+            ).where(OrderRollup.distributor_code == distributor_code)
+        ).one()
+        daily_counts = _completion_counts(
+            session, distributor_code, "day", today - timedelta(days=6), today
+        )
+        monthly_counts = _completion_counts(
+            session, distributor_code, "month", _shift_month(this_month, -6), this_month
+        )
+    daily_completed_order_series = []
+    for offset in range(6, -1, -1):
+        day = today - timedelta(days=offset)
+        daily_completed_order_series.append(
+            {"label": day.strftime("%m-%d"), "count": daily_counts.get(day, 0)}
+        )
+    monthly_completed_order_series = []
+    for offset in range(6, -1, -1):
+        month = _shift_month(this_month, -offset)
+        monthly_completed_order_series.append(
+            {"label": month.strftime("%Y-%m"), "count": monthly_counts.get(month, 0)}
+        )
+    return DistributorSummary(
+        distributor_id=distributor.user_id,
+        code=distributor_code,
+        name=distributor.name,
+        pickup_address=distributor.pickup_address,
+        total_orders=total_orders,
+        daily_completed_orders=daily_counts.get(today, 0),
+        monthly_completed_orders=monthly_counts.get(this_month, 0),
+        daily_completed_order_series=daily_completed_order_series,
+        monthly_completed_order_series=monthly_completed_order_series,
+        commission=total_amount * 0.15,
+        wallet_balance=1200.0,
+        coupons=3,
+        points=180,
+    )
@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import random
+import shutil
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import httpx
+
+from benchmarks.datagen import generate, load_fixtures, order_payload
+from benchmarks.results import summarize, write_results
+from benchmarks.server import free_port, start_server, wait_ready
+
+Request = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+VARIANTS = {
+    "sync": "benchmarks.sync_endpoints:app",
+    "async": "app.main:app",
+}
+
+
+def requests_for(fixtures: dict) -> dict[str, Request]:
+    return {
+        "products": lambda client: client.get("/products"),
+        "create_order": lambda client: client.post(
+            "/orders", json=order_payload(fixtures)
+        ),
+        "admin_summary": lambda client: client.get("/admin/summary"),
+    }
+
+
+async def drive(
+    client: httpx.AsyncClient, request: Request, requests: int, concurrency: int
+) -> tuple[list[float], int, float]:
+    remaining = iter(range(requests))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                failed = (await request(client)).status_code >= 400
+            except httpx.TransportError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run_variant(
+    base_url: str, fixtures: dict, requests: int, concurrency: int
+) -> dict[str, dict]:
+    limits = httpx.Limits(max_connections=concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        await wait_ready(client)
+        for name, request in requests_for(fixtures).items():
+            latencies, errors, elapsed = await drive(
+                client, request, requests, concurrency
+            )
+            results[name] = {**summarize(latencies, elapsed), "errors": errors}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.async_endpoints")
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=2000, help="per endpoint")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="shopmall-async-") as directory:
+        source = Path(directory) / "seed.db"
+        data = generate(source, args.orders, seed=args.seed)
+        print(f"generated {data['orders']} orders in {data['elapsed']:.1f}s")
+        fixtures = load_fixtures(source)
+        for variant, app in VARIANTS.items():
+            # Each variant writes orders, so both start from the same copy.
+            database_path = Path(directory) / f"{variant}.db"
+            shutil.copyfile(source, database_path)
+            random.seed(args.seed)
+            port = free_port()
+            server = start_server(database_path, port, args.workers, app=app)
+            try:
+                results[variant] = asyncio.run(
+                    run_variant(
+                        f"http://127.0.0.1:{port}",
+                        fixtures,
+                        args.requests,
+                        args.concurrency,
+                    )
+                )
+            finally:
+                server.terminate()
+                server.wait()
+
+    print(
+        f"{'endpoint':<16}{'sync req/s':>12}{'async req/s':>13}"
+        f"{'sync p99 ms':>13}{'async p99 ms':>14}{'errors':>8}"
+    )
+    for name in results["async"]:
+        sync, async_ = results["sync"][name], results["async"][name]
+        print(
+            f"{name:<16}{sync['requests_per_second']:>12.1f}"
+            f"{async_['requests_per_second']:>13.1f}{sync['p99_ms']:>13.1f}"
+            f"{async_['p99_ms']:>14.1f}{sync['errors'] + async_['errors']:>8}"
+        )
+    path = write_results(
+        "async_endpoints",
+        {
+            "orders": args.orders,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "seed": args.seed,
+            "dataset": data,
+        },
+        {
+            f"{variant}-{name}": summary
+            for variant, summaries in results.items()
+            for name, summary in summaries.items()
+        },
+        args.output,
+    )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.config import SUPPLIER_CONFIG
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+BOOTSTRAP_SNIPPET = (
+    "import json; from app.bootstrap import run_bootstrap; "
+    "print(json.dumps(run_bootstrap()))"
+)
+DISTRIBUTOR_CODES = [supplier["distributor"]["code"] for supplier in SUPPLIER_CONFIG]
+STATUS_WEIGHTS = {"待提货": 25, "已完成": 65, "已取消": 10}
+CATEGORIES = ["烟花", "鞭炮", "礼花", "组合", "手持", "地面"]
+NAME_PREFIXES = ["金色", "七彩", "红火", "吉祥", "满天星", "银河", "喜庆", "富贵", "闪光", "龙凤"]
+NAME_SUFFIXES = ["礼花弹", "旋转陀螺", "加特林", "电光花", "冷焰火", "大地红", "组合烟花", "魔术弹"]
+ITEMS_PER_ORDER_WEIGHTS = [50, 30, 15, 5]
+
+
+def run_bootstrap(database_path: Path) -> dict:
+    env = {**os.environ, "SHOPMALL_DATABASE_URL": f"sqlite:///{database_path}"}
+    result = subprocess.run(
+        [sys.executable, "-c", BOOTSTRAP_SNIPPET],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_manage(database_path: Path, *commands: str) -> None:
+    env = {**os.environ, "SHOPMALL_DATABASE_URL": f"sqlite:///{database_path}"}
+    for command in commands:
+        subprocess.run(
+            [sys.executable, "-m", "app.manage", command],
+            cwd=BACKEND_DIR,
+            env=env,
+            check=True,
+            capture_output=True,
+        )
+
+
+def _insert_products(connection: sqlite3.Connection, count: int) -> None:
+    connection.executemany(
+        "INSERT INTO product (name, category, price, image_url, tags, is_featured) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (
+                f"{random.choice(NAME_PREFIXES)}{random.choice(NAME_SUFFIXES)}{index:05d}",
+                random.choice(CATEGORIES),
+                round(random.uniform(5, 500), 2),
+                "/images/paozhang.png",
+                random.choice([None, "热销", "新品", "热销,新品"]),
+                int(random.random() < 0.1),
+            )
+            for index in range(count)
+        ),
+    )
+
+
+def _insert_inventory(connection: sqlite3.Connection, product_ids: list[int]) -> None:
+    connection.executemany(
+        "INSERT OR IGNORE INTO distributorinventory (distributor_code, product_id, stock) "
+        "VALUES (?, ?, ?)",
+        (
+            (code, product_id, 1_000_000)
+            for code in DISTRIBUTOR_CODES
+            for product_id in product_ids
+        ),
+    )
+
+
+def generate(
+    database_path: Path,
+    orders: int,
+    customers: int | None = None,
+    products: int = 0,
+    batch_size: int = 50_000,
+    seed: int | None = None,
+    rebuild: bool = True,
+) -> dict:
+    if seed is not None:
+        random.seed(seed)
+    started = time.perf_counter()
+    run_bootstrap(database_path)
+    connection = sqlite3.connect(database_path)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = OFF")
+
+    existing_products = connection.execute("SELECT COUNT(*) FROM product").fetchone()[0]
+    if products or not existing_products:
+        _insert_products(connection, products or 200)
+    catalog = connection.execute("SELECT id, name, price, image_url FROM product").fetchall()
+    _insert_inventory(connection, [row[0] for row in catalog])
+
+    customers = customers if customers is not None else max(orders // 20, 1)
+    first_phone = connection.execute("SELECT COUNT(*) FROM user").fetchone()[0]
+    connection.executemany(
+        "INSERT INTO user (name, phone, role) VALUES (?, ?, 'customer')",
+        (
+            (f"bench-{index}", f"1{index:010d}")
+            for index in range(first_phone, first_phone + customers)
+        ),
+    )
+    user_ids = [
+        row[0] for row in connection.execute("SELECT id FROM user WHERE role = 'customer'")
+    ]
+    connection.commit()
+
+    statuses = list(STATUS_WEIGHTS)
+    status_weights = list(STATUS_WEIGHTS.values())
+    now = datetime.utcnow()
+    next_id = (connection.execute('SELECT MAX(id) FROM "order"').fetchone()[0] or 0) + 1
+    lines_written = 0
+    for start in range(0, orders, batch_size):
+        order_rows = []
+        line_rows = []
+        for order_id in range(next_id + start, next_id + min(start + batch_size, orders)):
+            item_count = min(
+                random.choices(range(1, 5), ITEMS_PER_ORDER_WEIGHTS)[0], len(catalog)
+            )
+            total = 0.0
+            for product_id, name, price, image_url in random.sample(catalog, item_count):
+                quantity = random.randint(1, 5)
+                total += price * quantity
+                line_rows.append((order_id, product_id, name, price, quantity, image_url))
+            status = random.choices(statuses, status_weights)[0]
+            created_at = now - timedelta(minutes=random.randint(0, 60 * 24 * 365))
+            completed_at = (
+                created_at + timedelta(hours=random.randint(1, 48))
+                if status == "已完成"
+                else None
+            )
+            order_rows.append(
+                (
+                    order_id,
+                    random.choice(user_ids),
+                    random.choice(DISTRIBUTOR_CODES),
+                    f"WDBENCH{order_id:012d}",
+                    status,
+                    round(total, 2),
+                    created_at.isoformat(sep=" "),
+                    completed_at.isoformat(sep=" ") if completed_at else None,
+                )
+            )
+        connection.executemany(
+            'INSERT INTO "order" (id, user_id, distributor_code, order_number, status, '
+            "total, created_at, completed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            order_rows,
+        )
+        connection.executemany(
+            "INSERT INTO order_line (order_id, product_id, name, price, quantity, "
+            "image_url) VALUES (?, ?, ?, ?, ?, ?)",
+            line_rows,
+        )
+        connection.commit()
+        lines_written += len(line_rows)
+    connection.close()
+    if rebuild:
+        run_manage(database_path, "rebuild-rollups", "backfill-buckets")
+    return {
+        "orders": orders,
+        "order_lines": lines_written,
+        "customers": customers,
+        "products": len(catalog),
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+def load_fixtures(database_path: Path) -> dict:
+    connection = sqlite3.connect(database_path)
+    try:
+        return {
+            "distributor_ids": [
+                row[0]
+                for row in connection.execute(
+                    "SELECT id FROM user WHERE role = 'distributor'"
+                )
+            ],
+            "customer_ids": [
+                row[0]
+                for row in connection.execute(
+                    "SELECT id FROM user WHERE role = 'customer' LIMIT 1000"
+                )
+            ],
+            "products": connection.execute(
+                "SELECT id, name, price, image_url FROM product LIMIT 200"
+            ).fetchall(),
+        }
+    finally:
+        connection.close()
+
+
+def order_payload(fixtures: dict, max_items: int = 2) -> dict:
+    products = random.sample(
+        fixtures["products"], min(random.randint(1, max_items), len(fixtures["products"]))
+    )
+    items = [
+        {
+            "id": product_id,
+            "name": name,
+            "price": price,
+            "quantity": random.randint(1, 3),
+            "image_url": image_url,
+        }
+        for product_id, name, price, image_url in products
+    ]
+    return {
+        "user_id": random.choice(fixtures["customer_ids"]),
+        "distributor_code": random.choice(DISTRIBUTOR_CODES),
+        "total": sum(item["price"] * item["quantity"] for item in items),
+        "items": items,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.datagen")
+    parser.add_argument("database", type=Path)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--customers", type=int)
+    parser.add_argument("--products", type=int, default=0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    stats = generate(
+        args.database,
+        args.orders,
+        customers=args.customers,
+        products=args.products,
+        seed=args.seed,
+    )
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import httpx
+
+from benchmarks.datagen import generate, load_fixtures, order_payload
+from benchmarks.results import summarize, write_results
+from benchmarks.server import free_port, start_server, wait_ready
+
+Request = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+MIX = {
+    "products": 30,
+    "orders_page": 15,
+    "user_orders": 15,
+    "distributor_orders_page": 10,
+    "admin_summary": 5,
+    "distributor_summary": 10,
+    "create_order": 15,
+}
+
+
+def requests_for(fixtures: dict) -> dict[str, Request]:
+    return {
+        "products": lambda client: client.get("/products"),
+        "orders_page": lambda client: client.get("/orders", params={"limit": 50}),
+        "user_orders": lambda client: client.get(
+            f"/users/{random.choice(fixtures['customer_ids'])}/orders"
+        ),
+        "distributor_orders_page": lambda client: client.get(
+            f"/distributor/{random.choice(fixtures['distributor_ids'])}/orders",
+            params={"limit": 50},
+        ),
+        "admin_summary": lambda client: client.get("/admin/summary"),
+        "distributor_summary": lambda client: client.get(
+            f"/distributor/{random.choice(fixtures['distributor_ids'])}/summary"
+        ),
+        "create_order": lambda client: client.post(
+            "/orders", json=order_payload(fixtures)
+        ),
+    }
+
+
+async def drive(
+    base_url: str, fixtures: dict, duration: float, concurrency: int
+) -> tuple[dict[str, list[float]], dict[str, int], float]:
+    requests = requests_for(fixtures)
+    names = list(MIX)
+    weights = [MIX[name] for name in names]
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await wait_ready(client)
+        deadline = time.monotonic() + duration
+
+        async def worker() -> None:
+            while time.monotonic() < deadline:
+                name = random.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    response = await requests[name](client)
+                    failed = response.status_code >= 400
+                except httpx.TransportError:
+                    failed = True
+                latencies[name].append(time.perf_counter() - started)
+                if failed:
+                    errors[name] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="shopmall-load-") as directory:
+        database_path = Path(directory) / "load.db"
+        data = generate(database_path, args.orders, seed=args.seed)
+        print(f"generated {data['orders']} orders in {data['elapsed']:.1f}s")
+        fixtures = load_fixtures(database_path)
+        server = start_server(database_path, port, args.workers)
+        try:
+            latencies, errors, elapsed = asyncio.run(
+                drive(
+                    f"http://127.0.0.1:{port}", fixtures, args.duration, args.concurrency
+                )
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+    results = {}
+    for name in MIX:
+        if name in latencies:
+            results[name] = {
+                **summarize(latencies[name], elapsed),
+                "errors": errors.get(name, 0),
+            }
+    results["overall"] = {
+        **summarize([value for values in latencies.values() for value in values], elapsed),
+        "errors": sum(errors.values()),
+    }
+    print(f"{'scenario':<26}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for name, summary in results.items():
+        print(
+            f"{name:<26}{summary['requests_per_second']:>9.1f}{summary['p50_ms']:>9.2f}"
+            f"{summary['p95_ms']:>9.2f}{summary['p99_ms']:>9.2f}{summary['errors']:>8}"
+        )
+    path = write_results(
+        "load",
+        {
+            "orders": args.orders,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "seed": args.seed,
+            "mix": MIX,
+            "dataset": data,
+        },
+        results,
+        args.output,
+    )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
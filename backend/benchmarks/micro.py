@@ -0,0 +1,101 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+BENCH_DIR = Path(tempfile.mkdtemp(prefix="shopmall-micro-"))
+DATABASE_PATH = BENCH_DIR / "micro.db"
+os.environ["SHOPMALL_DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+
+import httpx  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from benchmarks.datagen import generate, load_fixtures, order_payload  # noqa: E402
+from benchmarks.results import summarize, write_results  # noqa: E402
+
+
+def scenarios(fixtures: dict) -> dict[str, Callable[[TestClient], httpx.Response]]:
+    distributor_id = fixtures["distributor_ids"][0]
+    return {
+        "admin_summary": lambda client: client.get("/admin/summary"),
+        "distributor_summary": lambda client: client.get(
+            f"/distributor/{distributor_id}/summary"
+        ),
+        "orders_page": lambda client: client.get("/orders", params={"limit": 50}),
+        "orders_page_filtered": lambda client: client.get(
+            "/orders", params={"limit": 50, "order": "desc", "status": "待提货"}
+        ),
+        "user_orders": lambda client: client.get(
+            f"/users/{random.choice(fixtures['customer_ids'])}/orders"
+        ),
+        "distributor_orders_page": lambda client: client.get(
+            f"/distributor/{distributor_id}/orders", params={"limit": 50}
+        ),
+        "create_order": lambda client: client.post(
+            "/orders", json=order_payload(fixtures)
+        ),
+    }
+
+
+def measure(
+    client: TestClient,
+    request: Callable[[TestClient], httpx.Response],
+    iterations: int,
+    warmup: int,
+) -> dict:
+    for _ in range(warmup):
+        request(client).raise_for_status()
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        request(client).raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies, sum(latencies))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.micro")
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--only", nargs="+", help="run only these scenarios")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    data = generate(DATABASE_PATH, args.orders, seed=args.seed)
+    print(f"generated {data['orders']} orders in {data['elapsed']:.1f}s")
+    fixtures = load_fixtures(DATABASE_PATH)
+    results = {}
+    with TestClient(app) as client:
+        for name, request in scenarios(fixtures).items():
+            if args.only and name not in args.only:
+                continue
+            results[name] = measure(client, request, args.iterations, args.warmup)
+            print(
+                f"{name:<26}p50={results[name]['p50_ms']:8.2f}ms "
+                f"p95={results[name]['p95_ms']:8.2f}ms "
+                f"p99={results[name]['p99_ms']:8.2f}ms"
+            )
+    path = write_results(
+        "micro",
+        {
+            "orders": args.orders,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "dataset": data,
+        },
+        results,
+        args.output,
+    )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlmodel import create_engine
+
+from app.models import OrderNumberWorker
+from app.order_numbers import OrderNumberGenerator, lease_worker_id, release_worker_id
+
+
+def _legacy_order_number() -> str:
+    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    return f"WD{timestamp}{random.randint(1000, 9999)}"
+
+
+def _worker(database_url: str, count: int, legacy: bool) -> tuple[int, float, list[str]]:
+    if legacy:
+        started = time.perf_counter()
+        numbers = [_legacy_order_number() for _ in range(count)]
+        return -1, time.perf_counter() - started, numbers
+
+    db_engine = create_engine(database_url)
+    worker_id = lease_worker_id(db_engine)
+    generator = OrderNumberGenerator(worker_id)
+    started = time.perf_counter()
+    numbers = [generator.next() for _ in range(count)]
+    elapsed = time.perf_counter() - started
+    release_worker_id(worker_id, db_engine)
+    return worker_id, elapsed, numbers
+
+
+def run(processes: int, count: int, legacy: bool) -> int:
+    with tempfile.TemporaryDirectory(prefix="shopmall-order-numbers-") as directory:
+        database_url = f"sqlite:///{Path(directory) / 'workers.db'}"
+        OrderNumberWorker.__table__.create(create_engine(database_url))
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(processes) as pool:
+            results = pool.starmap(
+                _worker, [(database_url, count, legacy)] * processes
+            )
+
+    numbers = [number for _, _, batch in results for number in batch]
+    duplicates = len(numbers) - len(set(numbers))
+    worker_ids = sorted(worker_id for worker_id, _, _ in results)
+    slowest = max(elapsed for _, elapsed, _ in results)
+    print(f"generator:        {'legacy random' if legacy else 'snowflake'}")
+    print(f"processes:        {processes}")
+    if not legacy:
+        print(f"worker ids:       {worker_ids}")
+    print(f"order numbers:    {len(numbers)}")
+    print(f"duplicates:       {duplicates}")
+    print(f"per-process rate: {count / slowest:,.0f}/s (slowest process)")
+    print("PASS" if duplicates == 0 else "FAIL")
+    return 0 if duplicates == 0 else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.order_numbers")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--legacy", action="store_true")
+    args = parser.parse_args()
+    sys.exit(run(args.processes, args.count, args.legacy))
+
+
+if __name__ == "__main__":
+    main()
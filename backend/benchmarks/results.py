@@ -0,0 +1,100 @@
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+COMPARED_METRICS = ("p50_ms", "p95_ms", "p99_ms", "requests_per_second")
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def summarize(latencies: list[float], elapsed: Optional[float] = None) -> dict:
+    ordered = sorted(latencies)
+    summary = {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+    }
+    if elapsed:
+        summary["requests_per_second"] = len(ordered) / elapsed
+    return summary
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=RESULTS_DIR.parent,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(
+    name: str,
+    parameters: dict[str, Any],
+    results: dict[str, Any],
+    output: Optional[Path] = None,
+) -> Path:
+    recorded_at = datetime.utcnow()
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"{name}-{recorded_at:%Y%m%dT%H%M%S}.json"
+    payload = {
+        "benchmark": name,
+        "recorded_at": recorded_at.isoformat(),
+        "revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "results": results,
+    }
+    output.write_text(json.dumps(payload, indent=2, ensure_ascii=False))
+    return output
+
+
+def compare(baseline_path: Path, candidate_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text())["results"]
+    candidate = json.loads(candidate_path.read_text())["results"]
+    print(f"{'scenario':<28}{'metric':<22}{'baseline':>12}{'candidate':>12}{'change':>9}")
+    for scenario, metrics in baseline.items():
+        if scenario not in candidate:
+            continue
+        for metric in COMPARED_METRICS:
+            if metric not in metrics or metric not in candidate[scenario]:
+                continue
+            before = metrics[metric]
+            after = candidate[scenario][metric]
+            change = (after - before) / before * 100 if before else 0.0
+            print(
+                f"{scenario:<28}{metric:<22}{before:>12.2f}{after:>12.2f}{change:>+8.1f}%"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.results")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    args = parser.parse_args()
+    compare(args.baseline, args.candidate)
+
+
+if __name__ == "__main__":
+    main()
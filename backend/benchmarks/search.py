@@ -0,0 +1,106 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+BENCH_DIR = Path(tempfile.mkdtemp(prefix="shopmall-search-"))
+DATABASE_PATH = BENCH_DIR / "search.db"
+os.environ["SHOPMALL_DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+
+import httpx  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from benchmarks.datagen import NAME_PREFIXES, NAME_SUFFIXES, generate  # noqa: E402
+from benchmarks.results import summarize, write_results  # noqa: E402
+
+
+def scenarios() -> dict[str, Callable[[TestClient], httpx.Response]]:
+    def search(**params) -> Callable[[TestClient], httpx.Response]:
+        return lambda client: client.get("/products/search", params=params)
+
+    return {
+        "full_catalog": lambda client: client.get("/products"),
+        "search_name": lambda client: client.get(
+            "/products/search", params={"q": random.choice(NAME_SUFFIXES)}
+        ),
+        "search_two_terms": lambda client: client.get(
+            "/products/search",
+            params={
+                "q": f"{random.choice(NAME_PREFIXES)} {random.choice(NAME_SUFFIXES)}"
+            },
+        ),
+        "search_short_term": search(q="礼花"),
+        "search_filtered": search(q="加特林", category="烟花", min_price=50, max_price=200),
+        "search_deep_page": search(q="礼花弹", offset=2000),
+        "browse_category": search(category="鞭炮"),
+        "search_no_match": search(q="不存在的商品"),
+    }
+
+
+def measure(
+    client: TestClient,
+    request: Callable[[TestClient], httpx.Response],
+    iterations: int,
+    warmup: int,
+) -> dict:
+    for _ in range(warmup):
+        request(client).raise_for_status()
+    latencies = []
+    response_bytes = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = request(client)
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+        response_bytes = max(response_bytes, len(response.content))
+    return {**summarize(latencies, sum(latencies)), "response_bytes": response_bytes}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.search")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--only", nargs="+", help="run only these scenarios")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    data = generate(
+        DATABASE_PATH, 0, customers=0, products=args.products, seed=args.seed, rebuild=False
+    )
+    print(f"generated {data['products']} products in {data['elapsed']:.1f}s")
+    results = {}
+    with TestClient(app) as client:
+        for name, request in scenarios().items():
+            if args.only and name not in args.only:
+                continue
+            results[name] = measure(client, request, args.iterations, args.warmup)
+            print(
+                f"{name:<20}p50={results[name]['p50_ms']:8.2f}ms "
+                f"p95={results[name]['p95_ms']:8.2f}ms "
+                f"p99={results[name]['p99_ms']:8.2f}ms "
+                f"body={results[name]['response_bytes'] / 1024:9.1f}KiB"
+            )
+    path = write_results(
+        "search",
+        {
+            "products": args.products,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "dataset": data,
+        },
+        results,
+        args.output,
+    )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(tempfile.mkdtemp(prefix="shopmall-serialization-"))
+DATABASE_PATH = BENCH_DIR / "bench.db"
+os.environ["SHOPMALL_DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+os.environ["SHOPMALL_FAST_SERIALIZATION"] = "1"
+
+from fastapi import Response  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlmodel import Session, func, select  # noqa: E402
+
+from app.db import engine  # noqa: E402
+from app.models import Order  # noqa: E402
+from app.order_queries import build_order_reads, list_orders_page  # noqa: E402
+from app.schemas import OrderListQuery, OrderRead  # noqa: E402
+from benchmarks.datagen import generate  # noqa: E402
+
+ORDER_LIST_ADAPTER = TypeAdapter(list[OrderRead])
+
+
+def validated_orders(session: Session) -> bytes:
+    orders = session.exec(select(Order).order_by(Order.created_at, Order.id)).all()
+    reads = build_order_reads(session, orders)
+    content = ORDER_LIST_ADAPTER.dump_python(
+        ORDER_LIST_ADAPTER.validate_python(reads, from_attributes=True), mode="json"
+    )
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_orders(session: Session) -> bytes:
+    return list_orders_page(session, OrderListQuery(), Response()).body
+
+
+def best_of(repeat: int, serialize) -> tuple[float, bytes]:
+    best = float("inf")
+    body = b""
+    for _ in range(repeat):
+        with Session(engine) as session:
+            started = time.perf_counter()
+            body = serialize(session)
+            best = min(best, time.perf_counter() - started)
+    return best, body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'orders':>8}{'validated ms':>15}{'fast ms':>10}{'speedup':>9}  same body")
+    for size in sorted(args.sizes):
+        existing = 0
+        if DATABASE_PATH.exists():
+            with Session(engine) as session:
+                existing = session.exec(select(func.count(Order.id))).one()
+        if size > existing:
+            generate(DATABASE_PATH, size - existing, rebuild=False)
+        validated, validated_body = best_of(args.repeat, validated_orders)
+        fast, fast_body = best_of(args.repeat, fast_orders)
+        same = json.loads(validated_body) == json.loads(fast_body)
+        print(
+            f"{size:>8}{validated * 1000:>15.1f}{fast * 1000:>10.1f}"
+            f"{validated / fast:>8.1f}x  {same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from app.config import SUPPLIER_CONFIG
+from benchmarks.results import summarize, write_results
+from benchmarks.server import free_port, start_server, wait_ready
+
+DISTRIBUTOR_CODES = [supplier["distributor"]["code"] for supplier in SUPPLIER_CONFIG]
+PRODUCTS = 200
+CUSTOMERS = 50
+LINES_PER_ORDER = 3
+LAYOUTS = {"single": "0", "sharded": "1"}
+
+
+async def _prepare(client: httpx.AsyncClient) -> tuple[list[int], list[dict]]:
+    customers = [
+        (await client.post("/auth/phone", json={"phone": f"1990000{index:04d}"})).json()
+        for index in range(CUSTOMERS)
+    ]
+    products = (await client.get("/products")).json()[:PRODUCTS]
+    for code in DISTRIBUTOR_CODES:
+        response = await client.put(
+            f"/inventory/{code}",
+            json={
+                "items": [
+                    {"product_id": product["id"], "stock": 1 << 30}
+                    for product in products
+                ]
+            },
+        )
+        response.raise_for_status()
+    return [customer["id"] for customer in customers], products
+
+
+def _payload(number: int, customer_ids: list[int], products: list[dict]) -> dict:
+    lines = [
+        products[(number * LINES_PER_ORDER + line) % len(products)]
+        for line in range(LINES_PER_ORDER)
+    ]
+    return {
+        "user_id": customer_ids[number % len(customer_ids)],
+        "distributor_code": DISTRIBUTOR_CODES[number % len(DISTRIBUTOR_CODES)],
+        "total": sum(product["price"] for product in lines),
+        "items": [
+            {
+                "id": product["id"],
+                "name": product["name"],
+                "price": product["price"],
+                "quantity": 1,
+            }
+            for product in lines
+        ],
+    }
+
+
+async def drive(base_url: str, orders: int, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        await wait_ready(client)
+        customer_ids, products = await _prepare(client)
+        remaining = iter(range(orders))
+        latencies: list[float] = []
+        errors = 0
+
+        async def worker() -> None:
+            nonlocal errors
+            for number in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(
+                        "/orders", json=_payload(number, customer_ids, products)
+                    )
+                    failed = response.status_code >= 400
+                except httpx.TransportError:
+                    failed = True
+                latencies.append(time.perf_counter() - started)
+                errors += failed
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {**summarize(latencies, elapsed), "errors": errors}
+
+
+def run_layout(layout: str, workers: int, orders: int, concurrency: int) -> dict:
+    # Each run bootstraps a fresh database through the application's own
+    # startup, which also creates the shard files via ShardRouter.prepare().
+    with tempfile.TemporaryDirectory(prefix="shopmall-sharding-") as directory:
+        port = free_port()
+        server = start_server(
+            Path(directory) / "shopmall.db",
+            port,
+            workers,
+            env={
+                "SHOPMALL_SHARDING": LAYOUTS[layout],
+                "SHOPMALL_SHARD_URL_TEMPLATE": f"sqlite:///{directory}/shopmall-{{code}}.db",
+            },
+        )
+        try:
+            return asyncio.run(drive(f"http://127.0.0.1:{port}", orders, concurrency))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sharding")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4], help="uvicorn worker counts"
+    )
+    parser.add_argument("--orders", type=int, default=5000, help="orders per run")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = {}
+    print(
+        f"{'workers':>8}{'single/s':>12}{'sharded/s':>12}{'speedup':>9}"
+        f"{'single p99':>12}{'sharded p99':>13}{'errors':>8}"
+    )
+    for workers in args.workers:
+        row = {
+            layout: run_layout(layout, workers, args.orders, args.concurrency)
+            for layout in LAYOUTS
+        }
+        for layout, summary in row.items():
+            results[f"{layout}-{workers}"] = summary
+        single, sharded = row["single"], row["sharded"]
+        print(
+            f"{workers:>8}{single['requests_per_second']:>12,.0f}"
+            f"{sharded['requests_per_second']:>12,.0f}"
+            f"{sharded['requests_per_second'] / single['requests_per_second']:>8.2f}x"
+            f"{single['p99_ms']:>12.1f}{sharded['p99_ms']:>13.1f}"
+            f"{single['errors'] + sharded['errors']:>8}"
+        )
+
+    path = write_results(
+        "sharding",
+        {
+            "workers": args.workers,
+            "orders": args.orders,
+            "concurrency": args.concurrency,
+            "distributors": DISTRIBUTOR_CODES,
+            "lines_per_order": LINES_PER_ORDER,
+        },
+        results,
+        args.output,
+    )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
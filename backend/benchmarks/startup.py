@@ -0,0 +1,35 @@
+import argparse
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.datagen import generate, run_bootstrap
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="shopmall-startup-") as directory:
+        database_path = Path(directory) / "startup.db"
+        started = time.perf_counter()
+        generate(database_path, args.orders, rebuild=False)
+        print(f"generated {args.orders} orders in {time.perf_counter() - started:.1f}s")
+
+        connection = sqlite3.connect(database_path)
+        connection.execute("DELETE FROM schema_migration WHERE version IN (7, 8)")
+        connection.commit()
+        connection.close()
+
+        for label in ("upgrade boot (rollup migrations pending)", "warm boot"):
+            timings = run_bootstrap(database_path)
+            phases = ", ".join(
+                f"{name}={value:.1f}ms" for name, value in timings.items() if name != "total"
+            )
+            print(f"{label}: total={timings['total']:.1f}ms ({phases})")
+
+
+if __name__ == "__main__":
+    main()
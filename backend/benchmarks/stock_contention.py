@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.server import free_port, start_server, wait_ready
+
+
+async def run(base_url: str, orders: int, stock: int, quantity: int) -> int:
+    limits = httpx.Limits(max_connections=orders)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await wait_ready(client)
+        user = (await client.post("/auth/phone", json={"phone": "19900000000"})).json()
+        product = (await client.get("/products")).json()[0]
+        await client.put(
+            "/inventory/dist_a",
+            json={"items": [{"product_id": product["id"], "stock": stock}]},
+        )
+        payload = {
+            "user_id": user["id"],
+            "distributor_code": "dist_a",
+            "total": product["price"] * quantity,
+            "items": [
+                {
+                    "id": product["id"],
+                    "name": product["name"],
+                    "price": product["price"],
+                    "quantity": quantity,
+                }
+            ],
+        }
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.post("/orders", json=payload) for _ in range(orders))
+        )
+        elapsed = time.perf_counter() - started
+        statuses: dict[int, int] = {}
+        for response in responses:
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        inventory = (await client.get("/inventory/dist_a")).json()
+        remaining = next(
+            item["stock"] for item in inventory if item["product_id"] == product["id"]
+        )
+
+    accepted = statuses.get(200, 0)
+    expected_accepted = min(orders, stock // quantity)
+    print(f"orders fired:     {orders} in {elapsed:.2f}s")
+    print(f"status codes:     {dict(sorted(statuses.items()))}")
+    print(f"accepted:         {accepted} (expected {expected_accepted})")
+    print(f"remaining stock:  {remaining} (expected {stock - accepted * quantity})")
+    ok = (
+        remaining >= 0
+        and accepted == expected_accepted
+        and remaining == stock - accepted * quantity
+        and set(statuses) <= {200, 409}
+    )
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.stock_contention")
+    parser.add_argument("--orders", type=int, default=300)
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--quantity", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="shopmall-stock-") as directory:
+        server = start_server(Path(directory) / "stock.db", port, args.workers)
+        try:
+            code = asyncio.run(
+                run(f"http://127.0.0.1:{port}", args.orders, args.stock, args.quantity)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
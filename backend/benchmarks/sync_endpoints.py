@@ -0,0 +1,120 @@
+from fastapi import Depends, HTTPException, Request, Response
+from fastapi.routing import APIRoute
+from pydantic_core import to_json
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.accounts import user_id_for_phone
+from app.cache import cached_json_response, product_cache
+from app.db import get_session
+from app.events import ORDER_CREATED, record_order_event
+from app.images import attach_image_variants
+from app.inventory import order_item_quantities, reserve_stock
+from app.main import PRODUCT_LIST_ADAPTER, app
+from app.models import Order, OrderLine, Product, User
+from app.order_batch import existing_orders_by_key
+from app.order_numbers import generate_order_number
+from app.schemas import DashboardSummary, OrderCreate, OrderRead, ProductRead
+from app.serialization import FAST_SERIALIZATION, rows_as_dicts, select_schema
+from app.shards import shard_router
+from app.summary import build_admin_summary, merge_admin_summaries, record_order_created
+
+# The real application with /products, POST /orders and /admin/summary swapped
+# for plain `def` handlers doing the same work, so Starlette runs them on its
+# worker threadpool. benchmarks.async_endpoints serves this module as the
+# baseline against app.main:app.
+SYNC_ROUTES = {("/products", "GET"), ("/orders", "POST"), ("/admin/summary", "GET")}
+
+app.router.routes[:] = [
+    route
+    for route in app.router.routes
+    if not (
+        isinstance(route, APIRoute)
+        and any((route.path, method) in SYNC_ROUTES for method in route.methods)
+    )
+]
+
+
+@app.get("/products", response_model=list[ProductRead])
+def list_products(request: Request, session: Session = Depends(get_session)) -> Response:
+    entry = product_cache.get()
+    if entry is None:
+        if FAST_SERIALIZATION:
+            rows = session.exec(select_schema(Product, ProductRead)).all()
+            body = to_json(attach_image_variants(rows_as_dicts(rows)))
+        else:
+            products = session.exec(select(Product)).all()
+            body = PRODUCT_LIST_ADAPTER.dump_json(
+                PRODUCT_LIST_ADAPTER.validate_python(
+                    attach_image_variants([product.model_dump() for product in products])
+                )
+            )
+        entry = product_cache.put(body)
+    return cached_json_response(request, entry)
+
+
+@app.post("/orders", response_model=OrderRead)
+def create_order(payload: OrderCreate) -> OrderRead:
+    with shard_router.session(payload.distributor_code) as session:
+        if payload.idempotency_key:
+            existing = existing_orders_by_key(session, [payload.idempotency_key])
+            if existing:
+                return existing[payload.idempotency_key]
+        user_id = None
+        if payload.phone:
+            user_id = user_id_for_phone(session, payload.phone)
+        elif payload.user_id:
+            user = session.get(User, payload.user_id)
+            user_id = user.id if user else None
+        if user_id is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        if payload.distributor_code:
+            reserve_stock(
+                session, payload.distributor_code, order_item_quantities(payload.items)
+            )
+        order = Order(
+            user_id=user_id,
+            distributor_code=payload.distributor_code,
+            order_number=generate_order_number(),
+            status="待提货",
+            total=payload.total,
+            idempotency_key=payload.idempotency_key,
+        )
+        session.add(order)
+        try:
+            session.flush()
+        except IntegrityError:
+            session.rollback()
+            if not payload.idempotency_key:
+                raise
+            raise HTTPException(status_code=409, detail="Duplicate idempotency key")
+        if payload.items:
+            session.exec(
+                insert(OrderLine.__table__),
+                params=[
+                    {
+                        "order_id": order.id,
+                        "product_id": item.id,
+                        "name": item.name,
+                        "price": item.price,
+                        "quantity": item.quantity,
+                        "image_url": item.image_url,
+                    }
+                    for item in payload.items
+                ],
+            )
+        record_order_created(session, order)
+        order_read = OrderRead(**order.model_dump(), items=payload.items)
+        record_order_event(session, ORDER_CREATED, order_read)
+        session.commit()
+        return order_read
+
+
+@app.get("/admin/summary", response_model=DashboardSummary)
+def admin_summary() -> DashboardSummary:
+    summaries = []
+    for shard in shard_router.shards:
+        with Session(shard.engine) as session:
+            summaries.append(build_admin_summary(session))
+    return merge_admin_summaries(summaries)
@@ -0,0 +1,32 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# app.config and app.db read the environment at import time, so the test
+# database has to be chosen before anything under app/ is imported.
+TEST_DIR = Path(tempfile.mkdtemp(prefix="shopmall-test-"))
+os.environ["SHOPMALL_DATABASE_URL"] = f"sqlite:///{TEST_DIR / 'test.db'}"
+os.environ["SHOPMALL_IMAGE_VARIANT_DIR"] = str(TEST_DIR / "image_variants")
+os.environ["SHOPMALL_SHARDING"] = "0"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def customer(client) -> dict:
+    return client.post("/auth/phone", json={"phone": "19900001111"}).json()
+
+
+@pytest.fixture(scope="session")
+def products(client) -> list[dict]:
+    return client.get("/products").json()[:2]
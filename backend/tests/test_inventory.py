@@ -0,0 +1,131 @@
+import asyncio
+import tempfile
+from pathlib import Path
+
+import httpx
+
+from benchmarks.server import free_port, start_server, wait_ready
+
+
+def _set_stock(client, distributor_code: str, stock: dict[int, int]) -> None:
+    response = client.put(
+        f"/inventory/{distributor_code}",
+        json={
+            "items": [
+                {"product_id": product_id, "stock": quantity}
+                for product_id, quantity in stock.items()
+            ]
+        },
+    )
+    assert response.status_code == 200
+
+
+def _stock(client, distributor_code: str) -> dict[int, int]:
+    items = client.get(f"/inventory/{distributor_code}").json()
+    return {item["product_id"]: item["stock"] for item in items}
+
+
+def _order_payload(user_id: int, distributor_code: str, lines: list[tuple[dict, int]]):
+    return {
+        "user_id": user_id,
+        "distributor_code": distributor_code,
+        "total": sum(product["price"] * quantity for product, quantity in lines),
+        "items": [
+            {
+                "id": product["id"],
+                "name": product["name"],
+                "price": product["price"],
+                "quantity": quantity,
+            }
+            for product, quantity in lines
+        ],
+    }
+
+
+def test_short_line_rejects_order_and_keeps_other_stock(client, customer, products):
+    plenty, scarce = products
+    _set_stock(client, "test_short", {plenty["id"]: 5, scarce["id"]: 1})
+    orders_before = client.get(f"/users/{customer['id']}/orders").json()
+
+    response = client.post(
+        "/orders",
+        json=_order_payload(
+            customer["id"], "test_short", [(plenty, 2), (scarce, 3)]
+        ),
+    )
+
+    assert response.status_code == 409
+    assert response.json()["detail"]["product_ids"] == [scarce["id"]]
+    assert _stock(client, "test_short") == {plenty["id"]: 5, scarce["id"]: 1}
+    assert client.get(f"/users/{customer['id']}/orders").json() == orders_before
+
+
+def test_cancel_releases_stock_and_uncancel_reserves_it(client, customer, products):
+    product = products[0]
+    _set_stock(client, "test_cancel", {product["id"]: 5})
+    order = client.post(
+        "/orders", json=_order_payload(customer["id"], "test_cancel", [(product, 2)])
+    ).json()
+    assert _stock(client, "test_cancel") == {product["id"]: 3}
+
+    response = client.patch(f"/orders/{order['id']}", json={"status": "已取消"})
+    assert response.status_code == 200
+    assert _stock(client, "test_cancel") == {product["id"]: 5}
+
+    response = client.patch(f"/orders/{order['id']}", json={"status": "待提货"})
+    assert response.status_code == 200
+    assert _stock(client, "test_cancel") == {product["id"]: 3}
+
+
+def test_uncancel_without_stock_is_rejected(client, customer, products):
+    product = products[0]
+    _set_stock(client, "test_uncancel", {product["id"]: 2})
+    order = client.post(
+        "/orders", json=_order_payload(customer["id"], "test_uncancel", [(product, 2)])
+    ).json()
+    client.patch(f"/orders/{order['id']}", json={"status": "已取消"})
+    _set_stock(client, "test_uncancel", {product["id"]: 1})
+
+    response = client.patch(f"/orders/{order['id']}", json={"status": "待提货"})
+
+    assert response.status_code == 409
+    assert _stock(client, "test_uncancel") == {product["id"]: 1}
+    orders = client.get(f"/users/{customer['id']}/orders").json()
+    assert next(o for o in orders if o["id"] == order["id"])["status"] == "已取消"
+
+
+async def _race_orders(base_url: str, orders: int, stock: int) -> tuple[dict, int]:
+    limits = httpx.Limits(max_connections=orders)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await wait_ready(client)
+        user = (await client.post("/auth/phone", json={"phone": "19900002222"})).json()
+        product = (await client.get("/products")).json()[0]
+        await client.put(
+            "/inventory/test_race",
+            json={"items": [{"product_id": product["id"], "stock": stock}]},
+        )
+        payload = _order_payload(user["id"], "test_race", [(product, 1)])
+        responses = await asyncio.gather(
+            *(client.post("/orders", json=payload) for _ in range(orders))
+        )
+        statuses: dict[int, int] = {}
+        for response in responses:
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        inventory = (await client.get("/inventory/test_race")).json()
+    return statuses, inventory[0]["stock"]
+
+
+def test_parallel_orders_across_workers_do_not_oversell():
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="shopmall-race-") as directory:
+        server = start_server(Path(directory) / "race.db", port, workers=4)
+        try:
+            statuses, remaining = asyncio.run(
+                _race_orders(f"http://127.0.0.1:{port}", orders=120, stock=40)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+    assert statuses == {200: 40, 409: 80}
+    assert remaining == 0
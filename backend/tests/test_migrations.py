@@ -0,0 +1,166 @@
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlmodel import Session
+
+from app.bootstrap import _prepare_schema
+from app.config import DATABASE_CONFIG
+from app.db import create_db_engine
+
+# The tables as the first release created them: order lines lived in a JSON
+# column on "order", and neither order numbers nor phones were unique.
+BASELINE_SCHEMA = (
+    "CREATE TABLE user (id INTEGER NOT NULL, name VARCHAR NOT NULL, "
+    "phone VARCHAR NOT NULL, role VARCHAR NOT NULL, pickup_address VARCHAR, "
+    "PRIMARY KEY (id))",
+    "CREATE TABLE product (id INTEGER NOT NULL, name VARCHAR NOT NULL, "
+    "category VARCHAR NOT NULL, price FLOAT NOT NULL, image_url VARCHAR NOT NULL, "
+    "tags VARCHAR, is_featured BOOLEAN NOT NULL, PRIMARY KEY (id))",
+    'CREATE TABLE "order" (id INTEGER NOT NULL, user_id INTEGER NOT NULL, '
+    "distributor_code VARCHAR, order_number VARCHAR NOT NULL, status VARCHAR NOT NULL, "
+    "total FLOAT NOT NULL, items JSON, created_at DATETIME NOT NULL, "
+    "completed_at DATETIME, PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES user (id))",
+    'CREATE INDEX ix_order_distributor_code ON "order" (distributor_code)',
+    "CREATE TABLE authaccount (id INTEGER NOT NULL, username VARCHAR NOT NULL, "
+    "password VARCHAR NOT NULL, role VARCHAR NOT NULL, user_id INTEGER, "
+    "PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES user (id))",
+    "CREATE TABLE distributorinventory (id INTEGER NOT NULL, "
+    "distributor_code VARCHAR NOT NULL, product_id INTEGER NOT NULL, "
+    "stock INTEGER NOT NULL, PRIMARY KEY (id), "
+    "FOREIGN KEY(product_id) REFERENCES product (id))",
+    "CREATE INDEX ix_distributorinventory_distributor_code "
+    "ON distributorinventory (distributor_code)",
+)
+
+USERS = [
+    (1, "张三", "13800000001", "customer"),
+    (2, "张三", "13800000001", "customer"),
+    (3, "李四", "13800000002", "customer"),
+]
+ACCOUNTS = [
+    (1, "zhangsan", "secret", "customer", 1),
+    (2, "zhangsan-phone", "secret", "customer", 2),
+]
+ORDER_ITEMS = {
+    1: [
+        {"id": 1, "name": "苹果", "price": 5.0, "quantity": 2, "image_url": "/a.jpg"},
+        {"id": 2, "name": "香蕉", "price": 3.0, "quantity": 1},
+    ],
+    2: [{"id": 1, "name": "苹果", "price": 5.0, "quantity": 4}],
+    3: [],
+}
+ORDERS = [
+    (1, 1, "dist_a", "WD20240101", "待提货", 13.0, None),
+    (2, 2, "dist_a", "WD20240101", "已完成", 20.0, datetime(2024, 1, 2)),
+    (3, 3, "dist_b", "WD20240103", "待提货", 0.0, None),
+]
+
+
+@pytest.fixture
+def migrated(tmp_path):
+    engine = create_db_engine(
+        {**DATABASE_CONFIG, "url": f"sqlite:///{tmp_path / 'baseline.db'}"}
+    )
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.execute(text(statement))
+        connection.exec_driver_sql(
+            "INSERT INTO user (id, name, phone, role) VALUES (?, ?, ?, ?)", USERS
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO authaccount (id, username, password, role, user_id) "
+            "VALUES (?, ?, ?, ?, ?)",
+            ACCOUNTS,
+        )
+        connection.exec_driver_sql(
+            'INSERT INTO "order" (id, user_id, distributor_code, order_number, status, '
+            "total, items, created_at, completed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    order_id,
+                    user_id,
+                    code,
+                    number,
+                    status,
+                    total,
+                    json.dumps(ORDER_ITEMS[order_id], ensure_ascii=False),
+                    datetime(2024, 1, order_id).isoformat(" "),
+                    completed_at and completed_at.isoformat(" "),
+                )
+                for order_id, user_id, code, number, status, total, completed_at in ORDERS
+            ],
+        )
+    with Session(engine) as session:
+        _prepare_schema(session, {})
+        session.commit()
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+
+def test_order_items_become_order_lines(migrated):
+    lines = migrated.execute(
+        text(
+            "SELECT order_id, product_id, name, price, quantity, image_url "
+            "FROM order_line ORDER BY order_id, id"
+        )
+    ).all()
+
+    assert [tuple(line) for line in lines] == [
+        (1, 1, "苹果", 5.0, 2, "/a.jpg"),
+        (1, 2, "香蕉", 3.0, 1, None),
+        (2, 1, "苹果", 5.0, 4, None),
+    ]
+    columns = {column["name"] for column in inspect(migrated).get_columns("order")}
+    assert "items" not in columns
+
+
+def test_duplicate_order_numbers_are_renamed(migrated):
+    numbers = dict(
+        migrated.execute(text('SELECT id, order_number FROM "order"')).all()
+    )
+
+    assert numbers == {1: "WD20240101", 2: "WD20240101-2", 3: "WD20240103"}
+    unique_indexes = {
+        index["name"]
+        for index in inspect(migrated).get_indexes("order")
+        if index["unique"]
+    }
+    assert "ix_order_order_number" in unique_indexes
+
+
+def test_users_sharing_a_phone_are_merged(migrated):
+    users = migrated.execute(text("SELECT id, phone FROM user ORDER BY id")).all()
+    order_users = dict(migrated.execute(text('SELECT id, user_id FROM "order"')).all())
+    account_users = dict(
+        migrated.execute(text("SELECT username, user_id FROM authaccount")).all()
+    )
+
+    assert [tuple(user) for user in users] == [(1, "13800000001"), (3, "13800000002")]
+    assert order_users == {1: 1, 2: 1, 3: 3}
+    assert account_users == {"zhangsan": 1, "zhangsan-phone": 1}
+    unique_indexes = {
+        index["name"] for index in inspect(migrated).get_indexes("user") if index["unique"]
+    }
+    assert "ix_user_phone" in unique_indexes
+
+
+def test_order_ids_are_not_reused_after_archiving(migrated):
+    table_sql = migrated.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'order'")
+    ).scalar_one()
+    assert "AUTOINCREMENT" in table_sql
+    index_names = {index["name"] for index in inspect(migrated).get_indexes("order")}
+    assert {"ix_order_user_id_created_at_id", "ix_order_order_number"} <= index_names
+
+    migrated.execute(text('DELETE FROM "order" WHERE id = 3'))
+    new_id = migrated.execute(
+        text(
+            'INSERT INTO "order" (user_id, order_number, status, total, created_at) '
+            "VALUES (1, 'WD-new', '待提货', 0, '2024-02-01') RETURNING id"
+        )
+    ).scalar_one()
+
+    assert new_id == 4
@@ -0,0 +1,63 @@
+import { useEffect, useState } from "react";
+import { apiRequest } from "../api";
+
+const PAGE_SIZE = 60;
+const SEARCH_DELAY = 250;
+
+const useProductSearch = ({ keyword, category }) => {
+  const [products, setProducts] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [page, setPage] = useState({ query: "", offset: 0 });
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState(null);
+  const query = `${keyword?.trim() || ""}|${category || ""}`;
+  const offset = page.query === query ? page.offset : 0;
+
+  useEffect(() => {
+    let mounted = true;
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE), offset: String(offset) });
+    if (keyword?.trim()) {
+      params.set("q", keyword.trim());
+    }
+    if (category) {
+      params.set("category", category);
+    }
+    setLoading(true);
+    const timeoutId = setTimeout(
+      async () => {
+        try {
+          const data = await apiRequest(`/products/search?${params}`);
+          if (mounted) {
+            setProducts((prev) => (offset ? [...prev, ...data.items] : data.items));
+            setTotal(data.total);
+            setError(null);
+          }
+        } catch (err) {
+          if (mounted) {
+            setError(err?.message || "加载失败");
+          }
+        } finally {
+          if (mounted) {
+            setLoading(false);
+          }
+        }
+      },
+      offset ? 0 : SEARCH_DELAY
+    );
+    return () => {
+      mounted = false;
+      clearTimeout(timeoutId);
+    };
+  }, [keyword, category, offset]);
+
+  const hasMore = products.length < total;
+  const loadMore = () => {
+    if (!loading && hasMore) {
+      setPage({ query, offset: products.length });
+    }
+  };
+
+  return { products, total, loading, error, hasMore, loadMore };
+};
+
+export default useProductSearch;
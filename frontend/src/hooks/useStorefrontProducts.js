@@ -0,0 +1,56 @@
+import { useEffect, useState } from "react";
+import { apiRequest } from "../api";
+import { getStockForDistributor } from "../utils/distributor";
+import { useDistributor } from "../store/distributor";
+import { useSupplier } from "../store/supplier";
+
+const useStorefrontProducts = () => {
+  const supplier = useSupplier();
+  const distributor = useDistributor();
+  const [products, setProducts] = useState([]);
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState(null);
+
+  useEffect(() => {
+    let mounted = true;
+    const loadProducts = async () => {
+      setLoading(true);
+      try {
+        let items;
+        if (supplier.suffix) {
+          const data = await apiRequest(`/storefront/${supplier.suffix}`);
+          items = data.items;
+        } else {
+          const data = await apiRequest("/products");
+          items = data
+            .map((product) => ({
+              ...product,
+              stock: getStockForDistributor(product.id, distributor.code)
+            }))
+            .filter((product) => product.stock > 0);
+        }
+        if (mounted) {
+          setProducts(items);
+          setError(null);
+        }
+      } catch (err) {
+        if (mounted) {
+          setProducts([]);
+          setError(err?.message || "加载失败");
+        }
+      } finally {
+        if (mounted) {
+          setLoading(false);
+        }
+      }
+    };
+    loadProducts();
+    return () => {
+      mounted = false;
+    };
+  }, [supplier.suffix, distributor.code]);
+
+  return { products, loading, error };
+};
+
+export default useStorefrontProducts;
@@ -1,7 +1,7 @@
 import { Link, useParams, useSearchParams } from "react-router-dom";
 import { useMemo, useState } from "react";
-import useProducts from "../hooks/useProducts";
-import { resolveImageUrl } from "../utils/products";
+import useProductSearch from "../hooks/useProductSearch";
+import { resolveProductImageUrl } from "../utils/products";
 import { getStockForDistributor } from "../utils/distributor";
 import { useDistributor } from "../store/distributor";
 import { useSupplier } from "../store/supplier";
@@ -10,7 +10,6 @@ import { useCart } from "../store/cart";
 
 const CategoryList = () => {
   const { categoryName } = useParams();
-  const { products, loading } = useProducts();
   const distributor = useDistributor();
   const supplier = useSupplier();
   const { items, addItem, updateQuantity } = useCart();
@@ -19,24 +18,17 @@ const CategoryList = () => {
   const [keyword, setKeyword] = useState(searchParams.get("q") || "");
 
   const displayCategory = decodeURIComponent(categoryName || "全部类别");
+  const { products, loading, hasMore, loadMore } = useProductSearch({
+    keyword,
+    category: displayCategory === "全部类别" ? "" : displayCategory
+  });
 
-  const filteredProducts = useMemo(() => {
-    return products.filter((product) => {
-      const matchesCategory =
-        displayCategory === "全部类别" || product.category === displayCategory;
-      const matchesKeyword = keyword
-        ? product.name.includes(keyword.trim()) ||
-          product.tags?.includes(keyword.trim())
-        : true;
-      return matchesCategory && matchesKeyword;
-    });
-  }, [products, displayCategory, keyword]);
   const availableProducts = useMemo(
     () =>
-      filteredProducts.filter(
+      products.filter(
         (product) => getStockForDistributor(product.id, distributor.code) > 0
       ),
-    [filteredProducts, distributor.code]
+    [products, distributor.code]
   );
   const quantities = useMemo(
     () =>
@@ -78,7 +70,7 @@ const CategoryList = () => {
                 className="product-link"
                 to={supplierPath(`/product/${product.id}`)}
               >
-                <img src={resolveImageUrl(product.image_url)} alt={product.name} />
+                <img src={resolveProductImageUrl(product)} alt={product.name} />
                 <div>
                   <h4>{product.name}</h4>
                   <p>¥{product.price.toFixed(2)}</p>
@@ -109,10 +101,15 @@ const CategoryList = () => {
             </article>
           );
         })}
-        {!loading && availableProducts.length === 0 ? (
+        {!loading && !hasMore && availableProducts.length === 0 ? (
           <p className="empty-state">暂无匹配商品</p>
         ) : null}
       </section>
+      {hasMore ? (
+        <button type="button" className="ghost-link" disabled={loading} onClick={loadMore}>
+          {loading ? "加载中..." : "加载更多"}
+        </button>
+      ) : null}
     </main>
   );
 };
@@ -1,16 +1,13 @@
 import { useMemo, useState, useEffect } from "react";
 import { Link } from "react-router-dom";
-import useProducts from "../hooks/useProducts";
-import { getStockForDistributor } from "../utils/distributor";
-import { resolveImageUrl } from "../utils/products";
-import { useDistributor } from "../store/distributor";
+import useStorefrontProducts from "../hooks/useStorefrontProducts";
+import { resolveProductImageUrl } from "../utils/products";
 import { useSupplier } from "../store/supplier";
 import { buildSupplierPath } from "../utils/supplier";
 import { useCart } from "../store/cart";
 
 const CategoryMenu = () => {
-  const { products, loading } = useProducts();
-  const distributor = useDistributor();
+  const { products, loading } = useStorefrontProducts();
   const supplier = useSupplier();
   const { items, addItem, updateQuantity } = useCart();
   const supplierPath = (path) => buildSupplierPath(supplier, path);
@@ -42,14 +39,6 @@ const CategoryMenu = () => {
     return products.filter(matchesCategory);
   }, [products, activeCategory]);
 
-  const availableProducts = useMemo(
-    () =>
-      filteredProducts.filter(
-        (product) => getStockForDistributor(product.id, distributor.code) > 0
-      ),
-    [filteredProducts, distributor.code]
-  );
-
   const quantities = useMemo(
     () =>
       items.reduce((acc, item) => {
@@ -99,8 +88,8 @@ const CategoryMenu = () => {
           </div>
 
           <div className="product-grid">
-            {availableProducts.map((product) => {
-              const stock = getStockForDistributor(product.id, distributor.code);
+            {filteredProducts.map((product) => {
+              const stock = product.stock;
               const quantity = quantities[product.id] ?? 0;
               return (
                 <article key={product.id} className="product-card">
@@ -108,7 +97,7 @@ const CategoryMenu = () => {
                     className="product-link"
                     to={supplierPath(`/product/${product.id}`)}
                   >
-                    <img src={resolveImageUrl(product.image_url)} alt={product.name} />
+                    <img src={resolveProductImageUrl(product)} alt={product.name} />
                     <div>
                       <h4>{product.name}</h4>
                       <p>¥{product.price.toFixed(2)}</p>
@@ -139,7 +128,7 @@ const CategoryMenu = () => {
                 </article>
               );
             })}
-            {!loading && availableProducts.length === 0 ? (
+            {!loading && filteredProducts.length === 0 ? (
               <p className="empty-state">当前类别暂无商品</p>
             ) : null}
           </div>
@@ -1,15 +1,14 @@
 import { useMemo, useState } from "react";
 import { Link } from "react-router-dom";
-import useProducts from "../hooks/useProducts";
-import { resolveImageUrl } from "../utils/products";
-import { getStockForDistributor } from "../utils/distributor";
+import useStorefrontProducts from "../hooks/useStorefrontProducts";
+import { resolveProductImageUrl } from "../utils/products";
 import { useDistributor } from "../store/distributor";
 import { useSupplier } from "../store/supplier";
 import { buildSupplierPath } from "../utils/supplier";
 import { useCart } from "../store/cart";
 
 const Home = () => {
-  const { products, loading } = useProducts();
+  const { products, loading } = useStorefrontProducts();
   const distributor = useDistributor();
   const supplier = useSupplier();
   const { items, addItem, updateQuantity } = useCart();
@@ -38,13 +37,6 @@ const Home = () => {
         product.name.includes(trimmed) || product.tags?.includes(trimmed)
     );
   }, [products, keyword]);
-  const availableProducts = useMemo(
-    () =>
-      filteredProducts.filter(
-        (product) => getStockForDistributor(product.id, distributor.code) > 0
-      ),
-    [filteredProducts, distributor.code]
-  );
   const quantities = useMemo(
     () =>
       items.reduce((acc, item) => {
@@ -99,8 +91,8 @@ const Home = () => {
           <span>查看全部</span>
         </header>
         <div className="product-grid">
-          {availableProducts.map((product) => {
-            const stock = getStockForDistributor(product.id, distributor.code);
+          {filteredProducts.map((product) => {
+            const stock = product.stock;
             const quantity = quantities[product.id] ?? 0;
             return (
               <article key={product.id} className="product-card">
@@ -108,7 +100,7 @@ const Home = () => {
                   className="product-link"
                   to={supplierPath(`/product/${product.id}`)}
                 >
-                  <img src={resolveImageUrl(product.image_url)} alt={product.name} />
+                  <img src={resolveProductImageUrl(product)} alt={product.name} />
                   <div>
                     <h4>{product.name}</h4>
                     <p>¥{product.price.toFixed(2)}</p>
@@ -139,7 +131,7 @@ const Home = () => {
               </article>
             );
           })}
-          {!loading && availableProducts.length === 0 ? (
+          {!loading && filteredProducts.length === 0 ? (
             <p className="empty-state">暂无商品</p>
           ) : null}
         </div>
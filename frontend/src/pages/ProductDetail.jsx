@@ -1,7 +1,7 @@
 import { Link, useParams } from "react-router-dom";
 import { useMemo, useState } from "react";
 import useProducts from "../hooks/useProducts";
-import { resolveImageUrl } from "../utils/products";
+import { resolveProductImageUrl } from "../utils/products";
 import { getStockForDistributor } from "../utils/distributor";
 import { useDistributor } from "../store/distributor";
 import { useCart } from "../store/cart";
@@ -66,7 +66,7 @@ const ProductDetail = () => {
       </header>
 
       <section className="detail-card">
-        <img src={resolveImageUrl(product.image_url)} alt={product.name} />
+        <img src={resolveProductImageUrl(product, "medium")} alt={product.name} />
         <div className="detail-info">
           <p className="price">¥{product.price.toFixed(2)}</p>
           <p className="tag">{product.category}</p>
@@ -36,7 +36,7 @@ const Profile = () => {
     let mounted = true;
     const loadOrders = async () => {
       try {
-        const data = await apiRequest(`/users/${user.id}/orders`);
+        const data = await apiRequest(`/users/${user.id}/orders?include_archived=true`);
         if (mounted) {
           setOrders(data);
         }
@@ -9,3 +9,8 @@ export const resolveImageUrl = (imageUrl) => {
   }
   return `${API_BASE}${imageUrl.startsWith("/") ? "" : "/"}${imageUrl}`;
 };
+
+export const resolveProductImageUrl = (product, size = "thumb") => {
+  const variant = product?.image_variants?.[size];
+  return resolveImageUrl(variant ? variant.webp_url : product?.image_url);
+};